@@ -2,6 +2,7 @@
 from autogen.agentchat import ConversableAgent
 from autogen.agentchat.contrib.capabilities.teachability import Teachability
 from ollama_llm import OllamaLLM
+from ollama_router import resolve_ollama_url
 import os
 
 def create_autogen_agent(agent_data: dict):
@@ -10,6 +11,7 @@ def create_autogen_agent(agent_data: dict):
     ollama_llm = OllamaLLM(
         base_url=agent_data["ollama_url"],
         model=agent_data["model"],
+        pool=agent_data.get("ollama_pool"),  # Route through a pool of endpoints when the agent names one
         temperature=agent_data.get("temperature", 0.7)  # Use temperature from agent_data or default to 0.7
     )
 
@@ -34,7 +36,7 @@ def create_autogen_agent(agent_data: dict):
                 {
                     "model": "mistral:instruct",  # Or any other Ollama model you want to use
                     "api_key": "ollama",  # This is usually not required for Ollama
-                    "base_url": agent_data["ollama_url"]  # Use the agent's Ollama URL
+                    "base_url": resolve_ollama_url(agent_data)  # Use the agent's Ollama URL, or a host of its pool
                 }
             ],
             "timeout": 120
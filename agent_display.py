@@ -1,7 +1,8 @@
 # TeamForgeAI/agent_display.py
 import os
 import streamlit as st
-from file_utils import load_agents_from_json, save_agent_to_json, load_skills
+from file_utils import save_agent_to_json, load_skills
+from agent_registry import AGENTS_DIR, DEFAULT_TEAM, get_agent_registry, merge_agents
 from agent_interactions import process_agent_interaction
 from ui.utils import extract_keywords
 from agent_edit import (
@@ -11,12 +12,34 @@ from agent_edit import (
 from ui.discussion import update_discussion_and_whiteboard
 from agent_creation import create_autogen_agent  # Import the function
 
+def sync_team_agents() -> None:
+    """
+    Brings agents_data in line with the current team's saved agents.
+
+    Only compares the registry's version on a rerun where nothing changed. On a change the
+    saved agents are merged in without duplicates; on a team switch they replace the list.
+    """
+    if "current_team" not in st.session_state:
+        st.session_state["current_team"] = DEFAULT_TEAM
+    team = st.session_state["current_team"]
+    registry = get_agent_registry()
+    version = registry.version(team)
+    synced = st.session_state.get("agents_synced")
+    if synced == (team, version):
+        return
+    if synced is None or synced[0] != team:
+        st.session_state["hidden_agents"] = set()
+        st.session_state["agents_data"] = merge_agents([], registry.agents(team))
+    else:
+        st.session_state["agents_data"] = merge_agents(
+            st.session_state.get("agents_data", []), registry.agents(team), st.session_state.get("hidden_agents", set())
+        )
+    st.session_state["agents_synced"] = (team, version)
+
 def reload_agents() -> None:
-    """Reloads the agents from the JSON files."""
-    agents_base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "TeamForgeAI", "files", "agents"))
-    st.session_state["agents_data"] = load_agents_from_json(
-        os.path.join(agents_base_dir, st.session_state["current_team"])
-    )
+    """Switches to the team picked in the team selectbox and loads its agents."""
+    st.session_state["current_team"] = st.session_state["selected_agent_team"]
+    sync_team_agents()
     st.session_state["trigger_rerun"] = True
 
 def agent_button_callback(agent_index: int):
@@ -105,24 +128,13 @@ def display_agents() -> None:
         st.session_state["trigger_rerun"] = False
         st.rerun()
 
-    agents_base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "TeamForgeAI", "files", "agents"))
-    if "current_team" not in st.session_state:
-        st.session_state["current_team"] = "agents"
-
-    teams = ["agents"] + [
-        folder for folder in os.listdir(agents_base_dir)
-        if os.path.isdir(os.path.join(agents_base_dir, folder))
-    ]
+    agents_base_dir = AGENTS_DIR
+    registry = get_agent_registry()
+    teams = registry.teams()  # Indexed by the registry's watcher, not listed on every rerun
 
-    # Initialize agents_data
-    agents_data = st.session_state.get("agents_data", [])
-
-    # Load agents from files if agents_data is empty
-    if not agents_data:
-        st.session_state["agents_data"] = load_agents_from_json(
-            os.path.join(agents_base_dir, st.session_state["current_team"])
-        )
-        agents_data = st.session_state["agents_data"] # Update agents_data after loading
+    # Picks up saved agents that changed since the last rerun
+    sync_team_agents()
+    agents_data = st.session_state["agents_data"]
 
     if agents_data:
         st.sidebar.title("Your Agents")
@@ -193,6 +205,7 @@ def display_agents() -> None:
         team_dir = os.path.join(agents_base_dir, new_team_name)
         if not os.path.exists(team_dir):
             os.makedirs(team_dir)
+            registry.scan()  # List the new team right away
             st.session_state["trigger_rerun"] = True
 
     selected_team = st.sidebar.selectbox("Select Team", teams, key="selected_agent_team", on_change=reload_agents)
@@ -16,6 +16,7 @@ from file_utils import (
 from ui.discussion import update_discussion_and_whiteboard
 from agent_interactions import process_agent_interaction, generate_and_display_images
 from ui.utils import extract_keywords
+from ollama_router import get_router
 
 # --- Function to sanitize agent names ---
 
@@ -138,6 +139,15 @@ def edit_agent_properties(agent: dict, teams: list, agents_base_dir: str) -> Non
         value=agent.get("ollama_url", "http://localhost:11434"),
         key=f"endpoint_{edit_index}",
     )
+    pool_options = [None] + get_router().pool_names()
+    agent["ollama_pool"] = st.selectbox(
+        "Endpoint Pool",
+        pool_options,
+        index=pool_options.index(agent.get("ollama_pool")) if agent.get("ollama_pool") in pool_options else 0,
+        format_func=lambda pool: "None (use Endpoint)" if pool is None else pool,
+        key=f"endpoint_pool_{edit_index}",
+        help="Route this agent's requests to the least-loaded healthy host of a pool from config.OLLAMA_POOLS.",
+    )
     agent["temperature"] = st.slider(
         "Temperature",
         min_value=0.0,
@@ -298,7 +308,7 @@ def regenerate_agent_description(agent: dict) -> str:
     print(f"regenerate_agent_description called with agent_name: {agent_name}")
     print(f"regenerate_agent_description called with prompt: {prompt}")
 
-    response_generator = send_request_to_ollama_api(agent_name, prompt, agent_data=agent)  # Pass agent_data
+    response_generator = send_request_to_ollama_api(agent_name, prompt, agent_data=agent, priority="background")  # Pass agent_data
 
     full_response = ""
     try:
@@ -363,5 +373,7 @@ def delete_agent(index: int) -> None:
 def remove_agent_from_ui(index: int) -> None:
     """Removes an agent from the UI."""
     if 0 <= index < len(st.session_state.agents_data):
-        del st.session_state.agents_data[index]
+        agent = st.session_state.agents_data.pop(index)
+        # Keep it out when the team's saved agents are merged in again
+        st.session_state.setdefault("hidden_agents", set()).add(agent["config"].get("name", ""))
     st.session_state["trigger_rerun"] = True  # Trigger a re-run
@@ -8,14 +8,18 @@ import streamlit as st
 from api_utils import send_request_to_ollama_api
 from file_utils import load_skills
 from skills.fetch_web_content import fetch_web_content
-from skills.generate_sd_images import generate_sd_images
+from skills.generate_sd_images import find_all_scenes
+from image_jobs import get_image_job_queue
+from image_cache import get_image_cache
 from skills.update_project_status import update_checklists # Updated import
 from skills.summarize_project_status import summarize_project_status
 from ui.discussion import update_discussion_and_whiteboard  # Corrected import
 from ui.utils import extract_keywords  # Import extract_keywords
 from ollama_llm import OllamaLLM # Import OllamaLLM from ollama_llm.py
-from skills.web_search import web_search # Import web_search directly
 from agent_creation import create_autogen_agent # Import create_autogen_agent
+from model_residency import preload_team_models, session_team
+from ollama_router import resolve_ollama_url
+from turn_scheduler import order_by_model
 
 def process_agent_interaction(agent_index: int) -> None:
     """Handles the interaction with a selected agent."""
@@ -67,8 +71,8 @@ def process_agent_interaction(agent_index: int) -> None:
                 st.session_state.get("user_request", "") # Use the original user request instead of the formatted discussion history
              )
             query = " ".join(keywords)
-            # Call the web_search function directly
-            skill_result = web_search(query, st.session_state.discussion_history, st.session_state.agents_data, agent_instance.teachability) # Use agent_instance.teachability
+            # Imported on first use; it pulls in googleapiclient and Teachability
+            skill_result = available_skills["web_search"](query, st.session_state.discussion_history, st.session_state.agents_data, agent_instance.teachability) # Use agent_instance.teachability
             response_text = f"Skill '{selected_skill[0]}' result: {skill_result}"
             update_discussion_and_whiteboard(agent_name, response_text, user_input)
             return
@@ -162,30 +166,41 @@ def process_agent_interaction(agent_index: int) -> None:
 
 
 def generate_and_display_images(discussion_history: str) -> None:
-    """Generates images using the generate_sd_images skill and displays them."""
-
-    while True: # Keep generating images until there are no more scenes
-        image_paths = generate_sd_images(
-            discussion_history=discussion_history # Pass discussion_history to generate_sd_images
-        )
-
-        try:
-            # Assuming generate_sd_images returns a list of image file paths
-            time.sleep(1)
-            # Display the generated images
-            if image_paths is not None:
-                for image_path in image_paths:
-                    with open(image_path, "rb") as file:
-                        image_bytes = file.read()
-                        st.image(image_bytes, caption=f"Generated Image: {image_path}")
-            else:
-                print(f"generate_sd_images did not return any images")
-                break # Exit the loop if no images were generated
+    """Queues every new scene for image generation and shows each image as soon as it is saved."""
+    used_prompts = st.session_state.setdefault("used_image_prompts", [])
+    scenes = [scene for scene in find_all_scenes(discussion_history) if scene not in used_prompts]
+    if not scenes:
+        st.info("No new image requests found in the discussion.")
+        return
 
-        except Exception as error:
-            print(f"Error executing generated code: {error}")
-            st.error(f"Error generating image: {error}")
-            break # Exit the loop if there was an error
+    job_queue = get_image_job_queue()
+    jobs = job_queue.submit_scenes(scenes)
+    progress_bars = {job.id: st.progress(0.0, text=f"Queued: {job.scene[:60]}") for job in jobs}
+    columns = st.columns(3)
+    shown = 0
+    try:
+        for kind, job, detail in job_queue.iter_events(jobs):
+            if kind == "progress":
+                eta = f" (about {job.eta:.0f}s left)" if job.eta else ""
+                progress_bars[job.id].progress(min(detail, 1.0), text=f"Rendering: {job.scene[:60]}{eta}")
+            elif kind == "image":
+                with columns[shown % 3]:
+                    st.image(detail, caption=f"Generated Image: {detail}")
+                shown += 1
+            elif kind == "done":
+                used_prompts.append(job.scene)
+                progress_bars[job.id].progress(1.0, text=f"Done: {job.scene[:60]}")
+            elif kind == "failed":
+                progress_bars[job.id].empty()
+                st.error(f"Error generating image for '{job.scene}': {detail}")
+    except Exception as error:
+        print(f"Error generating images: {error}")
+        st.error(f"Error generating image: {error}")
+    cached = sum(1 for job in jobs if job.cached)
+    if cached:
+        stats = get_image_cache().stats()
+        st.caption(f"{cached} of {len(jobs)} scenes came from the image cache (hit rate {stats['hit_rate']:.0%}, "
+                   f"{stats['bytes_saved'] / 1024**2:.1f} MB reused so far).")
 
 def enforce_image_request_format(text: str) -> str:
     """
@@ -211,9 +226,15 @@ def execute_moa_workflow(request: str, agents_data: list, current_agent: dict, a
     proposers = [agent for agent in agents_data if agent.get("moa_role") == "proposer"]
     aggregators = [agent for agent in agents_data if agent.get("moa_role") == "aggregator"]
 
+    # Load all proposer and aggregator models before the first layer runs
+    preload_team_models(proposers + aggregators + [current_agent], resolve_ollama_url, session_team(st.session_state))
+
     # Layer 1: Proposers generate initial responses
-    layer_1_outputs = []
-    for proposer in proposers:
+    # Proposers do not see each other's output, so run them grouped by model to avoid swaps,
+    # then put the responses back in agent order
+    layer_1_outputs = [None] * len(proposers)
+    last_model = None
+    for index, proposer in order_by_model(list(enumerate(proposers)), lambda item: item[1].get("model")):
         proposer_emoji = proposer.get("emoji", "") # Get the proposer's emoji
         print(f"🟢 Proposer: {proposer_emoji} {proposer['config']['name']}") # Log the proposer's name with emoji
         # Create an instance of OllamaConversableAgent from the agent_instance dictionary
@@ -228,14 +249,16 @@ def execute_moa_workflow(request: str, agents_data: list, current_agent: dict, a
             proposer_instance.add_message("User", request)  # Call add_message on the agent instance
 
         response = proposer_instance.ollama_llm.generate_text(proposer_prompt)
-        layer_1_outputs.append(response)
+        layer_1_outputs[index] = response
+        last_model = proposer.get("model")
         print(f"    Proposed Response: {response}") # Log the proposed response
 
     # Subsequent layers: Aggregators refine responses
     current_responses = layer_1_outputs
     for i in range(2, 4):  # Adjust the number of layers as needed
-        new_responses = []
-        for aggregator in aggregators:
+        new_responses = [None] * len(aggregators)
+        # Aggregators within a layer are independent too; start with the model that is already loaded
+        for index, aggregator in order_by_model(list(enumerate(aggregators)), lambda item: item[1].get("model"), start_model=last_model):
             aggregator_emoji = aggregator.get("emoji", "") # Get the aggregator's emoji
             print(f"🟠 Aggregator (Layer {i}): {aggregator_emoji} {aggregator['config']['name']}") # Log the aggregator's name and layer with emoji
             # Create an instance of OllamaConversableAgent from the agent_instance dictionary
@@ -250,7 +273,8 @@ def execute_moa_workflow(request: str, agents_data: list, current_agent: dict, a
                 aggregator_instance.add_message("User", aggregator_prompt)  # Call add_message on the agent instance
 
             response = aggregator_instance.ollama_llm.generate_text(aggregator_prompt)
-            new_responses.append(response)
+            new_responses[index] = response
+            last_model = aggregator.get("model")
             print(f"    Aggregated Response (Layer {i}): {response}") # Log the aggregated response
         current_responses = new_responses
 
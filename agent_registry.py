@@ -0,0 +1,202 @@
+# TeamForgeAI/agent_registry.py
+import copy
+import json
+import os
+import threading
+import time
+
+from config import AGENT_WATCH_INTERVAL
+
+AGENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "files", "agents")
+DEFAULT_TEAM = "agents"
+
+def agent_name(agent_data: dict) -> str:
+    return agent_data.get("config", {}).get("name", "")
+
+class AgentRegistry:
+    """
+    Index of the teams in the agents folder and the agents saved in each.
+
+    A team is a subfolder of the agents folder; the default team also includes agent files
+    kept directly in the agents folder. Each JSON file is parsed once and kept until its
+    mtime or size changes. A watcher thread scans the folders every `interval` seconds and
+    bumps a team's version when one of its files is added, changed or removed, so callers
+    compare versions on a rerun and touch the filesystem only through the watcher.
+    Within a team, agents are deduplicated by name, the most recently modified file winning.
+    """
+
+    def __init__(self, base_dir: str = AGENTS_DIR, interval: float = AGENT_WATCH_INTERVAL):
+        self.base_dir = base_dir
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._folders = {}  # Folder path -> {file name: {"mtime", "size", "agent", "order"}}
+        self._versions = {}  # Team name -> version, bumped on every change
+        self._teams = []
+        self._failed = {}  # Path -> (mtime, size) of a file that could not be parsed
+        self._watcher = None
+        self._watcher_lock = threading.Lock()
+        self.stats = {"scans": 0, "parsed": 0, "errors": 0, "changes": 0}
+
+    def team_folders(self, team: str) -> list:
+        folders = [os.path.join(self.base_dir, team)]
+        if team == DEFAULT_TEAM:
+            folders.append(self.base_dir)
+        return folders
+
+    # --- Queries (no filesystem access once the watcher runs) ---------------------
+
+    def teams(self) -> list:
+        self._ensure_watcher()
+        with self._lock:
+            return list(self._teams)
+
+    def version(self, team: str) -> int:
+        self._ensure_watcher()
+        with self._lock:
+            return self._versions.get(team, 0)
+
+    def agents(self, team: str) -> list:
+        """The team's agents, deduplicated by name, as copies the caller may change."""
+        self._ensure_watcher()
+        return self._agents_in(self.team_folders(team))
+
+    def folder_agents(self, folder: str) -> list:
+        """Agents saved directly in any folder; the folder is watched from now on."""
+        folder = os.path.abspath(folder)
+        self._ensure_watcher()
+        with self._lock:
+            known = folder in self._folders
+        if not known:
+            self._scan_folder(folder)
+        return self._agents_in([folder])
+
+    def _agents_in(self, folders: list) -> list:
+        newest = {}
+        with self._lock:
+            for folder in folders:
+                for entry in self._folders.get(folder, {}).values():
+                    name = agent_name(entry["agent"])
+                    if name not in newest or entry["mtime"] > newest[name]["mtime"]:
+                        newest[name] = entry
+        ordered = sorted(newest.values(), key=lambda entry: entry["order"])
+        return [copy.deepcopy(entry["agent"]) for entry in ordered]
+
+    # --- Watching ----------------------------------------------------------------
+
+    def _ensure_watcher(self) -> None:
+        with self._watcher_lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            if not self.stats["scans"]:
+                self.scan()  # The first caller gets a complete index
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.scan()
+            except OSError as error:
+                print(f"Agent registry scan failed: {error}")
+
+    def scan(self) -> None:
+        """Syncs the index with the agents folder and every team folder."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        with os.scandir(self.base_dir) as scan:
+            teams = sorted(entry.name for entry in scan if entry.is_dir() and not entry.name.startswith("."))
+        teams = [DEFAULT_TEAM] + [team for team in teams if team != DEFAULT_TEAM]
+        with self._lock:
+            if teams != self._teams:
+                self._teams = teams
+                self._versions["teams"] = self._versions.get("teams", 0) + 1
+            extra_folders = [folder for folder in self._folders if not any(folder in self.team_folders(team) for team in teams)]
+            self.stats["scans"] += 1
+        changed_folders = {folder for team in teams for folder in self.team_folders(team) if self._scan_folder(folder)}
+        changed_folders |= {folder for folder in extra_folders if self._scan_folder(folder)}
+        if changed_folders:
+            with self._lock:
+                for team in teams:
+                    if changed_folders & set(self.team_folders(team)):
+                        self._versions[team] = self._versions.get(team, 0) + 1
+                self.stats["changes"] += 1
+
+    def _scan_folder(self, folder: str) -> bool:
+        """Reparses new or changed JSON files in one folder. Returns True if anything changed."""
+        with self._lock:
+            cached = dict(self._folders.get(folder, {}))
+        present = {}
+        if os.path.isdir(folder):
+            with os.scandir(folder) as scan:
+                for entry in scan:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        present[entry.name] = (entry.path, stat.st_mtime_ns, stat.st_size)
+        changed = set(cached) - set(present)
+        for name in changed:
+            del cached[name]
+        for name, (path, mtime, size) in present.items():
+            entry = cached.get(name)
+            if entry and entry["mtime"] == mtime and entry["size"] == size:
+                continue
+            if self._failed.get(path) == (mtime, size):
+                continue  # Still the file that failed to parse
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    agent_data = json.load(file)
+                if not isinstance(agent_data, dict):
+                    raise ValueError("not a JSON object")
+            except (OSError, ValueError) as error:
+                print(f"Error loading agent from {path}: {error}")  # Retried once the file changes again
+                with self._lock:
+                    self.stats["errors"] += 1
+                    self._failed[path] = (mtime, size)
+                if entry:
+                    continue  # Keep the last good version
+                cached.pop(name, None)
+                continue
+            agent_data.setdefault("saved", True)  # It is on disk
+            cached[name] = {"mtime": mtime, "size": size, "agent": agent_data, "order": (entry or {}).get("order", mtime)}
+            changed.add(name)
+            with self._lock:
+                self.stats["parsed"] += 1
+        with self._lock:
+            if changed or folder not in self._folders:
+                self._folders[folder] = cached
+        return bool(changed)
+
+def merge_agents(session_agents: list, saved_agents: list, hidden: set = frozenset()) -> list:
+    """
+    Brings a session's agent list in line with the saved agents, without duplicates.
+
+    Saved versions replace the session's copies in place, saved agents the session lacks
+    are appended unless hidden, session agents that were never saved are kept, and ones
+    whose files are gone are dropped.
+    """
+    saved = {agent_name(agent): agent for agent in saved_agents}
+    merged = []
+    seen = set()
+    for agent in session_agents:
+        name = agent_name(agent)
+        if name in seen:
+            continue
+        if name in saved:
+            merged.append(saved[name])
+        elif not agent.get("saved", False):
+            merged.append(agent)  # Added in this session and not saved yet
+        else:
+            continue  # Its file was deleted
+        seen.add(name)
+    merged.extend(agent for name, agent in saved.items() if name not in seen and name not in hidden)
+    return merged
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_agent_registry() -> AgentRegistry:
+    """Returns the process-wide agent registry shared by every Streamlit session."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry()
+        return _registry
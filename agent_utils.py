@@ -18,6 +18,7 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 
 from current_project import CurrentProject # Import CurrentProject from current_project.py
+from request_scheduler import get_request_scheduler
 
 
 def extract_keywords(text: str) -> list:
@@ -71,7 +72,8 @@ def rephrase_prompt(user_request: str) -> str:
     print(f"Request Payload: {json.dumps(ollama_request, indent=2)}")
     try:
         print("Sending request to Ollama API...")
-        response = requests.post(url, json=ollama_request, headers=headers, timeout=240) # Added timeout
+        with get_request_scheduler().slot("interactive", label="rephrase_prompt", host=ollama_url):
+            response = requests.post(url, json=ollama_request, headers=headers, timeout=240) # Added timeout
         print(f"Response received. Status Code: {response.status_code}")
         if response.status_code == 200:
             print("Request successful. Parsing response...")
@@ -317,7 +319,8 @@ def get_agents_from_text(text: str) -> tuple:
         "stream": False,
     }
     try:
-        response = requests.post(url, json=ollama_request, headers=headers, timeout=240) # Added timeout
+        with get_request_scheduler().slot("interactive", label="get_agents_from_text", host=ollama_url):
+            response = requests.post(url, json=ollama_request, headers=headers, timeout=240) # Added timeout
         if response.status_code == 200:
             response_data = response.json()
             # Extract the JSON string from the "response" field and parse it
@@ -347,13 +350,14 @@ def get_agents_from_text(text: str) -> tuple:
                 skills = agent_data.get("skills", [])
                 tools = agent_data.get("tools", [])
                 ollama_url = agent_data.get("ollama_url", "http://localhost:11434")
+                ollama_pool = agent_data.get("ollama_pool")
                 temperature = agent_data.get("temperature", 0.1)
                 model = agent_data.get("model", "mistral:instruct")
                 db_path = agent_data.get("db_path", os.path.join("./db", f"{expert_name}_memory")) # Get db_path from agent_data
                 enable_memory = agent_data.get("enable_memory", False)
                 moa_role = agent_data.get("moa_role", "proposer")
                 autogen_agent, crewai_agent = create_agent_data(
-                    expert_name, description, skills, tools, ollama_url=ollama_url, temperature=temperature, model=model, db_path=db_path, enable_memory=enable_memory, moa_role=moa_role
+                    expert_name, description, skills, tools, ollama_url=ollama_url, temperature=temperature, model=model, db_path=db_path, enable_memory=enable_memory, moa_role=moa_role, ollama_pool=ollama_pool
                 )
                 autogen_agents.append(autogen_agent)
                 crewai_agents.append(crewai_agent)
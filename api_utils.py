@@ -6,6 +6,11 @@ import time
 import requests
 import streamlit as st
 
+from model_catalog import get_model_catalog
+from ollama_router import get_router, ollama_endpoint
+from model_residency import get_residency_manager
+from request_scheduler import RequestCancelled, get_request_scheduler
+
 def make_api_request(url: str, data: dict, headers: dict, api_key: str = None, timeout: int = 120) -> dict: # Updated timeout to 120
     """Makes an API request and returns the JSON response."""
     time.sleep(2)  # Throttle the request to ensure at least 2 seconds between calls
@@ -23,7 +28,7 @@ def make_api_request(url: str, data: dict, headers: dict, api_key: str = None, t
 
 
 def create_agent_data(
-    expert_name: str, description: str, skills: list, tools: list, enable_reading_html: bool = False, ollama_url: str = None, temperature: float = None, model: str = None
+    expert_name: str, description: str, skills: list, tools: list, enable_reading_html: bool = False, ollama_url: str = None, temperature: float = None, model: str = None, ollama_pool: str = None
 ) -> tuple:  # Add enable_reading_html argument
     """Creates agent data for both AutoGen and CrewAI agents."""
     autogen_agent_data = {
@@ -45,6 +50,7 @@ def create_agent_data(
         "tools": tools,
         "enable_reading_html": enable_reading_html,
         "ollama_url": ollama_url, # Add agent-specific settings
+        "ollama_pool": ollama_pool, # Routed through this pool of endpoints instead of ollama_url when set
         "temperature": temperature,
         "model": model,
     }
@@ -59,15 +65,22 @@ def create_agent_data(
     return autogen_agent_data, crewai_agent_data
 
 
-def send_request_to_ollama_api(expert_name: str, request: str, api_key: str = None, stream: bool = True, agent_data: dict = None, timeout: int = 120):
-    """Sends a request to the Ollama API and yields the response."""
+def send_request_to_ollama_api(expert_name: str, request: str, api_key: str = None, stream: bool = True, agent_data: dict = None, timeout: int = 120, priority: str = "interactive"):
+    """
+    Sends a request to the Ollama API and yields the response.
+
+    The request waits for a slot in the central request scheduler under `priority`
+    ("interactive", "background" or "batch"); queued background requests may be cancelled
+    when an interactive one arrives, in which case nothing is yielded.
+    """
     # --- Get agent-specific settings or fall back to global settings ---
     ollama_url = agent_data.get("ollama_url") if agent_data else st.session_state.get("ollama_url", "http://localhost:11434") # Access from agent_data
     temperature_value = agent_data.get("temperature") if agent_data else st.session_state.get("temperature", 0.1) # Access from agent_data
     # --- Use agent-specific model if available ---
     model = agent_data.get("model") if agent_data else st.session_state.get("model", "mistral:instruct") # Access from agent_data
+    # --- Agents that name a pool are dispatched to the least-loaded host of that pool ---
+    ollama_pool = agent_data.get("ollama_pool") if agent_data else None
 
-    url = f"{ollama_url}/api/generate"
     data = {
         "model": model, # Use agent-specific model
         "prompt": request,
@@ -81,29 +94,49 @@ def send_request_to_ollama_api(expert_name: str, request: str, api_key: str = No
         "Content-Type": "application/json",
     }
 
+    scheduler = get_request_scheduler()
     if stream:
         try:
-            response = requests.post(url, json=data, headers=headers, stream=True, timeout=timeout)
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode("utf-8")
-                    json_response = json.loads(decoded_line)
-                    # Update session state to trigger UI update
-                    st.session_state["update_ui"] = True
-                    st.session_state["next_agent"] = expert_name
-                    yield json_response
+            with ollama_endpoint(ollama_pool, model, ollama_url) as base_url, scheduler.slot(priority, label=expert_name, host=base_url):
+                residency = get_residency_manager(base_url)
+                data["keep_alive"] = residency.keep_alive_for(model)  # Team models stay loaded between turns
+                response = requests.post(f"{base_url}/api/generate", json=data, headers=headers, stream=True, timeout=timeout)
+                if response.status_code != 200:
+                    raise requests.exceptions.HTTPError(f"Status {response.status_code}: {response.text}", response=response)
+                for line in response.iter_lines():
+                    if line:
+                        decoded_line = line.decode("utf-8")
+                        json_response = json.loads(decoded_line)
+                        if "error" in json_response:
+                            raise requests.exceptions.HTTPError(json_response["error"], response=response)
+                        if json_response.get("done"):
+                            # Recorded here: consumers stop reading at the done chunk, so the endpoint's exit never sees a success
+                            residency.record_request(model, json_response.get("load_duration"))
+                            get_router().mark_resident(base_url, model)
+                        # Update session state to trigger UI update
+                        st.session_state["update_ui"] = True
+                        st.session_state["next_agent"] = expert_name
+                        yield json_response
+        except RequestCancelled as e:
+            print(e)
+            return None
         except requests.exceptions.RequestException as e:
             st.error(f"Request failed: {e}")
             return None
     else:
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=timeout)
+            with ollama_endpoint(ollama_pool, model, ollama_url) as base_url, scheduler.slot(priority, label=expert_name, host=base_url):
+                data["keep_alive"] = get_residency_manager(base_url).keep_alive_for(model)  # Team models stay loaded between turns
+                response = requests.post(f"{base_url}/api/generate", json=data, headers=headers, timeout=timeout)
             if response.status_code == 200:           
                return response.json()  # Return the JSON response directly
             print(
                 f"Error: API request failed with status {response.status_code}, response: {response.text}"
             )
             return None
+        except RequestCancelled as e:
+            print(e)
+            return None
         except requests.exceptions.RequestException as e:
             st.error(f"Request failed: {e}")
             return None
@@ -131,17 +164,9 @@ def extract_code_from_response(response: str) -> str:
     return "\n\n".join(unique_code_blocks)
 
 def get_ollama_models(ollama_url: str = "http://localhost:11434", timeout: int = 120) -> list: # Moved from main.py, updated timeout to 120
-    """Gets the list of available models from the Ollama API."""
+    """Gets the list of available models from the shared, TTL-cached model catalog."""
     try:
-        response = requests.get(f"{ollama_url}/api/tags", timeout=timeout)
-        response.raise_for_status()
-        models = [
-            model["name"]
-            for model in response.json()["models"]
-            if "embed" not in model["name"]
-        ]
-        models.sort()  # Simple alphabetical sorting for now
-        return models
+        return get_model_catalog(ollama_url).get_models(timeout=timeout)
     except requests.exceptions.RequestException as error:
         st.error(f"Error fetching models: {error}")
         return []
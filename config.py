@@ -1,3 +1,54 @@
+import os
+
 import streamlit as st
 
+# Named pools of Ollama endpoints. An agent with "ollama_pool" set to one of these names is
+# routed to the least-loaded healthy host of that pool instead of its fixed "ollama_url".
+# OLLAMA_HOSTS (comma-separated URLs) fills the default pool.
+OLLAMA_POOLS = {
+    "default": [url.strip() for url in os.getenv("OLLAMA_HOSTS", "http://localhost:11434").split(",") if url.strip()],
+}
+
+# Model residency: how long team models stay loaded after a request, and the host limits
+# used to predict evictions. Without a memory budget only the loaded-model limit is enforced.
+OLLAMA_TEAM_KEEP_ALIVE = os.getenv("OLLAMA_TEAM_KEEP_ALIVE", "30m")
+OLLAMA_MEMORY_BUDGET_GB = float(os.getenv("OLLAMA_MEMORY_BUDGET_GB", "0")) or None
+OLLAMA_MAX_LOADED_MODELS = int(os.getenv("OLLAMA_MAX_LOADED_MODELS", "3"))
+
+# Auto mode can reorder each round so agents sharing a model speak back to back, moving no
+# agent more than this many turns from its round-robin slot. Each turn sees the ones before
+# it, so this changes the conversation; the default 0 keeps strict round-robin order.
+AUTO_MODE_MAX_TURN_DELAY = int(os.getenv("AUTO_MODE_MAX_TURN_DELAY", "0"))
+
+# Central LLM request scheduler: requests running at once across the app (match the
+# server's OLLAMA_NUM_PARALLEL), and the most each priority class may hold of them.
+REQUEST_SLOTS = int(os.getenv("REQUEST_SLOTS", "2"))
+REQUEST_CLASS_LIMITS = {"interactive": REQUEST_SLOTS, "background": 1, "batch": 1}
+
+# Image generation (automatic1111-compatible API). The server renders one request at a
+# time; two in flight keep the next one queued there. Several images of one scene are sent
+# as one request, at most SD_MAX_BATCH_SIZE per pass (more become extra passes, n_iter).
+SD_API_URL = os.getenv("SD_API_URL", "http://0.0.0.0:7860")
+SD_MAX_CONCURRENT_JOBS = int(os.getenv("SD_MAX_CONCURRENT_JOBS", "2"))
+SD_MAX_BATCH_SIZE = int(os.getenv("SD_MAX_BATCH_SIZE", "4"))
+SD_PROGRESS_INTERVAL = float(os.getenv("SD_PROGRESS_INTERVAL", "1.0"))
+SD_REQUEST_TIMEOUT = float(os.getenv("SD_REQUEST_TIMEOUT", "600"))
+
+# Generated images are cached across sessions by prompt and settings, in a folder of their
+# own copied into the gallery; beyond this size the least recently used prompts are evicted
+# and their cache files deleted. 0 keeps every image and hard-links it into the gallery.
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "1024"))
+
+# Discussions are saved to an append-only journal per discussion, fsynced in batches at
+# most DISCUSSION_FSYNC_INTERVAL seconds apart. In the background, a journal larger than
+# DISCUSSION_COMPACT_KB or idle for DISCUSSION_IDLE_SECONDS is written to the SQLite
+# discussion store (where search finds it), and only the newest DISCUSSION_MAX_FILES
+# discussions are kept (0 keeps all).
+DISCUSSION_FSYNC_INTERVAL = float(os.getenv("DISCUSSION_FSYNC_INTERVAL", "2"))
+DISCUSSION_COMPACT_KB = int(os.getenv("DISCUSSION_COMPACT_KB", "256"))
+DISCUSSION_IDLE_SECONDS = float(os.getenv("DISCUSSION_IDLE_SECONDS", "10"))
+DISCUSSION_MAX_FILES = int(os.getenv("DISCUSSION_MAX_FILES", "20"))
 
+# Agent JSON files are indexed once and rescanned by a watcher thread at this interval;
+# reruns only compare the registry's version numbers.
+AGENT_WATCH_INTERVAL = float(os.getenv("AGENT_WATCH_INTERVAL", "1.0"))
@@ -0,0 +1,282 @@
+# TeamForgeAI/discussion_journal.py
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import DISCUSSION_COMPACT_KB, DISCUSSION_FSYNC_INTERVAL, DISCUSSION_IDLE_SECONDS, DISCUSSION_MAX_FILES
+from discussion_store import DISCUSSION_DIR, DiscussionStore, get_discussion_store, message_speaker, migrate_text_files, split_messages
+
+JOURNAL_SUFFIX = ".journal"
+
+def apply_records(text: str, lines) -> tuple:
+    """
+    Replays journal records onto `text`. Returns (text, changed_from, complete): the lowest
+    offset any record touched (None if there were none), and False if a torn record was hit.
+    """
+    changed_from = None
+    for line in lines:
+        try:
+            record = json.loads(line)
+            text = text[:record["at"]] + record["text"]
+        except (ValueError, KeyError, TypeError):
+            return text, changed_from, False  # Torn tail from a crash; the records before it stand
+        changed_from = record["at"] if changed_from is None else min(changed_from, record["at"])
+    return text, changed_from, True
+
+class DiscussionJournal:
+    """
+    One saved discussion: its messages in the store plus an append-only `<name>.journal`.
+
+    The journal starts with a header naming the store revision it applies to, followed by
+    one JSON record per save: {"at": offset, "text": new text}, meaning "keep the first
+    `at` characters and append `text`". A growing discussion is therefore saved by writing
+    only what was added. Compaction writes the messages from the lowest changed offset to
+    the store, which bumps the revision, and deletes the journal; if it is interrupted in
+    between, the header no longer matches and the leftover journal is ignored. A torn last
+    record from a crash is dropped on load.
+    """
+
+    def __init__(self, directory: str, name: str, store: DiscussionStore):
+        self.name = name
+        self.store = store
+        self.journal_path = os.path.join(directory, f"{name}{JOURNAL_SUFFIX}")
+        self.lock = threading.Lock()
+        self._file = None  # Journal opened for appending
+        self._clean = True  # False when the journal on disk is stale or torn and must be compacted before appending
+        self.changed_from = None  # Lowest offset changed since the store was last written
+        self.revision = store.revision(name)
+        self.text = self._replay()  # The text as saved, shared with the caller's string rather than copied
+        self.journal_bytes = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        self.unsynced = 0  # Bytes written since the last fsync
+        self.last_write = 0.0
+
+    def _replay(self) -> str:
+        text = self.store.text(self.name)
+        try:
+            journal = open(self.journal_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return text
+        with journal:
+            try:
+                header = json.loads(journal.readline())
+            except ValueError:
+                header = {}
+            if header.get("base") != self.revision:
+                self._clean = False  # Already written to the store, or never completed
+                return text
+            text, self.changed_from, self._clean = apply_records(text, journal)
+        return text
+
+    def save(self, text: str) -> int:
+        """Records `text` as the discussion's content, writing only the change. Returns the bytes written."""
+        with self.lock:
+            if text is self.text or text == self.text:
+                return 0
+            at = len(self.text) if text.startswith(self.text) else len(os.path.commonprefix([self.text, text]))
+            record = json.dumps({"at": at, "text": text[at:]}) + "\n"
+            file = self._open()
+            file.write(record)
+            file.flush()  # To the OS now; fsync comes in batches
+            written = len(record.encode("utf-8"))
+            self.text = text
+            self.changed_from = at if self.changed_from is None else min(self.changed_from, at)
+            self.journal_bytes += written
+            self.unsynced += written
+            self.last_write = time.time()
+            return written
+
+    def _open(self):
+        """The journal, opened for appending and started with a header if new. Caller holds the lock."""
+        if self._file is None:
+            if not self._clean:
+                self._compact()
+            exists = os.path.exists(self.journal_path)
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+            if not exists:
+                header = json.dumps({"base": self.revision, "created": time.time()}) + "\n"
+                self._file.write(header)
+                self.journal_bytes = len(header)
+                self.unsynced += len(header)
+        return self._file
+
+    def sync(self) -> bool:
+        """Fsyncs pending writes. Returns True if there were any."""
+        with self.lock:
+            return self._sync()
+
+    def _sync(self) -> bool:
+        if self._file is None or not self.unsynced:
+            return False
+        os.fsync(self._file.fileno())
+        self.unsynced = 0
+        return True
+
+    def compact(self) -> None:
+        with self.lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Writes the changed messages to the store and removes the journal. Caller holds the lock."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.changed_from is not None:
+            self.revision = self.store.write(self.name, self.text, self.changed_from)
+            self.changed_from = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journal_bytes = 0
+        self.unsynced = 0
+        self._clean = True
+
+    def close(self) -> None:
+        """Fsyncs and closes the journal; the next save reopens it."""
+        with self.lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+class JournalStore:
+    """
+    The discussions in a folder, each saved through its own DiscussionJournal.
+
+    Saving only appends to the journal and flushes it to the OS. A background thread
+    fsyncs pending journals every `fsync_interval` seconds, writes journals that grew
+    past `compact_bytes` or sat idle for `idle_seconds` to the store, and, when a new
+    discussion has been started, deletes all but the newest `max_files` discussions.
+    Search sees a discussion's latest messages once they reach the store.
+    """
+
+    def __init__(self, directory: str = DISCUSSION_DIR, store: DiscussionStore = None, fsync_interval: float = DISCUSSION_FSYNC_INTERVAL,
+                 compact_bytes: int = DISCUSSION_COMPACT_KB * 1024, idle_seconds: float = DISCUSSION_IDLE_SECONDS,
+                 max_files: int = DISCUSSION_MAX_FILES):
+        self.directory = directory
+        self.store = store or get_discussion_store(directory)
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+        self.idle_seconds = idle_seconds
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._journals = {}
+        self._retention_due = True  # Also enforce it once at startup
+        self._maintainer = None
+        self.stats = {"saves": 0, "unchanged": 0, "bytes_written": 0, "fsyncs": 0, "compactions": 0, "removed": 0}
+        migrate_text_files(directory, self.store)
+
+    def journal(self, name: str) -> DiscussionJournal:
+        with self._lock:
+            if name not in self._journals:
+                self._journals[name] = DiscussionJournal(self.directory, name, self.store)
+            return self._journals[name]
+
+    def load(self, name: str) -> str:
+        """The discussion's text; after the first load it is served from memory."""
+        return self.journal(name).text
+
+    def save(self, name: str, text: str) -> int:
+        """Saves the discussion, writing only what changed since the last save. Returns the bytes written."""
+        journal = self.journal(name)
+        is_new = not journal.revision and journal.changed_from is None and self.store.ensure(name)
+        written = journal.save(text)
+        with self._lock:
+            if written:
+                self.stats["saves"] += 1
+                self.stats["bytes_written"] += written
+                self._retention_due = self._retention_due or is_new
+            else:
+                self.stats["unchanged"] += 1
+        self._ensure_maintainer()
+        return written
+
+    def names(self) -> list:
+        """Saved discussion names, most recently changed first."""
+        return self.store.names()
+
+    def messages(self, name: str, offset: int = 0, limit: int = 20) -> tuple:
+        """A page of a discussion's messages and the total count, without loading the whole discussion."""
+        with self._lock:
+            journal = self._journals.get(name)
+        if journal is not None and journal.changed_from is not None:
+            messages = split_messages(journal.text)  # Ahead of the store and already in memory
+            page = [{"position": position, "speaker": message_speaker(content), "content": content}
+                    for position, content in enumerate(messages[offset:offset + limit], start=offset)]
+            return page, len(messages)
+        return self.store.messages(name, offset, limit), self.store.message_count(name)
+
+    def search(self, query: str, limit: int = 20) -> list:
+        return self.store.search(query, limit)
+
+    # --- Background maintenance ------------------------------------------------
+
+    def _ensure_maintainer(self) -> None:
+        with self._lock:
+            if self._maintainer is None or not self._maintainer.is_alive():
+                self._maintainer = threading.Thread(target=self._maintain, daemon=True)
+                self._maintainer.start()
+
+    def _maintain(self) -> None:
+        while True:
+            time.sleep(self.fsync_interval)
+            try:
+                self.maintain()
+            except (OSError, sqlite3.Error) as error:
+                print(f"Discussion journal maintenance failed: {error}")
+
+    def maintain(self) -> None:
+        """One maintenance pass: fsync, compact and enforce retention."""
+        with self._lock:
+            journals = list(self._journals.values())
+        now = time.time()
+        for journal in journals:
+            if journal.sync():
+                self._count("fsyncs")
+            idle = journal.last_write and now - journal.last_write >= self.idle_seconds
+            if journal.journal_bytes and (journal.journal_bytes >= self.compact_bytes or idle):
+                journal.compact()
+                self._count("compactions")
+        with self._lock:
+            retention_due, self._retention_due = self._retention_due, False
+        if retention_due:
+            self.enforce_retention()
+
+    def enforce_retention(self) -> None:
+        """Deletes every discussion but the newest `max_files` (0 keeps all), with their journals."""
+        if not self.max_files:
+            return
+        for name in self.store.names()[self.max_files:]:
+            with self._lock:
+                journal = self._journals.pop(name, None)
+            if journal is not None:
+                journal.close()
+            journal_path = os.path.join(self.directory, f"{name}{JOURNAL_SUFFIX}")
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+            self.store.delete(name)
+            self._count("removed")
+
+    def close(self) -> None:
+        """Fsyncs and closes every open journal."""
+        with self._lock:
+            journals = list(self._journals.values())
+        for journal in journals:
+            journal.close()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_journal_store(directory: str = DISCUSSION_DIR) -> JournalStore:
+    """Returns the process-wide journal store of a discussions folder."""
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = JournalStore(directory)
+            atexit.register(_stores[directory].close)
+        return _stores[directory]
@@ -0,0 +1,267 @@
+# TeamForgeAI/discussion_store.py
+"""
+SQLite store of saved discussions, one row per message, with an FTS5 search index.
+
+Recent changes to a discussion arrive through its journal (see discussion_journal) and
+are written here when the journal is compacted. Existing .txt discussions are imported
+automatically on first use, or explicitly with:
+
+    python TeamForgeAI/discussion_store.py migrate [--dir TeamForgeAI/files/discussions]
+    python TeamForgeAI/discussion_store.py search "query"
+"""
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+
+DISCUSSION_DIR = "TeamForgeAI/files/discussions"
+DB_NAME = "discussions.db"
+MIGRATED_DIR = "migrated"  # Imported .txt discussions are moved here
+MESSAGE_SEPARATOR = "\n\n===\n\n"  # Ends every agent response in the discussion history
+SPEAKER_PATTERN = re.compile(r"^\s*([^\n:]{1,64}):\n")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS discussions (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    discussion_id INTEGER NOT NULL REFERENCES discussions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    content TEXT NOT NULL,
+    UNIQUE (discussion_id, position)
+);
+CREATE INDEX IF NOT EXISTS discussions_updated ON discussions(updated);
+"""
+
+# External-content FTS5 index over messages, kept in step by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, speaker, content='messages', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content, speaker) VALUES (new.id, new.content, new.speaker);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content, speaker) VALUES ('delete', old.id, old.content, old.speaker);
+END;
+"""
+
+def split_messages(text: str) -> list:
+    """Splits a discussion into messages, each keeping its separator, so joining them gives back the text."""
+    parts = text.split(MESSAGE_SEPARATOR)
+    messages = [part + MESSAGE_SEPARATOR for part in parts[:-1]]
+    if parts[-1]:
+        messages.append(parts[-1])  # Not finished yet
+    return messages
+
+def message_speaker(message: str) -> str:
+    match = SPEAKER_PATTERN.match(message)
+    return match.group(1).strip() if match else ""
+
+def fts_query(query: str) -> str:
+    """Turns free text into an FTS5 query: every word must match, as a prefix, with FTS syntax quoted away."""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+class DiscussionStore:
+    """
+    Discussions as message rows in one SQLite database.
+
+    A discussion is written from the first message that changed, so appending to a long
+    discussion rewrites only its last messages. Each write bumps the discussion's revision,
+    which its journal uses to tell whether it has already been applied. The database runs
+    in WAL mode; one connection is shared by all threads behind a lock. Without FTS5 in
+    the local SQLite, search falls back to LIKE.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            try:
+                self._db.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+                print("SQLite has no FTS5; discussion search falls back to LIKE")
+
+    def _discussion(self, name: str):
+        return self._db.execute("SELECT * FROM discussions WHERE name = ?", (name,)).fetchone()
+
+    def revision(self, name: str) -> int:
+        with self._lock:
+            row = self._discussion(name)
+            return row["revision"] if row else 0
+
+    def ensure(self, name: str) -> bool:
+        """Lists a discussion before its first messages are written. Returns True if it is new."""
+        now = time.time()
+        with self._lock, self._db:
+            cursor = self._db.execute("INSERT OR IGNORE INTO discussions (name, created, updated) VALUES (?, ?, ?)", (name, now, now))
+            return cursor.rowcount == 1
+
+    def text(self, name: str) -> str:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT content FROM messages JOIN discussions ON discussions.id = messages.discussion_id "
+                "WHERE discussions.name = ? ORDER BY position", (name,)).fetchall()
+        return "".join(row["content"] for row in rows)
+
+    def write(self, name: str, text: str, changed_from: int = 0, updated: float = None) -> int:
+        """
+        Stores `text` as the discussion, rewriting messages from the one containing character
+        `changed_from` onwards (everything before it must be unchanged). Returns the new revision.
+        """
+        updated = updated or time.time()
+        with self._lock, self._db:
+            self._db.execute("INSERT OR IGNORE INTO discussions (name, created, updated) VALUES (?, ?, ?)", (name, updated, updated))
+            discussion = self._discussion(name)
+            first = self._db.execute(
+                "SELECT position, start FROM messages WHERE discussion_id = ? AND start <= ? ORDER BY position DESC LIMIT 1",
+                (discussion["id"], changed_from)).fetchone()
+            position, start = (first["position"], first["start"]) if first else (0, 0)
+            self._db.execute("DELETE FROM messages WHERE discussion_id = ? AND position >= ?", (discussion["id"], position))
+            rows = []
+            for offset, message in enumerate(split_messages(text[start:])):
+                rows.append((discussion["id"], position + offset, start, message_speaker(message), message))
+                start += len(message)
+            self._db.executemany("INSERT INTO messages (discussion_id, position, start, speaker, content) VALUES (?, ?, ?, ?, ?)", rows)
+            message_count = position + len(rows)
+            self._db.execute(
+                "UPDATE discussions SET updated = ?, revision = revision + 1, message_count = ?, size = ? WHERE id = ?",
+                (updated, message_count, len(text), discussion["id"]))
+            return discussion["revision"] + 1
+
+    def messages(self, name: str, offset: int = 0, limit: int = 20) -> list:
+        """A page of a discussion's messages as dicts with position, speaker and content."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT position, speaker, content FROM messages JOIN discussions ON discussions.id = messages.discussion_id "
+                "WHERE discussions.name = ? ORDER BY position LIMIT ? OFFSET ?", (name, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+    def message_count(self, name: str) -> int:
+        with self._lock:
+            row = self._discussion(name)
+            return row["message_count"] if row else 0
+
+    def names(self, limit: int = None) -> list:
+        """Discussion names, most recently updated first."""
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM discussions ORDER BY updated DESC LIMIT ?", (limit or -1,)).fetchall()
+        return [row["name"] for row in rows]
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Best matching messages across all discussions: dicts with name, position, speaker and snippet."""
+        if self.fts:
+            match = fts_query(query)
+            if not match:
+                return []
+            sql = ("SELECT discussions.name, messages.position, messages.speaker, "
+                   "snippet(messages_fts, 0, '**', '**', '…', 16) AS snippet "
+                   "FROM messages_fts JOIN messages ON messages.id = messages_fts.rowid "
+                   "JOIN discussions ON discussions.id = messages.discussion_id "
+                   "WHERE messages_fts MATCH ? ORDER BY rank LIMIT ?")
+            parameters = (match, limit)
+        else:
+            if not query.strip():
+                return []
+            sql = ("SELECT discussions.name, messages.position, messages.speaker, substr(messages.content, 1, 200) AS snippet "
+                   "FROM messages JOIN discussions ON discussions.id = messages.discussion_id "
+                   "WHERE messages.content LIKE ? ORDER BY discussions.updated DESC LIMIT ?")
+            parameters = (f"%{query.strip()}%", limit)
+        with self._lock:
+            rows = self._db.execute(sql, parameters).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, name: str) -> None:
+        with self._lock, self._db:
+            row = self._discussion(name)
+            if row:
+                self._db.execute("DELETE FROM messages WHERE discussion_id = ?", (row["id"],))
+                self._db.execute("DELETE FROM discussions WHERE id = ?", (row["id"],))
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) AS discussions, COALESCE(SUM(message_count), 0) AS messages, COALESCE(SUM(size), 0) AS size FROM discussions").fetchone()
+        return dict(row)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_discussion_store(directory: str = DISCUSSION_DIR) -> DiscussionStore:
+    """Returns the process-wide store of a discussions folder."""
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = DiscussionStore(os.path.join(directory, DB_NAME))
+        return _stores[directory]
+
+def migrate_text_files(directory: str, store: DiscussionStore, overwrite: bool = False) -> list:
+    """
+    Imports the folder's .txt discussions into the store and moves them to `migrated/`.
+
+    Discussions already in the store are skipped unless `overwrite` is set. Returns the
+    imported names.
+    """
+    if not os.path.isdir(directory):
+        return []
+    imported = []
+    known = set(store.names())
+    with os.scandir(directory) as scan:
+        text_files = [entry for entry in scan if entry.is_file() and entry.name.endswith(".txt")]
+    for entry in text_files:
+        name = entry.name[:-len(".txt")]
+        if name not in known or overwrite:
+            with open(entry.path, "r", encoding="utf-8") as file:
+                text = file.read()
+            store.delete(name)
+            store.write(name, text, updated=entry.stat().st_mtime)
+            imported.append(name)
+        migrated_dir = os.path.join(directory, MIGRATED_DIR)
+        os.makedirs(migrated_dir, exist_ok=True)
+        shutil.move(entry.path, os.path.join(migrated_dir, entry.name))
+    return imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the SQLite store of saved discussions.")
+    parser.add_argument("--dir", default=DISCUSSION_DIR, help="Discussions folder")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Import the folder's .txt discussions")
+    migrate.add_argument("--overwrite", action="store_true", help="Replace discussions already in the store")
+    search = commands.add_parser("search", help="Search every stored discussion")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    store = get_discussion_store(args.dir)
+    if args.command == "migrate":
+        imported = migrate_text_files(args.dir, store, overwrite=args.overwrite)
+        stats = store.stats()
+        print(f"Imported {len(imported)} discussions; the store holds {stats['discussions']} discussions, {stats['messages']} messages.")
+    else:
+        for result in store.search(args.query, args.limit):
+            print(f"{result['name']} #{result['position']} {result['speaker']}: {result['snippet']}")
+
+if __name__ == "__main__":
+    main()
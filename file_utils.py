@@ -4,6 +4,8 @@ import os
 import random
 
 from agent_creation import create_autogen_agent # Import from agent_creation.py
+from agent_registry import get_agent_registry
+from skill_registry import get_skill_registry
 
 def sanitize_text(text: str) -> str:
     """Sanitizes the provided text by removing non-printable characters."""
@@ -11,7 +13,7 @@ def sanitize_text(text: str) -> str:
 
 emoji_list = ["🐶", "🐱", "🐭", "🐹", "🐰", "🦊", "🐻", "🐼", "🐻‍❄️", "🐨", "🐯", "🦁", "🐮", "🐷", "🐸", "🐵", "🐔", "🐧", "🐦", "🐤", "🐣", "🐥", "🦆", "🦅", "🦉", "🦇", "🐺", "🐗", "🐴", "🦄", "🐝", "🐛", "🦋", "🐌", "🐞", "🐜", "🪲", "🪳", "🪰", "🪱", "🐢", "🐍", "🦎", "🦖", "🦕", "🐙", "🦑", "🦐", "🦞", "🦀", "🐡", "🐠", "🐟", "🐬", "🐳", "🐋", "🦈", "🐊", "🐅", "🐆", "🦓", "🦍", "🦧", "🦣", "🐘", "🦏", "🦛", "🐪", "🐫", "🦒", "🦘", "🦬", "🐃", "🐂", "🐄", "🐎", "🐖", "🐏", "🐑", "🦙", "🐐", "🦌", "🦝", "🦡", "🦃", "🦚", "🦜", "🦢", "🦩", "🕊️", "🦤", "🐉", "🐲", "🌵"]
 
-def create_agent_data(expert_name: str, description: str, skills: list = None, tools: list = None, enable_reading_html: bool = False, ollama_url: str = "http://localhost:11434", temperature: float = 0.10, model: str = "mistral:instruct", db_path: str = None, enable_memory: bool = False, moa_role: str = "proposer") -> tuple:
+def create_agent_data(expert_name: str, description: str, skills: list = None, tools: list = None, enable_reading_html: bool = False, ollama_url: str = "http://localhost:11434", temperature: float = 0.10, model: str = "mistral:instruct", db_path: str = None, enable_memory: bool = False, moa_role: str = "proposer", ollama_pool: str = None) -> tuple:
     """
     Creates agent data for both AutoGen and CrewAI agents.
 
@@ -27,6 +29,7 @@ def create_agent_data(expert_name: str, description: str, skills: list = None, t
         db_path (str, optional): The path to the agent's database. Defaults to None.
         enable_memory (bool, optional): Whether to enable memory for the agent. Defaults to False.
         moa_role (str, optional): The role of the agent in the MoA workflow. Defaults to "proposer".
+        ollama_pool (str, optional): A pool name from config.OLLAMA_POOLS; when set, requests are routed across the pool instead of ollama_url. Defaults to None.
 
     Returns:
         tuple: A tuple containing the AutoGen agent data and the CrewAI agent data.
@@ -69,6 +72,7 @@ def create_agent_data(expert_name: str, description: str, skills: list = None, t
         "tools": sanitized_tools,
         "enable_reading_html": enable_reading_html,
         "ollama_url": ollama_url, # Add agent-specific settings
+        "ollama_pool": ollama_pool, # Routed through this pool of endpoints instead of ollama_url when set
         "temperature": temperature,
         "model": model,
         "skill": sanitized_skills[0] if sanitized_skills else None,  # Add the first skill to the "skill" field
@@ -103,21 +107,12 @@ def create_workflow_data(workflow: dict) -> dict:
     return workflow
 
 def load_skills() -> dict:
-    """Loads skill functions from Python files in the 'skills' directory."""
-    skills_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "skills"))
-    skill_functions = {}
-    for filename in os.listdir(skills_dir):
-        if filename.endswith(".py") and filename != "project_management.py":  # Load Python files, exclude project_management.py
-            module_name = filename[:-3]  # Remove '.py' extension
-            try:
-                # Import the module dynamically
-                module = __import__(f"skills.{module_name}", fromlist=[module_name])
-                # Get the function from the module (assuming the function name is the same as the module name)
-                skill_function = getattr(module, module_name)
-                skill_functions[module_name] = skill_function
-            except ImportError as error:
-                print(f"Error importing skill from {filename}: {error}")
-    return skill_functions
+    """
+    The skills in the 'skills' directory, as name -> callable.
+
+    Nothing is imported here: each skill is imported on its first call (see skill_registry).
+    """
+    return get_skill_registry().skills()
 
 def save_agent_to_json(agent_data: dict, filename: str) -> None:
     """Saves agent data to a JSON file."""
@@ -130,21 +125,11 @@ def save_agent_to_json(agent_data: dict, filename: str) -> None:
         json.dump(agent_data, file, indent=4)
 
 def load_agents_from_json(directory: str) -> list:
-    """Loads agents from JSON files in the specified directory."""
+    """Loads agents from JSON files in the specified directory, through the cached agent registry."""
     # Get the absolute path to the TeamForgeAI directory
     teamforgeai_dir = os.path.dirname(os.path.dirname(__file__))
     # Construct the absolute path to the directory
     absolute_directory = os.path.join(teamforgeai_dir, directory)
-    agents = []
     if not os.path.exists(absolute_directory):
         os.makedirs(absolute_directory) # Create the directory if it doesn't exist
-    for filename in os.listdir(absolute_directory):
-        if filename.endswith('.json'):
-            filepath = os.path.join(absolute_directory, filename)
-            try:
-                with open(filepath, 'r', encoding="utf-8") as file:
-                    agent_data = json.load(file)
-                    agents.append(agent_data) # Append the agent data
-            except Exception as error:
-                print(f"Error loading agent from {filepath}: {error}")
-    return agents
+    return get_agent_registry().folder_agents(absolute_directory)
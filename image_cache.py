@@ -0,0 +1,175 @@
+# TeamForgeAI/image_cache.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from config import IMAGE_CACHE_MAX_MB
+
+IMAGE_DIR = "TeamForgeAI/files/images"  # Where the gallery looks for images
+CACHE_DIR = "TeamForgeAI/files/image_cache"  # Cached images; eviction deletes only here
+INDEX_NAME = ".image_cache.json"
+
+# Payload fields that change the rendered image; a prompt rendered again with the same values is a hit
+KEY_FIELDS = ("prompt", "negative_prompt", "width", "height", "sampler_name", "steps", "cfg_scale", "seed")
+
+def cache_key(payload: dict) -> str:
+    """Hash of the prompt and every setting that shapes the image, including the checkpoint."""
+    fields = {field: payload.get(field) for field in KEY_FIELDS}
+    fields["checkpoint"] = (payload.get("override_settings") or {}).get("sd_model_checkpoint")
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+def link_or_copy(source: str, target: str, copy: bool = False) -> None:
+    """Hard-links `source` to `target`, copying if `copy` is set or links are not supported."""
+    if not copy:
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source, target)
+
+class ImageCache:
+    """
+    Persistent, cross-session cache of generated images.
+
+    Images are stored content-addressed in a cache folder of their own: the file name is
+    the hash of the PNG bytes, so identical images are kept once. Each cached image is
+    copied into the gallery folder under the same name, and lookups return the gallery
+    paths, putting an image back if it was deleted from the gallery. An index maps each
+    prompt key to its files and is rewritten atomically after every hit and store. When the
+    cached images exceed `max_bytes`, the least recently used prompts are dropped and cache
+    files no other prompt references are deleted, which frees their disk space since the
+    gallery holds separate copies. With `max_bytes` 0 nothing is evicted and images are
+    hard-linked into the gallery instead, so each is kept on disk once.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, gallery_dir: str = IMAGE_DIR, max_bytes: int = IMAGE_CACHE_MAX_MB * 1024**2):
+        self.directory = directory
+        self.gallery_dir = gallery_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _load(self) -> dict:
+        """Index: {"entries": {key: {"prompt", "files", "created", "last_used", "hits"}}, "stats": {...}}. Caller holds the lock."""
+        if self._index is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as file:
+                    self._index = json.load(file)
+            except (OSError, ValueError):
+                self._index = {"entries": {}, "stats": {}}
+            for name in ("hits", "misses", "stored", "deduplicated", "bytes_saved", "evicted"):
+                self._index["stats"].setdefault(name, 0)
+        return self._index
+
+    def _write(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(self._index, file)
+        os.replace(temp_path, self.index_path)
+
+    def _publish(self, name: str) -> str:
+        """The gallery path of a cached image, putting it in the gallery if it is not there. Caller holds the lock."""
+        gallery_path = os.path.join(self.gallery_dir, name)
+        if not os.path.exists(gallery_path):
+            os.makedirs(self.gallery_dir, exist_ok=True)
+            link_or_copy(os.path.join(self.directory, name), gallery_path, copy=bool(self.max_bytes))
+        return gallery_path
+
+    def lookup(self, payload: dict, count: int = 1):
+        """Gallery paths of `count` cached images for this payload, or None on a miss."""
+        key = cache_key(payload)
+        with self._lock:
+            index = self._load()
+            entry = index["entries"].get(key)
+            names = [name for name in entry["files"] if os.path.exists(os.path.join(self.directory, name))] if entry else []
+            if len(names) < count:
+                index["stats"]["misses"] += 1  # Counted in memory; written with the next hit or store
+                return None
+            entry["last_used"] = time.time()
+            entry["hits"] += 1
+            index["stats"]["hits"] += 1
+            index["stats"]["bytes_saved"] += sum(os.path.getsize(os.path.join(self.directory, name)) for name in names[:count])
+            paths = [self._publish(name) for name in names[:count]]
+            self._write()
+            return paths
+
+    def store(self, payload: dict, png_bytes: bytes) -> str:
+        """Writes one image under its content hash, records it for the payload's key and returns its gallery path."""
+        name = f"{hashlib.sha256(png_bytes).hexdigest()[:32]}.png"
+        path = os.path.join(self.directory, name)
+        key = cache_key(payload)
+        with self._lock:
+            index = self._load()
+            if os.path.exists(path):
+                index["stats"]["deduplicated"] += 1
+            else:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as file:
+                    file.write(png_bytes)
+                os.replace(temp_path, path)
+                index["stats"]["stored"] += 1
+            now = time.time()
+            entry = index["entries"].setdefault(key, {"prompt": payload.get("prompt", ""), "files": [], "created": now, "last_used": now, "hits": 0})
+            if name not in entry["files"]:
+                entry["files"].append(name)
+            entry["last_used"] = now
+            gallery_path = self._publish(name)
+            self._evict(protect=key)
+            self._write()
+        return gallery_path
+
+    def _evict(self, protect: str = None) -> None:
+        """Drops least recently used prompts until the cached files fit max_bytes. Caller holds the lock."""
+        if not self.max_bytes:
+            return
+        index = self._index
+        sizes = {}
+        for entry in index["entries"].values():
+            for name in entry["files"]:
+                path = os.path.join(self.directory, name)
+                if name not in sizes:
+                    sizes[name] = os.path.getsize(path) if os.path.exists(path) else 0
+        total = sum(sizes.values())
+        for key, entry in sorted(index["entries"].items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == protect:
+                continue
+            del index["entries"][key]
+            index["stats"]["evicted"] += 1
+            still_used = {name for other in index["entries"].values() for name in other["files"]}
+            for name in entry["files"]:
+                if name not in still_used and sizes.get(name):
+                    try:
+                        os.remove(os.path.join(self.directory, name))  # The gallery has its own copy
+                    except OSError:
+                        pass
+                    total -= sizes.pop(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._load()
+            stats = dict(index["stats"])
+            stats["prompts"] = len(index["entries"])
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_image_cache() -> ImageCache:
+    """Returns the process-wide image cache shared by every Streamlit session."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
@@ -0,0 +1,241 @@
+# TeamForgeAI/image_jobs.py
+import base64
+import math
+import queue
+import threading
+import time
+import uuid
+
+import requests
+
+from config import SD_API_URL, SD_MAX_BATCH_SIZE, SD_MAX_CONCURRENT_JOBS, SD_PROGRESS_INTERVAL, SD_REQUEST_TIMEOUT
+from image_cache import ImageCache, get_image_cache
+
+# txt2img settings used unless a job overrides them
+DEFAULT_TXT2IMG = {
+    "steps": 40,
+    "cfg_scale": 7,
+    "sampler_name": "DPM++ 2M Karras",
+    "override_settings": {
+        "sd_model_checkpoint": "starlightAnimated_v3",
+    },
+}
+
+class ImageJob:
+    """One txt2img request: a scene rendered batch_size * n_iter times."""
+
+    def __init__(self, scene: str, payload: dict, team_name: str, events: queue.Queue):
+        self.id = str(uuid.uuid4())[:8]
+        self.scene = scene
+        self.payload = payload
+        self.team_name = team_name
+        self.events = events  # Shared by the jobs of one submission; see ImageJobQueue.iter_events
+        self.status = "queued"  # queued -> running -> done | failed
+        self.progress = 0.0
+        self.eta = None
+        self.image_paths = []
+        self.cached = False  # Served from the image cache without a request
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @property
+    def image_count(self) -> int:
+        return self.payload["batch_size"] * self.payload["n_iter"]
+
+class ImageJobQueue:
+    """
+    Runs image generation jobs against an automatic1111-compatible API in the background.
+
+    At most `max_concurrent` requests are in flight. The server renders one at a time, so
+    two keeps the next request waiting server-side and the GPU never idles between jobs.
+    Several images of one scene are one request, using the API's own batch_size (images per
+    pass) and n_iter (passes). While jobs run, /sdapi/v1/progress is polled and reported on
+    the oldest running job, which is the one the server is rendering. Each submission gets
+    an event queue that reports progress, every saved image and each finished job.
+    Scenes already rendered with the same settings, in any session, come from the image
+    cache without a request.
+    """
+
+    def __init__(self, base_url: str = SD_API_URL, max_concurrent: int = SD_MAX_CONCURRENT_JOBS, cache: ImageCache = None,
+                 progress_interval: float = SD_PROGRESS_INTERVAL, timeout: float = SD_REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrent = max_concurrent
+        self.cache = cache or get_image_cache()
+        self.progress_interval = progress_interval
+        self.timeout = timeout
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+        self._running = []  # Jobs with a request in flight, oldest first
+        self._workers = []
+        self._poller = None
+        self.stats = {"jobs": 0, "cached": 0, "failed": 0, "images": 0, "render_time": 0.0}
+
+    # --- Submission ------------------------------------------------------
+
+    def submit(self, scene: str, width: int = 512, height: int = 512, images: int = 1, team_name: str = "default",
+               events: queue.Queue = None, **overrides) -> ImageJob:
+        """Queues one scene; `images` are spread evenly over the fewest passes (n_iter) of up to SD_MAX_BATCH_SIZE."""
+        images = max(1, images)
+        n_iter = math.ceil(images / SD_MAX_BATCH_SIZE)
+        payload = {
+            **DEFAULT_TXT2IMG,
+            "prompt": scene,
+            "width": width,
+            "height": height,
+            "batch_size": math.ceil(images / n_iter),
+            "n_iter": n_iter,
+            **overrides,
+        }
+        job = ImageJob(scene, payload, team_name, events or queue.Queue())
+        with self._lock:
+            self.stats["jobs"] += 1
+        cached_paths = self.cache.lookup(payload, images)
+        if cached_paths:
+            job.cached = True
+            job.started_at = time.time()
+            for path in cached_paths:
+                job.image_paths.append(path)
+                job.events.put(("image", job, path))
+            self._finish(job, "done")
+            return job
+        self._pending.put(job)
+        self._ensure_workers()
+        return job
+
+    def submit_scenes(self, scenes: list, width: int = 512, height: int = 512, images_per_scene: int = 1, team_name: str = "default", **overrides) -> list:
+        """Queues several scenes as one submission. Repeated scenes become one job with more images."""
+        events = queue.Queue()
+        counts = {}
+        for scene in scenes:
+            counts[scene] = counts.get(scene, 0) + images_per_scene
+        return [self.submit(scene, width, height, count, team_name, events, **overrides) for scene, count in counts.items()]
+
+    def iter_events(self, jobs: list, timeout: float = None):
+        """
+        Yields (kind, job, detail) until the "done" or "failed" event of every job has been yielded.
+
+        kind is "progress" (detail: fraction), "image" (detail: saved path), "done" or
+        "failed" (detail: error). Jobs that finished before iteration started, such as ones
+        that failed at once, still have their events in the queue and are drained too.
+        Raises TimeoutError if nothing happens for `timeout` seconds.
+        """
+        if not jobs:
+            return
+        events = jobs[0].events
+        remaining = {job.id for job in jobs}
+        while remaining:
+            try:
+                kind, job, detail = events.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No image job progress for {timeout}s")
+            if kind in ("done", "failed"):
+                remaining.discard(job.id)
+            yield kind, job, detail
+
+    # --- Workers -----------------------------------------------------------
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.max_concurrent:
+                worker = threading.Thread(target=self._work, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            job = self._pending.get()
+            try:
+                self._run(job)
+            finally:
+                self._pending.task_done()
+
+    def _run(self, job: ImageJob) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        with self._lock:
+            self._running.append(job)
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_progress, daemon=True)
+                self._poller.start()
+        try:
+            response = requests.post(f"{self.base_url}/sdapi/v1/txt2img", json=job.payload, timeout=self.timeout)
+            response.raise_for_status()
+            encoded_images = response.json().get("images", [])
+        except (requests.exceptions.RequestException, ValueError) as error:
+            self._finish(job, "failed", str(error))
+            print(f"Image job {job.id} failed for prompt '{job.scene}': {error}")
+            return
+        with self._lock:
+            self._running.remove(job)  # The server has moved on; stop attributing progress to this job
+        try:
+            for encoded_image in encoded_images:
+                path = self._save(job, encoded_image)
+                job.image_paths.append(path)
+                job.events.put(("image", job, path))
+        except (OSError, ValueError) as error:
+            self._finish(job, "failed", f"Could not save image: {error}")
+            return
+        self._finish(job, "done")
+
+    def _save(self, job: ImageJob, encoded_image: str) -> str:
+        """Stores the PNG the server returned as-is (no decode and re-encode) in the content-addressed cache."""
+        if encoded_image.startswith("data:"):
+            encoded_image = encoded_image.split(",", 1)[1]
+        path = self.cache.store(job.payload, base64.b64decode(encoded_image))
+        print(f"Image saved to {path}")
+        return path
+
+    def _finish(self, job: ImageJob, status: str, error: str = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.progress = 1.0 if status == "done" else job.progress
+        with self._lock:
+            if job in self._running:
+                self._running.remove(job)
+            if status == "failed":
+                self.stats["failed"] += 1
+            elif job.cached:
+                self.stats["cached"] += 1
+            else:
+                self.stats["images"] += len(job.image_paths)
+                self.stats["render_time"] += job.finished_at - job.started_at
+        job.events.put((status, job, error))
+
+    def _poll_progress(self) -> None:
+        """Polls the server's progress while any request is in flight, then exits."""
+        while True:
+            with self._lock:
+                if not self._running:
+                    self._poller = None
+                    return
+                current = self._running[0]
+            try:
+                response = requests.get(f"{self.base_url}/sdapi/v1/progress", params={"skip_current_image": "true"}, timeout=10)
+                response.raise_for_status()
+                progress = response.json()
+            except (requests.exceptions.RequestException, ValueError):
+                progress = None
+            if progress is not None and current.status == "running":
+                current.progress = progress.get("progress", 0.0)
+                current.eta = progress.get("eta_relative")
+                current.events.put(("progress", current, current.progress))
+            time.sleep(self.progress_interval)
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+def get_image_job_queue(base_url: str = SD_API_URL) -> ImageJobQueue:
+    """Returns the process-wide job queue for an image generation server."""
+    base_url = base_url.rstrip("/")
+    with _queues_lock:
+        if base_url not in _queues:
+            _queues[base_url] = ImageJobQueue(base_url)
+        return _queues[base_url]
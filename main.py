@@ -73,17 +73,15 @@ if st.session_state.current_app == "TeamForgeAI":
     # Load the main TeamForgeAI app
     import config
     from datetime import datetime
-    import base64
-    import random
     import requests
     import time
-    import json
 
-    from agent_display import display_agents
+    from agent_display import display_agents, sync_team_agents
     from ui.discussion import display_discussion_and_whiteboard, update_discussion_and_whiteboard
     from ui.inputs import display_user_input, display_rephrased_request, display_user_request_input
-    from ui.utils import display_download_button, list_discussions, load_discussion_history, save_discussion_history, cleanup_old_files, handle_begin
-    from ui.virtual_office import display_virtual_office, load_background_images
+    from ui.utils import display_download_button, list_discussions, load_discussion_history, save_discussion_history, handle_begin
+    from ui.virtual_office import display_virtual_office, select_background
+    from ui.assets import get_asset_cache
 
     from current_project import CurrentProject
     from skills.update_project_status import update_project_status
@@ -92,6 +90,10 @@ if st.session_state.current_app == "TeamForgeAI":
     from autogen.agentchat.contrib.capabilities.teachability import Teachability  # Import Teachability
 
     from ollama_llm import OllamaLLM  # Import OllamaLLM from ollama_llm.py
+    from model_catalog import get_model_catalog
+    from ollama_router import get_router, resolve_ollama_url
+    from model_residency import preload_team_models, session_team
+    from turn_scheduler import TurnScheduler
     from agent_creation import create_autogen_agent # Import from agent_creation.py
 
     # Initialize session state variables if they are not already present
@@ -134,6 +136,11 @@ if st.session_state.current_app == "TeamForgeAI":
     if "auto_mode" not in st.session_state:
         st.session_state.auto_mode = False  # Auto mode is OFF by default
 
+    # Keep the shared model catalog for the chat manager endpoint warm in the background
+    get_model_catalog(st.session_state.ollama_url).start_polling()
+    # Track health, load and resident models of every pooled endpoint for agent routing
+    get_router().start_health_checks()
+
     # Ensure agents_data is initialized
     if "agents_data" not in st.session_state:
         st.session_state.agents_data = []
@@ -148,7 +155,7 @@ if st.session_state.current_app == "TeamForgeAI":
 
         def __init__(self, groupchat, **kwargs):  # Remove the ollama_llm parameter
             super().__init__(groupchat, **kwargs)
-            self.current_speaker_index = 0  # Initialize current speaker index
+            self.turn_scheduler = None  # Created on the first turn from the group chat's agents
 
         def generate_reply(self, messages, sender, config=None):
             """Overrides the generate_reply method to use the speaker's OllamaLLM."""
@@ -164,9 +171,10 @@ if st.session_state.current_app == "TeamForgeAI":
             return "\n".join([msg['content'] for msg in messages])
 
         def select_next_speaker(self, groupchat):
-            """Selects the next speaker in a round-robin fashion."""
-            self.current_speaker_index = (self.current_speaker_index + 1) % len(groupchat.agents)
-            return groupchat.agents[self.current_speaker_index]
+            """Selects the next speaker: every agent speaks once per round, with agents sharing a model batched together."""
+            if self.turn_scheduler is None or self.turn_scheduler.agents != groupchat.agents:
+                self.turn_scheduler = TurnScheduler(groupchat.agents, lambda agent: agent.ollama_llm.model)
+            return self.turn_scheduler.next_speaker()
 
         def initiate_chat_round_robin(self, initial_message):
             """Initiates the chat and ensures all agents get a turn to speak."""
@@ -177,12 +185,14 @@ if st.session_state.current_app == "TeamForgeAI":
                 messages.append({'content': reply, 'sender': current_speaker.name})
                 self.groupchat.messages.append({'sender': current_speaker.name, 'content': reply})
                 update_discussion_and_whiteboard(current_speaker.name, reply, "")  # Update discussion history
+            if self.turn_scheduler is not None:
+                print(f"Auto mode: {self.turn_scheduler.scheduled_swaps} model swaps, {self.turn_scheduler.swaps_avoided} avoided versus round-robin")
 
     def main() -> None:
         """Main function for the Streamlit app."""
 
-        # Load agents from files
-        load_agents_from_files()
+        # Sync the current team's agents from the registry; free unless their files changed
+        sync_team_agents()
 
         # Apply CSS for 100% width buttons in the sidebar
         st.sidebar.markdown("""
@@ -209,17 +219,12 @@ if st.session_state.current_app == "TeamForgeAI":
                     st.info("Auto Mode is OFF. You can interact with agents individually.")
 
         with column2:
-            # Load a random background image with a unique cache key
-            selected_background = load_background_images("TeamForgeAI/files/backgrounds", cache_key=random.random())
+            # Pick this session's background once; the asset cache resizes and encodes it once per file
+            selected_background = select_background("TeamForgeAI/files/backgrounds")
 
-            # Display the virtual office with the selected background
-            st.markdown('<div class="virtual-office-column">', unsafe_allow_html=True)
+            # Display the virtual office with the selected background; it only receives what changed
             if selected_background:
-                with open(selected_background, "rb") as file:
-                    image_data = file.read()
-                    background_image_b64 = base64.b64encode(image_data).decode("utf-8")
-                display_virtual_office(background_image_b64)
-            st.markdown('</div>', unsafe_allow_html=True)
+                display_virtual_office(get_asset_cache().url(selected_background))
 
         with st.sidebar:
             st.markdown(
@@ -244,9 +249,11 @@ if st.session_state.current_app == "TeamForgeAI":
 
             display_download_button()
 
-        # Save discussion history whenever it changes
+        # Save discussion history whenever it changes; only new text is appended to the discussion's journal
         if st.session_state.discussion_history:
-            save_discussion_history(st.session_state.discussion_history, st.session_state.selected_discussion or f"discussion_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            if not st.session_state.selected_discussion and not st.session_state.current_discussion:
+                st.session_state.current_discussion = f"discussion_{datetime.now().strftime('%Y%m%d_%H%M%S')}"  # Named once per discussion
+            save_discussion_history(st.session_state.discussion_history, st.session_state.selected_discussion or st.session_state.current_discussion)
 
         # Call summarize_project_status and display the result
         if st.session_state.discussion_history:
@@ -261,24 +268,16 @@ if st.session_state.current_app == "TeamForgeAI":
         if st.session_state.trigger_rerun:
             st.experimental_rerun()  # Trigger a rerun of the Streamlit script
 
-    def load_agents_from_files():
-        """Loads agents from JSON files in the 'agents' directory."""
-        agents_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "files", "agents"))
-        if not os.path.exists(agents_dir):
-            os.makedirs(agents_dir)
-        for filename in os.listdir(agents_dir):
-            if filename.endswith(".json"):
-                with open(os.path.join(agents_dir, filename), "r") as f:
-                    agent_data = json.load(f)
-                    # Create and append the agent
-                    st.session_state.agents_data.append(agent_data)
-
     def initiate_auto_mode():
         """Initiates the automated group chat workflow."""
         if st.session_state.agents_data and st.session_state.rephrased_request and st.session_state.current_project:
             # Disable memory for auto mode
             st.session_state.enable_chat_manager_memory = False
 
+            # Load every model the team uses up front so turns do not pay cold starts
+            with st.spinner("Loading team models..."):
+                preload_team_models(st.session_state.agents_data, resolve_ollama_url, session_team(st.session_state))
+
             # Create agents from session state, without teachability
             agents = [create_autogen_agent(agent_data) for agent_data in st.session_state.agents_data]
 
@@ -0,0 +1,511 @@
+# TeamForgeAI/mock_ollama.py
+"""
+A stand-in Ollama server for deterministic testing and benchmarking without a live daemon.
+
+Implements /api/generate, /api/chat, /api/tags, /api/show, /api/pull, /api/delete,
+/api/embeddings and /api/ps with Ollama's NDJSON streaming. Responses are derived
+from a hash of the model and prompt, so the same request always produces the same
+text. Timing behaviour (token rate, time to first token, model load delay),
+failure injection and the number of parallel request slots are all configurable.
+
+Run it from the command line:
+
+    python mock_ollama.py --port 11435 --token-rate 50 --ttft 0.2
+
+or start it in-process with `start_mock_server(port=0)` and point the app at
+`server.url`.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MODELS = ["mistral:instruct", "llama3:latest", "nomic-embed-text:latest"]
+DEFAULT_KEEP_ALIVE = 300  # Seconds a model stays loaded after its last request, like Ollama's 5m default
+WORDS = (
+    "the agent reviews a plan and writes code while another agent checks tests for errors "
+    "then the team discusses design tradeoffs data models performance and the next step "
+    "a summary is shared with the user who asks for more detail on each decision made"
+).split()
+
+class MockOllamaSettings:
+    """Tunable behaviour of the mock server."""
+
+    def __init__(
+        self,
+        models=None,
+        token_rate=100.0,
+        time_to_first_token=0.05,
+        load_delay=0.5,
+        response_tokens=64,
+        error_rate=0.0,
+        num_parallel=4,
+        max_queue=64,
+        max_loaded_models=3,
+        embedding_dimensions=768,
+        seed=0,
+    ):
+        self.models = list(models or DEFAULT_MODELS)
+        self.token_rate = token_rate  # Generated tokens per second per request
+        self.time_to_first_token = time_to_first_token  # Simulated prompt evaluation time in seconds
+        self.load_delay = load_delay  # Seconds to "load" a model that is not resident
+        self.response_tokens = response_tokens  # Tokens generated when the request sets no num_predict
+        self.error_rate = error_rate  # Fraction of requests that fail with HTTP 500
+        self.num_parallel = num_parallel  # Requests processed at once (OLLAMA_NUM_PARALLEL)
+        self.max_queue = max_queue  # Requests allowed to wait for a slot before returning 503 (OLLAMA_MAX_QUEUE)
+        self.max_loaded_models = max_loaded_models  # Least recently used models are evicted beyond this
+        self.embedding_dimensions = embedding_dimensions
+        self.seed = seed
+
+class MockOllamaState:
+    """Installed models, resident models, request slots and counters shared by all handler threads."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.models = {name: model_entry(name) for name in settings.models}
+        self.loaded = {}  # Model name -> expiry timestamp (monotonic) for keep_alive
+        self.slots = threading.Semaphore(settings.num_parallel)
+        self.waiting = 0
+        self.in_flight = 0
+        self.random = random.Random(settings.seed)
+        self.stats = {"requests": 0, "errors": 0, "rejected": 0, "loads": 0, "evictions": 0}
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.settings.error_rate
+
+    def acquire_slot(self):
+        """Waits for a processing slot, or returns False when the queue is already full."""
+        with self.lock:
+            if self.waiting >= self.settings.max_queue:
+                self.stats["rejected"] += 1
+                return False
+            self.waiting += 1
+        self.slots.acquire()
+        with self.lock:
+            self.waiting -= 1
+            self.in_flight += 1
+        return True
+
+    def release_slot(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def ensure_loaded(self, model, keep_alive):
+        """Marks a model resident and returns the simulated load time in seconds (0 when already loaded)."""
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            load_time = 0.0
+            if model not in self.loaded:
+                load_time = self.settings.load_delay
+                self.stats["loads"] += 1
+                while len(self.loaded) >= self.settings.max_loaded_models:
+                    oldest = min(self.loaded, key=self.loaded.get)
+                    del self.loaded[oldest]
+                    self.stats["evictions"] += 1
+            if keep_alive == 0:
+                self.loaded.pop(model, None)
+            else:
+                self.loaded[model] = now + (math.inf if keep_alive < 0 else keep_alive)
+        return load_time
+
+    def _expire(self, now):
+        for name in [name for name, expires in self.loaded.items() if expires <= now]:
+            del self.loaded[name]
+
+    def running_models(self):
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            running = []
+            for name, expires in self.loaded.items():
+                entry = dict(self.models.get(name) or model_entry(name))
+                remaining = 10 * 365 * 86400 if expires == math.inf else expires - now
+                entry["expires_at"] = (datetime.now(timezone.utc) + timedelta(seconds=remaining)).isoformat()
+                entry["size_vram"] = entry["size"]
+                running.append(entry)
+            return running
+
+def model_entry(name):
+    """Builds a /api/tags entry with a stable fake digest and size."""
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+    family = name.split(":")[0].split("-")[0]
+    return {
+        "name": name,
+        "model": name,
+        "modified_at": "2024-01-01T00:00:00Z",
+        "size": 1_000_000_000 + int(digest[:6], 16) * 1000,
+        "digest": digest,
+        "details": {
+            "format": "gguf",
+            "family": family,
+            "families": [family],
+            "parameter_size": "7B",
+            "quantization_level": "Q4_0",
+        },
+    }
+
+def parse_keep_alive(value):
+    """Converts an Ollama keep_alive value ("5m", "1h", 30, -1) to seconds."""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        return value
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for suffix in ("ms", "s", "m", "h"):
+        if value.endswith(suffix):
+            return float(value[: -len(suffix)]) * units[suffix]
+    return float(value)
+
+def generate_tokens(model, prompt, count):
+    """Deterministic pseudo-text for a model and prompt."""
+    rng = random.Random(hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).digest())
+    return [("" if i == 0 else " ") + rng.choice(WORDS) for i in range(count)]
+
+def embed_text(model, text, dimensions):
+    """Deterministic unit-length embedding derived from a hash of the text."""
+    values = []
+    counter = 0
+    while len(values) < dimensions:
+        digest = hashlib.sha256(f"{model}\0{counter}\0{text}".encode("utf-8")).digest()
+        values.extend(value / 2**31 - 1 for value in struct.unpack("<8I", digest))
+        counter += 1
+    values = values[:dimensions]
+    norm = math.sqrt(sum(value * value for value in values)) or 1.0
+    return [value / norm for value in values]
+
+def count_prompt_tokens(text):
+    return max(1, len(text.split()))
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # --- Response helpers -------------------------------------------------
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, message, status):
+        self.send_json({"error": message}, status)
+
+    def start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, payload):
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            return None
+
+    # --- Routing ----------------------------------------------------------
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            with self.state.lock:
+                models = list(self.state.models.values())
+            self.send_json({"models": models})
+        elif self.path == "/api/ps":
+            self.send_json({"models": self.state.running_models()})
+        elif self.path == "/api/version":
+            self.send_json({"version": "0.0.0-mock"})
+        elif self.path == "/":
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error_json("not found", 404)
+
+    def do_POST(self):
+        routes = {
+            "/api/generate": self.handle_generate,
+            "/api/chat": self.handle_chat,
+            "/api/show": self.handle_show,
+            "/api/pull": self.handle_pull,
+            "/api/embeddings": self.handle_embeddings,
+        }
+        handler = routes.get(self.path)
+        body = self.read_body()
+        if handler is None:
+            self.send_error_json("not found", 404)
+        elif body is None:
+            self.send_error_json("invalid JSON body", 400)
+        else:
+            handler(body)
+
+    def do_DELETE(self):
+        if self.path != "/api/delete":
+            self.send_error_json("not found", 404)
+            return
+        body = self.read_body() or {}
+        name = body.get("name") or body.get("model")
+        with self.state.lock:
+            removed = self.state.models.pop(name, None)
+            self.state.loaded.pop(name, None)
+        if removed is None:
+            self.send_error_json(f"model '{name}' not found", 404)
+        else:
+            self.send_json({})
+
+    # --- Endpoints --------------------------------------------------------
+
+    def handle_generate(self, body):
+        self.run_completion(body, body.get("prompt", ""), chat=False)
+
+    def handle_chat(self, body):
+        prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+        self.run_completion(body, prompt, chat=True)
+
+    def run_completion(self, body, prompt, chat):
+        """Shared generate/chat path: admission, model load, prompt evaluation, then paced token output."""
+        model = body.get("model")
+        with self.state.lock:
+            self.state.stats["requests"] += 1
+            known = model in self.state.models
+        if not known:
+            self.send_error_json(f"model '{model}' not found, try pulling it first", 404)
+            return
+        if not self.state.acquire_slot():
+            self.send_error_json("server busy, please try again. maximum pending requests exceeded", 503)
+            return
+        try:
+            if self.state.should_fail():
+                with self.state.lock:
+                    self.state.stats["errors"] += 1
+                self.send_error_json("mock failure injected by error_rate", 500)
+                return
+            self.stream_completion(body, model, prompt, chat)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away mid-stream
+        finally:
+            self.state.release_slot()
+
+    def stream_completion(self, body, model, prompt, chat):
+        settings = self.state.settings
+        started = time.perf_counter()
+        load_time = self.state.ensure_loaded(model, parse_keep_alive(body.get("keep_alive")))
+        time.sleep(load_time)
+
+        if not prompt:
+            # Like Ollama, an empty prompt only loads the model: one done chunk, even when streaming
+            final = self.completion_part(model, "", chat, done=True)
+            final.update({
+                "done_reason": "load",
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "load_duration": int(load_time * 1e9),
+            })
+            self.send_json(final)
+            return
+
+        options = body.get("options") or {}
+        token_count = options.get("num_predict") or settings.response_tokens
+        token_count = settings.response_tokens if token_count < 0 else token_count
+        tokens = generate_tokens(model, prompt, token_count)
+        prompt_eval_count = count_prompt_tokens(prompt)
+
+        prompt_started = time.perf_counter()
+        time.sleep(settings.time_to_first_token)
+        prompt_eval_duration = time.perf_counter() - prompt_started
+
+        stream = body.get("stream", True)
+        if stream:
+            self.start_stream()
+        eval_started = time.perf_counter()
+        interval = 1.0 / settings.token_rate if settings.token_rate > 0 else 0.0
+        for i, token in enumerate(tokens):
+            if interval:
+                # Pace against the start time so per-token sleep overhead does not drift the rate
+                delay = eval_started + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if stream:
+                self.write_chunk(self.completion_part(model, token, chat, done=False))
+        eval_duration = time.perf_counter() - eval_started
+
+        final = self.completion_part(model, "" if stream else "".join(tokens), chat, done=True)
+        final.update({
+            "done_reason": "length" if options.get("num_predict") else "stop",
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": int(load_time * 1e9),
+            "prompt_eval_count": prompt_eval_count,
+            "prompt_eval_duration": int(prompt_eval_duration * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int(eval_duration * 1e9),
+        })
+        if not chat:
+            final["context"] = list(range(prompt_eval_count + len(tokens)))
+        if stream:
+            self.write_chunk(final)
+            self.end_stream()
+        else:
+            self.send_json(final)
+
+    @staticmethod
+    def completion_part(model, text, chat, done):
+        part = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+        if chat:
+            part["message"] = {"role": "assistant", "content": text}
+        else:
+            part["response"] = text
+        return part
+
+    def handle_show(self, body):
+        name = body.get("name") or body.get("model")
+        with self.state.lock:
+            entry = self.state.models.get(name)
+        if entry is None:
+            self.send_error_json(f"model '{name}' not found", 404)
+            return
+        family = entry["details"]["family"]
+        self.send_json({
+            "modelfile": f"FROM {name}",
+            "parameters": "stop \"[INST]\"\nstop \"[/INST]\"",
+            "template": "{{ .Prompt }}",
+            "details": entry["details"],
+            "model_info": {
+                "general.architecture": family,
+                "general.parameter_count": 7_000_000_000,
+                f"{family}.context_length": 8192,
+                f"{family}.embedding_length": self.state.settings.embedding_dimensions,
+            },
+        })
+
+    def handle_pull(self, body):
+        name = body.get("name") or body.get("model")
+        if not name:
+            self.send_error_json("model name is required", 400)
+            return
+        entry = model_entry(name)
+        statuses = [{"status": "pulling manifest"}]
+        total = entry["size"]
+        for completed in (total // 4, total // 2, total * 3 // 4, total):
+            statuses.append({"status": f"pulling {entry['digest'][:12]}", "digest": f"sha256:{entry['digest']}", "total": total, "completed": completed})
+        statuses += [{"status": "verifying sha256 digest"}, {"status": "writing manifest"}, {"status": "success"}]
+        with self.state.lock:
+            self.state.models.setdefault(name, entry)
+        if body.get("stream", True):
+            self.start_stream()
+            for status in statuses:
+                self.write_chunk(status)
+            self.end_stream()
+        else:
+            self.send_json({"status": "success"})
+
+    def handle_embeddings(self, body):
+        model = body.get("model")
+        with self.state.lock:
+            known = model in self.state.models
+        if not known:
+            self.send_error_json(f"model '{model}' not found, try pulling it first", 404)
+            return
+        self.state.ensure_loaded(model, parse_keep_alive(body.get("keep_alive")))
+        self.send_json({"embedding": embed_text(model, body.get("prompt", ""), self.state.settings.embedding_dimensions)})
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=11435, settings=None, verbose=False):
+        super().__init__((host, port), MockOllamaHandler)
+        self.state = MockOllamaState(settings or MockOllamaSettings())
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves on a daemon thread and returns immediately."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def start_mock_server(host="127.0.0.1", port=0, verbose=False, **settings):
+    """Starts a mock server in the background. Port 0 picks a free port; read it back from `server.url`."""
+    return MockOllamaServer(host, port, MockOllamaSettings(**settings), verbose=verbose).start()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Ollama server for deterministic testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, help="Installed model names")
+    parser.add_argument("--token-rate", type=float, default=100.0, help="Generated tokens per second per request (0 = unthrottled)")
+    parser.add_argument("--ttft", type=float, default=0.05, help="Simulated prompt evaluation time in seconds")
+    parser.add_argument("--load-delay", type=float, default=0.5, help="Seconds to load a model that is not resident")
+    parser.add_argument("--response-tokens", type=int, default=64, help="Tokens generated when num_predict is not set")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with HTTP 500")
+    parser.add_argument("--num-parallel", type=int, default=4, help="Requests processed concurrently")
+    parser.add_argument("--max-queue", type=int, default=64, help="Requests allowed to wait before HTTP 503")
+    parser.add_argument("--max-loaded-models", type=int, default=3)
+    parser.add_argument("--embedding-dimensions", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=0, help="Seed for error injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    settings = MockOllamaSettings(
+        models=args.models,
+        token_rate=args.token_rate,
+        time_to_first_token=args.ttft,
+        load_delay=args.load_delay,
+        response_tokens=args.response_tokens,
+        error_rate=args.error_rate,
+        num_parallel=args.num_parallel,
+        max_queue=args.max_queue,
+        max_loaded_models=args.max_loaded_models,
+        embedding_dimensions=args.embedding_dimensions,
+        seed=args.seed,
+    )
+    server = MockOllamaServer(args.host, args.port, settings, verbose=args.verbose)
+    print(f"Mock Ollama server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# TeamForgeAI/mock_sd.py
+"""
+A stand-in automatic1111 (Stable Diffusion web UI) API server for testing image generation.
+
+Implements /sdapi/v1/txt2img, /sdapi/v1/progress, /sdapi/v1/sd-models and
+/sdapi/v1/options. Like the real server it renders one request at a time; others
+wait in line. Each request takes `step_delay` seconds per sampling step for every
+batch (n_iter) and returns batch_size * n_iter small solid-colour PNGs whose colour is
+derived from the prompt. Progress reports the running request's fraction and ETA.
+
+    python mock_sd.py --port 7861 --step-delay 0.02
+
+or start it in-process with `start_mock_server(port=0)` and point SD_API_URL at `server.url`.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CHECKPOINTS = ["starlightAnimated_v3", "v1-5-pruned-emaonly"]
+
+class MockSDSettings:
+    """Tunable behaviour of the mock server."""
+
+    def __init__(self, step_delay=0.01, image_size=64, error_rate=0.0, checkpoints=None, seed=0):
+        self.step_delay = step_delay  # Seconds per sampling step per batch
+        self.image_size = image_size  # Side of the returned PNGs, whatever size was requested
+        self.error_rate = error_rate  # Fraction of requests that fail with HTTP 500
+        self.checkpoints = list(checkpoints or DEFAULT_CHECKPOINTS)
+        self.seed = seed
+
+class MockSDState:
+    """The render lock and the progress of the request holding it."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.render_lock = threading.Lock()  # The real server renders one request at a time
+        self.lock = threading.Lock()
+        self.progress = 0.0
+        self.eta = 0.0
+        self.job_count = 0
+        self.queued = 0
+        self.requests = 0
+        self.images = 0
+        self.random = random.Random(settings.seed)
+
+def solid_png(size, rgb):
+    """A size x size PNG of one colour, built without an imaging library."""
+    row = b"\x00" + bytes(rgb) * size
+    raw = zlib.compress(row * size)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", raw) + chunk(b"IEND", b"")
+
+def prompt_color(prompt, index):
+    digest = hashlib.sha256(f"{prompt}:{index}".encode("utf-8")).digest()
+    return digest[0], digest[1], digest[2]
+
+class MockSDHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self):
+        state = self.state
+        if self.path.startswith("/sdapi/v1/progress"):
+            with state.lock:
+                self.send_json({
+                    "progress": state.progress,
+                    "eta_relative": state.eta,
+                    "state": {"job_count": state.job_count, "queued": state.queued},
+                    "current_image": None,
+                })
+        elif self.path == "/sdapi/v1/sd-models":
+            self.send_json([{"title": name, "model_name": name} for name in state.settings.checkpoints])
+        elif self.path == "/sdapi/v1/options":
+            self.send_json({"sd_model_checkpoint": state.settings.checkpoints[0]})
+        else:
+            self.send_json({"detail": "Not Found"}, 404)
+
+    def do_POST(self):
+        if self.path == "/sdapi/v1/txt2img":
+            self.handle_txt2img(self.read_body())
+        elif self.path == "/sdapi/v1/options":
+            self.read_body()
+            self.send_json(None)
+        else:
+            self.send_json({"detail": "Not Found"}, 404)
+
+    def handle_txt2img(self, body):
+        state = self.state
+        settings = state.settings
+        with state.lock:
+            state.requests += 1
+            state.queued += 1
+            fail = settings.error_rate > 0 and state.random.random() < settings.error_rate
+        with state.render_lock:
+            with state.lock:
+                state.queued -= 1
+                state.job_count = 1
+            steps = int(body.get("steps", 20))
+            batch_size = int(body.get("batch_size", 1))
+            n_iter = int(body.get("n_iter", 1))
+            total = max(1, steps * n_iter)
+            for done in range(total):
+                time.sleep(settings.step_delay)
+                with state.lock:
+                    state.progress = (done + 1) / total
+                    state.eta = (total - done - 1) * settings.step_delay
+            with state.lock:
+                state.progress = 0.0
+                state.eta = 0.0
+                state.job_count = 0
+        if fail:
+            self.send_json({"error": "RuntimeError", "detail": "Injected failure"}, 500)
+            return
+        count = batch_size * n_iter
+        images = [base64.b64encode(solid_png(settings.image_size, prompt_color(body.get("prompt", ""), index))).decode("ascii") for index in range(count)]
+        with state.lock:
+            state.images += count
+        self.send_json({"images": images, "parameters": body, "info": json.dumps({"prompt": body.get("prompt", "")})})
+
+class MockSDServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=7861, settings=None, verbose=False):
+        super().__init__((host, port), MockSDHandler)
+        self.state = MockSDState(settings or MockSDSettings())
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves on a daemon thread and returns immediately."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def start_mock_server(host="127.0.0.1", port=0, verbose=False, **settings):
+    """Starts a mock server in the background. Port 0 picks a free port; read it back from `server.url`."""
+    return MockSDServer(host, port, MockSDSettings(**settings), verbose=verbose).start()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock automatic1111 API server for testing image generation.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7861)
+    parser.add_argument("--step-delay", type=float, default=0.01, help="Seconds per sampling step per batch")
+    parser.add_argument("--image-size", type=int, default=64, help="Side of the returned PNGs in pixels")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with HTTP 500")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for error injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    settings = MockSDSettings(step_delay=args.step_delay, image_size=args.image_size, error_rate=args.error_rate, seed=args.seed)
+    server = MockSDServer(args.host, args.port, settings, verbose=args.verbose)
+    print(f"Mock automatic1111 server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# TeamForgeAI/model_catalog.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+CATALOG_TTL = 60  # Seconds before the model list is considered stale
+DETAILS_WORKERS = 4  # Concurrent /api/show requests when enriching models
+
+class ModelCatalog:
+    """
+    A TTL-cached view of the models installed on one Ollama host.
+
+    Fresh data is served from memory. Once the TTL has passed, the stale list is
+    still returned immediately while a background thread refreshes it, so callers
+    never block on /api/tags unless nothing has been fetched yet or the catalog
+    was explicitly invalidated (e.g. after a pull or remove).
+    """
+
+    def __init__(self, ollama_url: str = DEFAULT_OLLAMA_URL, ttl: float = CATALOG_TTL, timeout: int = 120):
+        self.ollama_url = ollama_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = None  # Raw /api/tags entries
+        self._details = {}  # Model name -> (digest, /api/show response)
+        self._fetched_at = 0.0
+        self._generation = 0  # Bumped by invalidate(); a fetch started before it is not stored
+        self._refresh_thread = None
+        self._poll_thread = None
+        self._stop_polling = threading.Event()
+
+    def _fetch_entries(self, timeout: int = None) -> list:
+        response = requests.get(f"{self.ollama_url}/api/tags", timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+    def refresh(self, timeout: int = None) -> list:
+        """
+        Fetches the model list now and drops details of models that were removed or changed.
+
+        `timeout` applies to this fetch only; by default the catalog's own is used. If the
+        catalog is invalidated while the fetch is in flight, the result may predate the
+        change that caused it, so it is returned but not stored.
+        """
+        with self._lock:
+            generation = self._generation
+        entries = self._fetch_entries(timeout)
+        digests = {entry["name"]: entry.get("digest") for entry in entries}
+        with self._lock:
+            if generation != self._generation:
+                return entries
+            self._entries = entries
+            self._fetched_at = time.monotonic()
+            self._details = {
+                name: cached for name, cached in self._details.items()
+                if name in digests and cached[0] == digests[name]
+            }
+        return entries
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._background_refresh, daemon=True)
+            self._refresh_thread.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except requests.exceptions.RequestException as error:
+            print(f"Error refreshing model catalog for {self.ollama_url}: {error}")
+
+    def get_model_entries(self, timeout: int = None) -> list:
+        """Returns the raw /api/tags entries, fetching synchronously (within `timeout`) only when nothing is cached."""
+        with self._lock:
+            entries = self._entries
+            is_stale = time.monotonic() - self._fetched_at > self.ttl
+        if entries is None:
+            return self.refresh(timeout)
+        if is_stale:
+            self._refresh_in_background()
+        return entries
+
+    def get_models(self, include_embed: bool = False, timeout: int = None) -> list:
+        """Returns the sorted model names, excluding embedding models unless asked for."""
+        return sorted(
+            entry["name"] for entry in self.get_model_entries(timeout)
+            if include_embed or "embed" not in entry["name"]
+        )
+
+    def invalidate(self) -> None:
+        """Forgets the model list so the next lookup fetches it again."""
+        with self._lock:
+            self._entries = None
+            self._fetched_at = 0.0
+            self._generation += 1
+
+    def _fetch_details(self, model_name: str) -> dict:
+        response = requests.post(f"{self.ollama_url}/api/show", json={"name": model_name}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_details(self, model_names: list = None) -> dict:
+        """Returns /api/show metadata per model, fetching the missing ones concurrently."""
+        entries = {entry["name"]: entry.get("digest") for entry in self.get_model_entries()}
+        model_names = list(entries) if model_names is None else list(model_names)
+        with self._lock:
+            missing = [name for name in model_names if name not in self._details]
+        if missing:
+            with ThreadPoolExecutor(max_workers=DETAILS_WORKERS) as executor:
+                fetched = dict(zip(missing, executor.map(self._fetch_details, missing)))
+            with self._lock:
+                for name, details in fetched.items():
+                    self._details[name] = (entries.get(name), details)
+        with self._lock:
+            return {name: self._details[name][1] for name in model_names if name in self._details}
+
+    def start_polling(self, interval: float = None) -> None:
+        """Keeps the catalog warm by refreshing it every `interval` seconds on a daemon thread."""
+        interval = interval or self.ttl
+        if self._poll_thread is not None and self._poll_thread.is_alive():
+            return
+        self._stop_polling.clear()
+
+        def poll() -> None:
+            while not self._stop_polling.wait(interval):
+                self._background_refresh()
+
+        self._poll_thread = threading.Thread(target=poll, daemon=True)
+        self._poll_thread.start()
+
+    def stop_polling(self) -> None:
+        self._stop_polling.set()
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def normalize_ollama_url(ollama_url: str) -> str:
+    """Strips trailing slashes and an '/api' suffix so every caller shares one catalog per host."""
+    ollama_url = (ollama_url or DEFAULT_OLLAMA_URL).rstrip("/")
+    if ollama_url.endswith("/api"):
+        ollama_url = ollama_url[: -len("/api")]
+    return ollama_url
+
+def get_model_catalog(ollama_url: str = DEFAULT_OLLAMA_URL) -> ModelCatalog:
+    """Returns the process-wide catalog for an Ollama host."""
+    ollama_url = normalize_ollama_url(ollama_url)
+    with _catalogs_lock:
+        if ollama_url not in _catalogs:
+            _catalogs[ollama_url] = ModelCatalog(ollama_url)
+        return _catalogs[ollama_url]
+
+def invalidate_model_catalog(ollama_url: str = None) -> None:
+    """Invalidates one host's catalog, or all of them when no URL is given."""
+    with _catalogs_lock:
+        catalogs = list(_catalogs.values()) if ollama_url is None else [_catalogs.get(normalize_ollama_url(ollama_url))]
+    for catalog in catalogs:
+        if catalog is not None:
+            catalog.invalidate()
@@ -0,0 +1,243 @@
+# TeamForgeAI/model_residency.py
+import threading
+import time
+import uuid
+from collections import deque
+
+import requests
+
+from config import OLLAMA_MAX_LOADED_MODELS, OLLAMA_MEMORY_BUDGET_GB, OLLAMA_TEAM_KEEP_ALIVE
+from model_catalog import get_model_catalog, normalize_ollama_url
+from request_scheduler import RequestCancelled, get_request_scheduler
+
+COLD_LOAD_THRESHOLD = 0.5  # Seconds of load_duration above which a request counts as a cold load
+MEMORY_OVERHEAD = 1.2  # Estimated loaded size per byte on disk, for models never seen in /api/ps
+MAX_LOAD_EVENTS = 200
+PRELOAD_TIMEOUT = 600
+WORKING_SET_IDLE_SECONDS = 3600  # A team's working set is dropped after this long without a preload or request
+DEFAULT_TEAM = "default"
+
+class ResidencyManager:
+    """
+    Keeps the models of the teams using one Ollama host loaded.
+
+    It reads /api/ps to see what is resident, preloads the models a run needs, hands out
+    a longer keep_alive for those models, and predicts which resident models a load would
+    evict based on model sizes and the host's memory budget. Each team (one per session
+    that runs it) has its own working set, so concurrent sessions do not replace each
+    other's; a model in any current working set gets the team keep_alive. Preloads queue
+    in the request scheduler as background work, behind interactive turns. Every load is recorded so cold
+    starts show up as metrics instead of unexplained latency.
+    """
+
+    def __init__(self, ollama_url: str, keep_alive: str = OLLAMA_TEAM_KEEP_ALIVE, memory_budget: float = None, max_loaded_models: int = OLLAMA_MAX_LOADED_MODELS):
+        self.ollama_url = ollama_url
+        self.keep_alive = keep_alive
+        self.configured_budget = memory_budget if memory_budget is not None else (OLLAMA_MEMORY_BUDGET_GB * 1024**3 if OLLAMA_MEMORY_BUDGET_GB else None)
+        self.max_loaded_models = max_loaded_models
+        self.working_sets = {}  # Team -> (models its current run needs, last used); they get self.keep_alive
+        self._lock = threading.Lock()
+        self._observed_sizes = {}  # Model name -> loaded size reported by /api/ps
+        self._largest_resident_total = 0  # Peak resident memory seen; only reported, too low to plan with
+        self.load_events = deque(maxlen=MAX_LOAD_EVENTS)
+        self.requests = 0
+        self.cold_loads = 0
+        self.total_load_time = 0.0
+
+    # --- Host state -------------------------------------------------------
+
+    def running_models(self) -> list:
+        """Returns the /api/ps entries, remembering their loaded sizes for later estimates."""
+        response = requests.get(f"{self.ollama_url}/api/ps", timeout=10)
+        response.raise_for_status()
+        models = response.json().get("models", [])
+        with self._lock:
+            for entry in models:
+                self._observed_sizes[entry["name"]] = entry.get("size", 0)
+            self._largest_resident_total = max(self._largest_resident_total, sum(entry.get("size", 0) for entry in models))
+        return models
+
+    def estimated_size(self, model: str, catalog_sizes: dict) -> int:
+        with self._lock:
+            if model in self._observed_sizes:
+                return self._observed_sizes[model]
+        return int(catalog_sizes.get(model, 0) * MEMORY_OVERHEAD)
+
+    @property
+    def memory_budget(self):
+        """Configured budget in bytes, or None; without one only the loaded-model limit is enforced."""
+        return self.configured_budget
+
+    def plan(self, models: list) -> dict:
+        """
+        Predicts what loading `models` would do on this host.
+
+        Resident models outside the request are evicted oldest-expiry first, which is how
+        Ollama picks a victim, until both the memory budget and the loaded-model limit fit.
+        """
+        models = list(dict.fromkeys(models))
+        running = self.running_models()
+        catalog_sizes = {entry["name"]: entry.get("size", 0) for entry in get_model_catalog(self.ollama_url).get_model_entries()}
+        resident = {entry["name"]: entry for entry in running}
+        to_load = [model for model in models if model not in resident]
+        sizes = {model: self.estimated_size(model, catalog_sizes) for model in models}
+        required = sum(sizes.values())
+
+        budget = self.memory_budget
+        loaded_total = sum(entry.get("size", 0) for entry in running) + sum(sizes[model] for model in to_load)
+        loaded_count = len(resident) + len(to_load)
+        evictions = []
+        for entry in sorted(running, key=lambda entry: entry.get("expires_at", "")):
+            over_memory = budget is not None and loaded_total > budget
+            over_count = loaded_count > self.max_loaded_models
+            if not (over_memory or over_count):
+                break
+            if entry["name"] in models:
+                continue
+            evictions.append(entry["name"])
+            loaded_total -= entry.get("size", 0)
+            loaded_count -= 1
+
+        return {
+            "models": models,
+            "resident": [model for model in models if model in resident],
+            "to_load": to_load,
+            "evictions": evictions,
+            "sizes": sizes,
+            "required": required,
+            "memory_budget": budget,
+            "observed_peak": self._largest_resident_total,
+            "fits": (budget is None or required <= budget) and len(models) <= self.max_loaded_models,
+        }
+
+    # --- Preloading and keep_alive ------------------------------------------
+
+    def preload(self, models: list, team: str = DEFAULT_TEAM) -> dict:
+        """
+        Loads the models a run needs before it starts and marks them as the working set.
+
+        An empty generate request loads a model without producing tokens. When the whole set
+        cannot fit, only as many models as fit are loaded, in the given order, so the run does
+        not start by evicting its own models.
+        """
+        models = [model for model in dict.fromkeys(models) if model]
+        with self._lock:
+            self.working_sets[team] = (set(models), time.time())
+        try:
+            plan = self.plan(models)
+        except requests.exceptions.RequestException as error:
+            print(f"Could not plan model residency on {self.ollama_url}: {error}")
+            return {"plan": None, "loaded": [], "errors": {}}
+
+        to_load = plan["to_load"]
+        if not plan["fits"]:
+            budget = plan["memory_budget"]
+            room = self.max_loaded_models - len(plan["resident"])
+            used = sum(plan["sizes"][model] for model in plan["resident"])
+            fitting = []
+            for model in to_load:
+                if room <= 0 or (budget is not None and used + plan["sizes"][model] > budget):
+                    break
+                fitting.append(model)
+                room -= 1
+                used += plan["sizes"][model]
+            to_load = fitting
+
+        loaded, errors = [], {}
+        for model in to_load:
+            try:
+                with get_request_scheduler().slot("background", label=f"preload {model}", host=self.ollama_url):
+                    started = time.perf_counter()
+                    response = requests.post(
+                        f"{self.ollama_url}/api/generate",
+                        json={"model": model, "prompt": "", "stream": False, "keep_alive": self.keep_alive},
+                        timeout=PRELOAD_TIMEOUT,
+                    )
+                    response.raise_for_status()
+                load_duration = response.json().get("load_duration")
+                seconds = load_duration / 1e9 if load_duration else time.perf_counter() - started
+                self.record_load(model, seconds, "preload")
+                loaded.append(model)
+            except RequestCancelled as error:
+                errors[model] = str(error)  # An interactive turn needed the host; the model loads on first use
+            except requests.exceptions.RequestException as error:
+                errors[model] = str(error)
+                print(f"Failed to preload {model} on {self.ollama_url}: {error}")
+        return {"plan": plan, "loaded": loaded, "errors": errors}
+
+    def keep_alive_for(self, model: str):
+        """keep_alive to send with a request: the team value for models in a working set, else Ollama's default."""
+        now = time.time()
+        with self._lock:
+            for team, (models, last_used) in list(self.working_sets.items()):
+                if now - last_used > WORKING_SET_IDLE_SECONDS:
+                    del self.working_sets[team]  # That team's run is over
+                elif model in models:
+                    self.working_sets[team] = (models, now)
+                    return self.keep_alive
+            return None
+
+    # --- Metrics ----------------------------------------------------------
+
+    def record_load(self, model: str, seconds: float, source: str) -> None:
+        with self._lock:
+            self.cold_loads += 1
+            self.total_load_time += seconds
+            self.load_events.append({"time": time.time(), "model": model, "seconds": seconds, "source": source})
+
+    def record_request(self, model: str, load_duration_ns) -> None:
+        """Counts a finished request and logs a load event when its load_duration shows a cold start."""
+        with self._lock:
+            self.requests += 1
+        seconds = (load_duration_ns or 0) / 1e9
+        if seconds >= COLD_LOAD_THRESHOLD:
+            self.record_load(model, seconds, "request")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "ollama_url": self.ollama_url,
+                "requests": self.requests,
+                "cold_loads": self.cold_loads,
+                "total_load_time": self.total_load_time,
+                "mean_load_time": self.total_load_time / self.cold_loads if self.cold_loads else 0.0,
+                "working_set": sorted(set().union(*(models for models, _ in self.working_sets.values()))),
+                "working_sets": {team: sorted(models) for team, (models, _) in self.working_sets.items()},
+                "recent_loads": list(self.load_events)[-10:],
+            }
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_residency_manager(ollama_url: str) -> ResidencyManager:
+    """Returns the process-wide residency manager for an Ollama host."""
+    ollama_url = normalize_ollama_url(ollama_url)
+    with _managers_lock:
+        if ollama_url not in _managers:
+            _managers[ollama_url] = ResidencyManager(ollama_url)
+        return _managers[ollama_url]
+
+def all_residency_metrics() -> list:
+    with _managers_lock:
+        managers = list(_managers.values())
+    return [manager.metrics() for manager in managers]
+
+def session_team(session_state) -> str:
+    """Working-set name for the team a Streamlit session runs: the team name plus an id kept in the session."""
+    if "residency_session" not in session_state:
+        session_state["residency_session"] = uuid.uuid4().hex[:8]
+    return f"{session_state.get('current_team') or DEFAULT_TEAM}/{session_state['residency_session']}"
+
+def preload_team_models(agents_data: list, resolve_url, team: str = DEFAULT_TEAM) -> dict:
+    """
+    Preloads every model a team uses, grouped by the host each agent resolves to.
+
+    `resolve_url` maps an agent's data to its Ollama URL (e.g. ollama_router.resolve_ollama_url).
+    `team` names the working set to replace; pass one per session so sessions keep their own.
+    """
+    models_by_host = {}
+    for agent_data in agents_data:
+        model = agent_data.get("model")
+        if model:
+            models_by_host.setdefault(normalize_ollama_url(resolve_url(agent_data)), []).append(model)
+    return {url: get_residency_manager(url).preload(models, team) for url, models in models_by_host.items()}
@@ -3,18 +3,23 @@ import json
 import requests
 import streamlit as st
 
+from ollama_router import ollama_endpoint
+from model_residency import get_residency_manager
+from request_scheduler import get_request_scheduler
+
 class OllamaLLM:
     """A custom LLM wrapper for Ollama."""
 
-    def __init__(self, base_url="http://localhost:11434", api_key=None, model="mistral:instruct", temperature=0.7):
+    def __init__(self, base_url="http://localhost:11434", api_key=None, model="mistral:instruct", temperature=0.7, pool=None, priority="interactive"):
         self.base_url = base_url
+        self.pool = pool  # When set, each request goes to the least-loaded host of this pool
+        self.priority = priority  # Request scheduler class: "interactive", "background" or "batch"
         self.api_key = api_key
         self.model = model
         self.temperature = temperature  # Set default temperature here
 
     def generate_text(self, prompt, temperature=None, max_tokens=512):
         """Generates text using the Ollama API."""
-        url = f"{self.base_url}/api/generate"
         headers = {"Content-Type": "application/json"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
@@ -26,19 +31,27 @@ class OllamaLLM:
                 "max_tokens": max_tokens,
             },
         }
-        response = requests.post(url, headers=headers, json=data, stream=True)
-        
-        try:
-            responses = []
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode('utf-8').strip()
-                    responses.append(json.loads(decoded_line).get("response", ""))
-            return "".join(responses)
-        except ValueError as e:
-            print(f"DEBUG: JSON decode error - {e}")
-            print(f"DEBUG: API response text - {responses}")
-            raise
-        except Exception as e:
-            print(f"DEBUG: Unexpected error - {e}")
-            raise
\ No newline at end of file
+        # Callers expect text back, so these requests wait their turn but are never cancelled
+        with ollama_endpoint(self.pool, self.model, self.base_url) as base_url, \
+                get_request_scheduler().slot(self.priority, label=f"{self.model} generate_text", cancellable=False, host=base_url):
+            residency = get_residency_manager(base_url)
+            data["keep_alive"] = residency.keep_alive_for(self.model)  # Team models stay loaded between turns
+            response = requests.post(f"{base_url}/api/generate", headers=headers, json=data, stream=True)
+
+            try:
+                responses = []
+                for line in response.iter_lines():
+                    if line:
+                        decoded_line = line.decode('utf-8').strip()
+                        part = json.loads(decoded_line)
+                        responses.append(part.get("response", ""))
+                        if part.get("done"):
+                            residency.record_request(self.model, part.get("load_duration"))
+                return "".join(responses)
+            except ValueError as e:
+                print(f"DEBUG: JSON decode error - {e}")
+                print(f"DEBUG: API response text - {responses}")
+                raise
+            except Exception as e:
+                print(f"DEBUG: Unexpected error - {e}")
+                raise
\ No newline at end of file
@@ -0,0 +1,205 @@
+# TeamForgeAI/ollama_router.py
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+from config import OLLAMA_POOLS
+from model_catalog import get_model_catalog, normalize_ollama_url
+
+HEALTH_CHECK_INTERVAL = 15  # Seconds between /api/ps polls of every pooled host
+HEALTH_CHECK_TIMEOUT = 3
+LOAD_PENALTY = 2  # A host that must load the model counts as this many extra in-flight requests
+
+class HostState:
+    """Health, load and model residency of one Ollama endpoint."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True  # Optimistic until the first check says otherwise
+        self.in_flight = 0
+        self.resident = set()  # Models loaded in memory, from /api/ps
+        self.installed = None  # Models on disk, from the model catalog; None until known
+        self.last_check = None
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.busy_time = 0.0
+
+    def cost(self, model: str) -> float:
+        """Lower is better: queued work, plus a penalty when the model would have to be loaded first."""
+        return self.in_flight + (0 if model in self.resident else LOAD_PENALTY)
+
+class OllamaRouter:
+    """
+    Dispatches generations across pools of Ollama hosts.
+
+    Each request goes to the healthy host of its pool that has the model installed and
+    the lowest cost, preferring hosts where the model is already resident so that no
+    host has to swap models while another one has it loaded.
+    """
+
+    def __init__(self, pools: dict = None):
+        self._lock = threading.Lock()
+        self.pools = {}
+        self.hosts = {}
+        self._checker_thread = None
+        self._stop_checks = threading.Event()
+        for name, urls in (pools or OLLAMA_POOLS).items():
+            self.add_pool(name, urls)
+
+    def add_pool(self, name: str, urls: list) -> None:
+        urls = [normalize_ollama_url(url) for url in urls]
+        with self._lock:
+            self.pools[name] = urls
+            for url in urls:
+                self.hosts.setdefault(url, HostState(url))
+
+    def pool_names(self) -> list:
+        return list(self.pools)
+
+    # --- Health checks ----------------------------------------------------
+
+    def check_host(self, host: HostState) -> None:
+        """Refreshes one host's health and resident models from /api/ps, and its installed models from the catalog."""
+        try:
+            response = requests.get(f"{host.url}/api/ps", timeout=HEALTH_CHECK_TIMEOUT)
+            response.raise_for_status()
+            resident = {entry["name"] for entry in response.json().get("models", [])}
+            installed = set(get_model_catalog(host.url).get_models(include_embed=True))
+        except (requests.exceptions.RequestException, ValueError) as error:
+            with self._lock:
+                host.consecutive_failures += 1
+                host.healthy = False
+                host.last_check = time.time()
+            print(f"Ollama host {host.url} failed its health check: {error}")
+            return
+        with self._lock:
+            host.healthy = True
+            host.consecutive_failures = 0
+            host.resident = resident
+            host.installed = installed
+            host.last_check = time.time()
+
+    def check_all(self) -> None:
+        for host in list(self.hosts.values()):
+            self.check_host(host)
+
+    def start_health_checks(self, interval: float = HEALTH_CHECK_INTERVAL) -> None:
+        """Polls every host on a daemon thread; the first round runs immediately."""
+        if self._checker_thread is not None and self._checker_thread.is_alive():
+            return
+        self._stop_checks.clear()
+
+        def poll() -> None:
+            self.check_all()
+            while not self._stop_checks.wait(interval):
+                self.check_all()
+
+        self._checker_thread = threading.Thread(target=poll, daemon=True)
+        self._checker_thread.start()
+
+    def stop_health_checks(self) -> None:
+        self._stop_checks.set()
+
+    # --- Dispatch ---------------------------------------------------------
+
+    def select_host(self, pool: str, model: str) -> HostState:
+        """Picks the best host of a pool for a model. Raises KeyError for an unknown pool."""
+        with self._lock:
+            hosts = [self.hosts[url] for url in self.pools[pool]]
+            candidates = [host for host in hosts if host.healthy] or hosts  # Nothing healthy: try anyway
+            with_model = [host for host in candidates if host.installed is None or model in host.installed]
+            candidates = with_model or candidates
+            return min(candidates, key=lambda host: (host.cost(model), host.consecutive_failures))
+
+    @contextmanager
+    def endpoint(self, pool: str, model: str):
+        """Reserves a host of the pool for one request and yields its URL, tracking load and failures."""
+        host = self.select_host(pool, model)
+        with self._lock:
+            host.in_flight += 1
+            host.requests += 1
+        started = time.perf_counter()
+        try:
+            yield host.url
+        except requests.exceptions.ConnectionError:
+            with self._lock:
+                host.errors += 1
+                host.consecutive_failures += 1
+                host.healthy = False
+            raise
+        except Exception:
+            with self._lock:
+                host.errors += 1
+            raise
+        else:
+            self.mark_resident(host.url, model)  # Ollama keeps the model loaded after serving it
+        finally:
+            with self._lock:
+                host.in_flight -= 1
+                host.busy_time += time.perf_counter() - started
+
+    def mark_resident(self, url: str, model: str) -> None:
+        """Records that a host has just served a model, for streams whose consumer stops reading at the done chunk."""
+        with self._lock:
+            host = self.hosts.get(normalize_ollama_url(url))
+            if host is not None:
+                host.resident.add(model)
+
+    def stats(self) -> list:
+        """Per-host rows for display: pool, health, load, residency and request counts."""
+        with self._lock:
+            rows = []
+            for pool, urls in self.pools.items():
+                for url in urls:
+                    host = self.hosts[url]
+                    rows.append({
+                        "Pool": pool,
+                        "Host": url,
+                        "Healthy": host.healthy,
+                        "In Flight": host.in_flight,
+                        "Resident Models": ", ".join(sorted(host.resident)),
+                        "Requests": host.requests,
+                        "Errors": host.errors,
+                        "Busy (s)": round(host.busy_time, 1),
+                        "Last Check": time.strftime("%H:%M:%S", time.localtime(host.last_check)) if host.last_check else "never",
+                    })
+            return rows
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_router() -> OllamaRouter:
+    """Returns the process-wide router built from config.OLLAMA_POOLS."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = OllamaRouter()
+        return _router
+
+@contextmanager
+def ollama_endpoint(pool: str = None, model: str = None, fallback_url: str = "http://localhost:11434"):
+    """
+    Yields the base URL to send one request to.
+
+    With a known pool the request is routed and tracked by the router; otherwise the
+    agent's fixed URL is used unchanged.
+    """
+    router = get_router()
+    if pool and pool in router.pools:
+        with router.endpoint(pool, model) as url:
+            yield url
+    else:
+        if pool:
+            print(f"Unknown Ollama pool '{pool}', using {fallback_url}")
+        yield normalize_ollama_url(fallback_url)
+
+def resolve_ollama_url(agent_data: dict, default_url: str = "http://localhost:11434") -> str:
+    """Picks a URL for an agent without reserving it, for clients the router cannot wrap per request."""
+    pool = agent_data.get("ollama_pool")
+    router = get_router()
+    if pool and pool in router.pools:
+        return router.select_host(pool, agent_data.get("model")).url
+    return agent_data.get("ollama_url") or default_url
@@ -0,0 +1,289 @@
+# benchmark.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from ollama_utils import OLLAMA_URL, iter_ollama_stream
+from model_catalog import get_model_catalog, normalize_ollama_url
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(SCRIPT_DIR, "benchmarks")
+DEFAULT_OLLAMA_HOST = normalize_ollama_url(OLLAMA_URL)
+PERCENTILES = (50, 90, 99)
+CALIBRATION_PROMPT = "Count from one to twenty in words, separated by commas."
+CALIBRATION_OPTIONS = {"temperature": 0.0, "num_predict": 64}
+CALIBRATION_RUNS = 3
+LATENCY_METRICS = ("time_to_first_token", "total_latency", "load_duration")
+METRICS = (
+    "time_to_first_token",
+    "total_latency",
+    "prompt_eval_tokens_per_second",
+    "eval_tokens_per_second",
+    "load_duration",
+)
+
+def build_options(temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0):
+    """Maps the Workbench sliders onto Ollama's generation options."""
+    return {
+        "temperature": temperature,
+        "num_predict": max_tokens,
+        "presence_penalty": presence_penalty,
+        "frequency_penalty": frequency_penalty,
+    }
+
+def tokens_per_second(count, duration_ns):
+    return count / (duration_ns / 1e9) if count and duration_ns else None
+
+def timed_generate(model, prompt, options=None, ollama_url=DEFAULT_OLLAMA_HOST, timeout=600, session=None, context=None):
+    """
+    Runs one streamed /api/generate request and returns a sample of its timings.
+
+    Client-side timings use a monotonic clock; token rates come from the counters
+    Ollama reports in the final NDJSON chunk. `context` continues an earlier conversation.
+    """
+    payload = {"model": model, "prompt": prompt, "options": options or {}, "stream": True}
+    if context is not None:
+        payload["context"] = context
+    http = session or requests
+    sample = {"model": model, "ollama_url": ollama_url, "response": "", "error": None}
+    start = time.perf_counter()
+    first_token_at = None
+    final = {}
+    response_parts = []
+    try:
+        response = http.post(f"{ollama_url}/api/generate", json=payload, stream=True, timeout=timeout)
+        response.raise_for_status()
+        for part in iter_ollama_stream(response):
+            if "error" in part:
+                sample["error"] = part["error"]  # Ollama reports mid-stream failures as an error chunk
+                break
+            if first_token_at is None and part.get("response"):
+                first_token_at = time.perf_counter()
+            response_parts.append(part.get("response", ""))
+            if part.get("done", False):
+                final = part
+    except requests.exceptions.RequestException as e:
+        sample["error"] = str(e)
+    end = time.perf_counter()
+
+    sample.update({
+        "response": "".join(response_parts),
+        "time_to_first_token": first_token_at - start if first_token_at else None,
+        "total_latency": end - start,
+        "prompt_eval_count": final.get("prompt_eval_count"),
+        "prompt_eval_tokens_per_second": tokens_per_second(final.get("prompt_eval_count"), final.get("prompt_eval_duration")),
+        "eval_count": final.get("eval_count"),
+        "eval_duration": final.get("eval_duration"),
+        "eval_tokens_per_second": tokens_per_second(final.get("eval_count"), final.get("eval_duration")),
+        "load_duration": final["load_duration"] / 1e9 if final.get("load_duration") else None,
+    })
+    if not final and sample["error"] is None:
+        sample["error"] = "Stream ended without a final chunk"
+    return sample
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarize_samples(samples):
+    """Computes p50/p90/p99, mean, min and max for each metric over the successful samples."""
+    summary = {}
+    for metric in METRICS:
+        values = [sample[metric] for sample in samples if sample["error"] is None and sample.get(metric) is not None]
+        if not values:
+            summary[metric] = None
+            continue
+        summary[metric] = {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+        summary[metric].update({"mean": sum(values) / len(values), "min": min(values), "max": max(values), "n": len(values)})
+    return summary
+
+def benchmark_model(model, prompt, options=None, warmup_runs=1, repetitions=5, ollama_url=DEFAULT_OLLAMA_HOST, progress_callback=None, context=None):
+    """Runs warmup requests (discarded, they absorb model load) and then the measured repetitions."""
+    for _ in range(warmup_runs):
+        timed_generate(model, prompt, options, ollama_url, context=context)
+        if progress_callback:
+            progress_callback(model, "warmup")
+    samples = []
+    for _ in range(repetitions):
+        samples.append(timed_generate(model, prompt, options, ollama_url, context=context))
+        if progress_callback:
+            progress_callback(model, "run")
+    return {
+        "ollama_url": ollama_url,
+        "samples": samples,
+        "errors": sum(1 for sample in samples if sample["error"] is not None),
+        "summary": summarize_samples(samples),
+    }
+
+def run_benchmark(models, prompt, options=None, warmup_runs=1, repetitions=5, ollama_url=DEFAULT_OLLAMA_HOST, progress_callback=None, context=None):
+    """Benchmarks each model in turn and returns a JSON-serializable result document."""
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "prompt": prompt,
+        "options": options or {},
+        "warmup_runs": warmup_runs,
+        "repetitions": repetitions,
+        "models": {
+            model: benchmark_model(model, prompt, options, warmup_runs, repetitions, ollama_url, progress_callback, context)
+            for model in models
+        },
+    }
+
+def configured_hosts():
+    """Ollama hosts to spread comparisons over, from OLLAMA_HOSTS (comma-separated) or the local default."""
+    hosts = [normalize_ollama_url(host) for host in os.getenv("OLLAMA_HOSTS", "").split(",") if host.strip()]
+    return hosts or [DEFAULT_OLLAMA_HOST]
+
+def calibrate_hosts(hosts, reference_model, progress_callback=None):
+    """
+    Measures each host's speed on the same reference model and prompt.
+
+    Returns {host: factor}, where factor is the host's p50 eval tokens/second divided
+    by the first host's; results from a host are divided by its factor to normalize them.
+    """
+    def measure(host):
+        timed_generate(reference_model, CALIBRATION_PROMPT, CALIBRATION_OPTIONS, host)  # Warmup
+        samples = [timed_generate(reference_model, CALIBRATION_PROMPT, CALIBRATION_OPTIONS, host) for _ in range(CALIBRATION_RUNS)]
+        rates = [sample["eval_tokens_per_second"] for sample in samples if sample["eval_tokens_per_second"]]
+        if progress_callback:
+            progress_callback(host, "calibration")
+        return percentile(rates, 50)
+
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        rates = dict(zip(hosts, executor.map(measure, hosts)))
+    baseline = rates[hosts[0]]
+    return {host: (rate / baseline if rate and baseline else 1.0) for host, rate in rates.items()}
+
+def normalize_summary(summary, factor):
+    """Scales a summary to the reference host: rates are divided by the factor, latencies multiplied."""
+    normalized = {}
+    for metric, stats in summary.items():
+        if stats is None:
+            normalized[metric] = None
+            continue
+        scale = factor if metric in LATENCY_METRICS else 1 / factor
+        normalized[metric] = {key: (value * scale if key != "n" else value) for key, value in stats.items()}
+    return normalized
+
+def run_distributed_benchmark(models, prompt, options=None, warmup_runs=1, repetitions=5, hosts=None, normalize=True, progress_callback=None, context=None):
+    """
+    Benchmarks models in parallel across several Ollama hosts.
+
+    Each host gets one worker that takes the next pending model it has installed, so a
+    host only ever runs one model at a time and never swaps between concurrent requests.
+    With several hosts and `normalize`, each host is first calibrated on a model they all
+    share and every model summary gets a `normalized_summary` in reference-host terms.
+    """
+    hosts = [normalize_ollama_url(host) for host in (hosts or configured_hosts())]
+    installed = {}
+    for host in hosts:
+        try:
+            installed[host] = set(get_model_catalog(host).get_models(include_embed=True))
+        except requests.exceptions.RequestException as e:
+            print(f"Skipping unreachable Ollama host {host}: {e}")
+    hosts = [host for host in hosts if host in installed]
+
+    pending = list(models)
+    pending_lock = threading.Lock()
+    results = {}
+    host_stats = {host: {"models": [], "busy_time": 0.0, "requests": 0, "calibration_factor": 1.0} for host in hosts}
+
+    factors = {}
+    if normalize and len(hosts) > 1:
+        shared = [model for model in models if all(model in installed[host] for host in hosts)]
+        if shared:
+            factors = calibrate_hosts(hosts, shared[0], progress_callback)
+            for host, factor in factors.items():
+                host_stats[host]["calibration_factor"] = factor
+
+    def next_model(host):
+        with pending_lock:
+            for model in pending:
+                if model in installed[host]:
+                    pending.remove(model)
+                    return model
+        return None
+
+    def worker(host):
+        while True:
+            model = next_model(host)
+            if model is None:
+                return
+            started = time.perf_counter()
+            model_results = benchmark_model(model, prompt, options, warmup_runs, repetitions, host, progress_callback, context)
+            host_stats[host]["busy_time"] += time.perf_counter() - started
+            host_stats[host]["models"].append(model)
+            host_stats[host]["requests"] += warmup_runs + repetitions
+            if host in factors:
+                model_results["normalized_summary"] = normalize_summary(model_results["summary"], factors[host])
+            results[model] = model_results
+
+    started = time.perf_counter()
+    if hosts:
+        with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            list(executor.map(worker, hosts))
+    wall_time = time.perf_counter() - started
+    for stats in host_stats.values():
+        stats["utilization"] = stats["busy_time"] / wall_time if wall_time else 0.0
+
+    for model in pending:  # Not installed on any reachable host
+        results[model] = {"ollama_url": None, "samples": [], "errors": 0, "summary": summarize_samples([]), "error": "Model not available on any configured host"}
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "prompt": prompt,
+        "options": options or {},
+        "warmup_runs": warmup_runs,
+        "repetitions": repetitions,
+        "wall_time": wall_time,
+        "hosts": host_stats,
+        "models": {model: results[model] for model in models if model in results},
+    }
+
+def save_benchmark_results(results, output_dir=BENCHMARK_DIR, prefix="benchmark"):
+    """Writes the results as JSON and returns the file path."""
+    os.makedirs(output_dir, exist_ok=True)
+    file_path = os.path.join(output_dir, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return file_path
+
+def summary_rows(results):
+    """Flattens the per-model summaries into table rows for display."""
+    rows = []
+    for model, model_results in results["models"].items():
+        row = {"Model": model, "Host": model_results["ollama_url"], "Runs": len(model_results["samples"]), "Errors": model_results["errors"]}
+        for metric in ("time_to_first_token", "total_latency", "eval_tokens_per_second", "prompt_eval_tokens_per_second"):
+            stats = model_results["summary"].get(metric) or {}
+            for pct in PERCENTILES:
+                row[f"{metric} p{pct}"] = stats.get(f"p{pct}")
+        if "normalized_summary" in model_results:
+            for metric in ("total_latency", "eval_tokens_per_second"):
+                row[f"normalized {metric} p50"] = (model_results["normalized_summary"].get(metric) or {}).get("p50")
+        rows.append(row)
+    return rows
+
+def host_rows(results):
+    """Per-host utilization rows for a distributed run."""
+    return [
+        {
+            "Host": host,
+            "Models": ", ".join(stats["models"]),
+            "Requests": stats["requests"],
+            "Busy (s)": stats["busy_time"],
+            "Utilization": stats["utilization"],
+            "Calibration Factor": stats["calibration_factor"],
+        }
+        for host, stats in results.get("hosts", {}).items()
+    ]
@@ -0,0 +1,115 @@
+# code_chunker.py
+import ast
+
+CHARS_PER_TOKEN = 4  # Rough average for code; good enough to keep chunks within a prompt budget
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _node_start(node):
+    """First line of a definition, including its decorators."""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [decorator.lineno for decorator in decorators])
+
+def _node_name(node):
+    if isinstance(node, ast.ClassDef):
+        return "class", node.name
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return "function", node.name
+    return "module", "module-level code"
+
+def _make_chunk(lines, start, end, kind, name, context=""):
+    """A chunk covering 1-based lines start..end; `context` (e.g. a class header) is prepended to its text."""
+    text = "".join(lines[start - 1:end])
+    return {"kind": kind, "name": name, "start_line": start, "end_line": end, "text": context + text}
+
+def _split_lines(lines, start, end, kind, name, budget, context=""):
+    """Last resort for a single definition over budget, or a file that does not parse: consecutive line windows."""
+    chunks, window_start, size = [], start, estimate_tokens(context)
+    for line_number in range(start, end + 1):
+        size += estimate_tokens(lines[line_number - 1])
+        if size > budget and line_number > window_start:
+            chunks.append(_make_chunk(lines, window_start, line_number - 1, kind, f"{name} (lines {window_start}-{line_number - 1})", context))
+            window_start, size = line_number, estimate_tokens(context) + estimate_tokens(lines[line_number - 1])
+    chunks.append(_make_chunk(lines, window_start, end, kind, f"{name} (lines {window_start}-{end})" if chunks else name, context))
+    return chunks
+
+def _spans(body, lines, end_of_parent):
+    """(start, end, node) for each statement, with each span running up to the next statement."""
+    spans = []
+    for index, node in enumerate(body):
+        start = _node_start(node)
+        end = _node_start(body[index + 1]) - 1 if index + 1 < len(body) else end_of_parent
+        spans.append((start, end, node))
+    return spans
+
+def _chunk_body(body, lines, end_of_parent, budget, context=""):
+    """
+    Packs consecutive statements into chunks of at most `budget` tokens.
+
+    Definitions are never cut in half while they fit the budget. A class that is too big
+    is split into its methods, each carrying the class header as context; anything else
+    that is too big falls back to line windows.
+    """
+    chunks = []
+    pending = []  # Spans of small statements waiting to be packed together
+
+    def flush():
+        if not pending:
+            return
+        start, end = pending[0][0], pending[-1][1]
+        if len(pending) == 1:
+            kind, name = _node_name(pending[0][2])
+        else:
+            definitions = [_node_name(node)[1] for _, _, node in pending if _node_name(node)[0] != "module"]
+            kind, name = "module", ", ".join(definitions) or "module-level code"
+        chunks.append(_make_chunk(lines, start, end, kind, name, context))
+        pending.clear()
+
+    for start, end, node in _spans(body, lines, end_of_parent):
+        size = estimate_tokens(context + "".join(lines[start - 1:end]))
+        if size > budget:
+            flush()
+            kind, name = _node_name(node)
+            if isinstance(node, ast.ClassDef) and node.body:
+                header_end = _node_start(node.body[0]) - 1
+                header = "".join(lines[start - 1:header_end])
+                if estimate_tokens(header) < budget // 2:
+                    member_chunks = _chunk_body(node.body, lines, end, budget, context + header)
+                    for chunk in member_chunks:
+                        chunk["name"] = f"{name}.{chunk['name']}"
+                    chunks.extend(member_chunks)
+                    continue
+            chunks.extend(_split_lines(lines, start, end, kind, name, budget, context))
+            continue
+        pending_size = estimate_tokens(context + "".join(lines[pending[0][0] - 1:end])) if pending else size
+        if pending_size > budget:
+            flush()
+        pending.append((start, end, node))
+    flush()
+    return chunks
+
+def chunk_source(source, budget):
+    """
+    Splits Python source into chunks along class and function boundaries.
+
+    Returns a list of dicts with kind, name, start_line, end_line and text. Files that
+    fit the budget come back as one chunk. Files that do not parse are split into
+    windows of lines that fit the budget instead of along the AST.
+    """
+    lines = source.splitlines(keepends=True)
+    if not lines:
+        return []
+    if estimate_tokens(source) <= budget:
+        return [_make_chunk(lines, 1, len(lines), "module", "whole file")]
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return _split_lines(lines, 1, len(lines), "module", "file", budget)
+    if not tree.body:
+        return [_make_chunk(lines, 1, len(lines), "module", "whole file")]
+    chunks = _chunk_body(tree.body, lines, len(lines), budget)
+    if tree.body and _node_start(tree.body[0]) > 1:  # Leading comments and blank lines belong to the first chunk
+        chunks[0]["text"] = "".join(lines[:_node_start(tree.body[0]) - 1]) + chunks[0]["text"]
+        chunks[0]["start_line"] = 1
+    return chunks
@@ -0,0 +1,256 @@
+# corpus_format.py
+"""
+Native chunked corpus format (.corpus).
+
+Layout:
+    header   MAGIC (8 bytes) | version (uint16) | index offset (uint64) | index length (uint64)
+    blocks   zlib-compressed blocks, each holding up to CHUNKS_PER_BLOCK chunks
+    index    zlib-compressed JSON with block offsets and document metadata
+
+Every chunk holds at most `chunk_size` bytes of text, so a block can be
+located and decompressed on its own without reading the rest of the file.
+"""
+import json
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+from bs4 import BeautifulSoup
+
+from corpus_reader import CorpusReader, split_text, DEFAULT_CHUNK_SIZE
+
+CORPUS_EXTENSION = ".corpus"
+MAGIC = b"OWCORPUS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHQQ")
+CHUNK_LENGTH = struct.Struct("<I")
+CHUNKS_PER_BLOCK = 16
+BLOCK_CACHE_SIZE = 8  # Decompressed blocks kept per open corpus
+
+def extract_page_text(html):
+    """Returns the title and readable text of an HTML page."""
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(["script", "style", "noscript"]):
+        element.decompose()
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    lines = (line.strip() for line in soup.get_text("\n").splitlines())
+    return title, "\n".join(line for line in lines if line)
+
+class CorpusWriter:
+    """Streams documents into a .corpus file, flushing each block as soon as it is full."""
+
+    def __init__(self, output_path, chunk_size=DEFAULT_CHUNK_SIZE, chunks_per_block=CHUNKS_PER_BLOCK):
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+        self.chunks_per_block = chunks_per_block
+        self.blocks = []  # [offset, compressed length, first chunk, chunk count]
+        self.documents = []
+        self.chunk_count = 0
+        self._pending = []
+        self._file = open(output_path, "wb")
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_document(self, text, url="", title=""):
+        """Splits `text` into chunks and appends it as one document."""
+        return self.add_document_chunks(split_text(text, self.chunk_size), url=url, title=title)
+
+    def add_document_chunks(self, chunks, url="", title=""):
+        """Appends a document from an iterable of already split chunks."""
+        first_chunk = self.chunk_count
+        for chunk in chunks:
+            self._pending.append(chunk.encode("utf-8"))
+            self.chunk_count += 1
+            if len(self._pending) >= self.chunks_per_block:
+                self._flush_block()
+        document = {"url": url, "title": title, "first_chunk": first_chunk, "chunk_count": self.chunk_count - first_chunk}
+        self.documents.append(document)
+        return document
+
+    def _flush_block(self):
+        if not self._pending:
+            return
+        raw = b"".join(CHUNK_LENGTH.pack(len(chunk)) + chunk for chunk in self._pending)
+        compressed = zlib.compress(raw, 6)
+        offset = self._file.tell()
+        self._file.write(compressed)
+        self.blocks.append([offset, len(compressed), self.chunk_count - len(self._pending), len(self._pending)])
+        self._pending = []
+
+    def close(self):
+        if self._file is None:
+            return
+        self._flush_block()
+        index = {
+            "chunk_size": self.chunk_size,
+            "chunks_per_block": self.chunks_per_block,
+            "chunk_count": self.chunk_count,
+            "blocks": self.blocks,
+            "documents": self.documents,
+        }
+        index_bytes = zlib.compress(json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        index_offset = self._file.tell()
+        self._file.write(index_bytes)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, index_offset, len(index_bytes)))
+        self._file.close()
+        self._file = None
+
+class CorpusFile:
+    """Random-access reader for .corpus files. Only the blocks holding requested chunks are read."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        magic, version, index_offset, index_length = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            self._file.close()
+            raise ValueError(f"{file_path} is not a corpus file")
+        if version > FORMAT_VERSION:
+            self._file.close()
+            raise ValueError(f"{file_path} uses unsupported corpus format version {version}")
+        self._file.seek(index_offset)
+        index = json.loads(zlib.decompress(self._file.read(index_length)).decode("utf-8"))
+        self.chunk_size = index["chunk_size"]
+        self.chunks_per_block = index["chunks_per_block"]
+        self.chunk_count = index["chunk_count"]
+        self.blocks = index["blocks"]
+        self.documents = index["documents"]
+        self._block_cache = OrderedDict()
+        self.blocks_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _read_block(self, block_number):
+        if block_number in self._block_cache:
+            self._block_cache.move_to_end(block_number)
+            return self._block_cache[block_number]
+        offset, length, _, count = self.blocks[block_number]
+        self._file.seek(offset)
+        raw = zlib.decompress(self._file.read(length))
+        chunks = []
+        position = 0
+        for _ in range(count):
+            (chunk_length,) = CHUNK_LENGTH.unpack_from(raw, position)
+            position += CHUNK_LENGTH.size
+            chunks.append(raw[position:position + chunk_length].decode("utf-8"))
+            position += chunk_length
+        self.blocks_read += 1
+        self._block_cache[block_number] = chunks
+        if len(self._block_cache) > BLOCK_CACHE_SIZE:
+            self._block_cache.popitem(last=False)
+        return chunks
+
+    def get_chunk(self, chunk_number):
+        if not 0 <= chunk_number < self.chunk_count:
+            raise IndexError(f"chunk {chunk_number} out of range")
+        block_number = chunk_number // self.chunks_per_block
+        return self._read_block(block_number)[chunk_number - self.blocks[block_number][2]]
+
+    def get_chunks(self, chunk_numbers):
+        """Returns chunks in the requested order, reading each needed block once."""
+        chunk_numbers = list(chunk_numbers)
+        by_block = {}
+        for chunk_number in chunk_numbers:
+            if not 0 <= chunk_number < self.chunk_count:
+                raise IndexError(f"chunk {chunk_number} out of range")
+            by_block.setdefault(chunk_number // self.chunks_per_block, []).append(chunk_number)
+        texts = {}
+        for block_number in sorted(by_block):
+            chunks = self._read_block(block_number)
+            for chunk_number in by_block[block_number]:
+                texts[chunk_number] = chunks[chunk_number - self.blocks[block_number][2]]
+        return [texts[chunk_number] for chunk_number in chunk_numbers]
+
+    def iter_chunks(self):
+        """Yields (chunk_number, chunk_text) for the whole corpus, one block in memory at a time."""
+        for block_number, (_, _, first_chunk, _) in enumerate(self.blocks):
+            for i, chunk in enumerate(self._read_block(block_number)):
+                yield first_chunk + i, chunk
+
+    def document_for_chunk(self, chunk_number):
+        """Returns the metadata of the document a chunk belongs to."""
+        low, high = 0, len(self.documents) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            document = self.documents[middle]
+            if chunk_number < document["first_chunk"]:
+                high = middle - 1
+            elif chunk_number >= document["first_chunk"] + document["chunk_count"]:
+                low = middle + 1
+            else:
+                return document
+        return None
+
+    def get_document_text(self, document):
+        first = document["first_chunk"]
+        return "\n".join(self.get_chunks(range(first, first + document["chunk_count"])))
+
+def is_corpus_file(file_path):
+    return file_path.endswith(CORPUS_EXTENSION)
+
+def import_json_corpus(json_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Converts a Web-to-Corpus JSON export ([{"url", "content"}]) into a .corpus file."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    with CorpusWriter(output_path, chunk_size=chunk_size) as writer:
+        for item in items:
+            title, text = extract_page_text(item.get("content", ""))
+            writer.add_document(text, url=item.get("url", ""), title=item.get("title", title))
+    return output_path
+
+def import_txt_corpus(txt_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Converts a text corpus into a .corpus file.
+
+    Web-to-Corpus TXT exports ("URL: ..." / "Content:" / dashed separator) become one
+    document per page; any other text file becomes a single document streamed in chunks.
+    """
+    with open(txt_path, "r", encoding="utf-8", errors="replace") as f:
+        is_crawl_export = f.readline().startswith("URL: ")
+
+    with CorpusWriter(output_path, chunk_size=chunk_size) as writer:
+        if not is_crawl_export:
+            with CorpusReader(txt_path, chunk_size=chunk_size) as reader:
+                writer.add_document_chunks((chunk for chunk, _ in reader.iter_chunks()), title=os.path.basename(txt_path))
+            return output_path
+
+        separator = "-" * 80
+        url, lines = "", []
+
+        def flush():
+            if url:
+                title, text = extract_page_text("".join(lines))
+                writer.add_document(text, url=url, title=title)
+
+        with open(txt_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("URL: "):
+                    flush()
+                    url, lines = line[len("URL: "):].strip(), []
+                elif line.rstrip("\n") == separator or (not lines and line.strip() in ("", "Content:")):
+                    continue
+                else:
+                    lines.append(line)
+        flush()
+    return output_path
+
+def convert_to_corpus(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Imports an existing JSON or TXT corpus next to the original and returns the new path."""
+    output_path = os.path.splitext(file_path)[0] + CORPUS_EXTENSION
+    if file_path.endswith(".json"):
+        return import_json_corpus(file_path, output_path, chunk_size)
+    return import_txt_corpus(file_path, output_path, chunk_size)
@@ -0,0 +1,186 @@
+# corpus_reader.py
+import mmap
+import os
+from array import array
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PAGE_LINES = 200
+LINE_INDEX_STRIDE = 200  # Keep one line offset out of every LINE_INDEX_STRIDE lines
+SEPARATORS = (b"\n\n", b"\n", b" ")
+
+def next_chunk_boundary(buffer, start, size, chunk_size):
+    """Finds where the chunk starting at `start` should end, preferring paragraph, line and word breaks."""
+    limit = start + chunk_size
+    if limit >= size:
+        return size
+    for separator in SEPARATORS:
+        cut = buffer.rfind(separator, start + 1, limit)
+        if cut != -1:
+            return cut + len(separator)
+    # No separator in the window: cut on a UTF-8 character boundary
+    while limit > start + 1 and (buffer[limit] & 0xC0) == 0x80:
+        limit -= 1
+    return limit
+
+def split_text(text, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+    """Splits an in-memory string with the same boundaries CorpusReader uses for files."""
+    data = text.encode(encoding)
+    chunks = []
+    start = 0
+    while start < len(data):
+        end = next_chunk_boundary(data, start, len(data), chunk_size)
+        chunk = data[start:end].decode(encoding, errors="replace").strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
+
+class CorpusReader:
+    """
+    Memory-mapped reader for corpus files of any size.
+
+    The file is never loaded as a whole: chunks and pages are decoded straight
+    from the mapping, and only compact offset indexes are kept in memory.
+    """
+
+    def __init__(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8"):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self._file = None
+        self._mmap = None
+        self._line_index = None
+        self._line_count = None
+        self._chunk_index = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        if self._file is None:
+            self._file = open(self.file_path, "rb")
+            if os.fstat(self._file.fileno()).st_size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __del__(self):
+        self.close()  # Released once nothing holds the reader, e.g. after a cache drops it
+
+    @property
+    def size(self):
+        self.open()
+        return len(self._mmap) if self._mmap is not None else 0
+
+    def read_bytes(self, start, end):
+        """Returns the raw bytes between two offsets without touching the rest of the file."""
+        self.open()
+        if self._mmap is None:
+            return b""
+        return self._mmap[start:end]
+
+    def decode(self, start, end):
+        return self.read_bytes(start, end).decode(self.encoding, errors="replace")
+
+    def is_binary(self, sample_size=8192):
+        """Cheap check on the first bytes of the file, so binaries are rejected without a full read."""
+        return b"\x00" in self.read_bytes(0, sample_size)
+
+    # --- Line index -------------------------------------------------------
+
+    def _build_line_index(self):
+        """Records the offset of every LINE_INDEX_STRIDE-th line in a single pass."""
+        self._line_index = array("Q", [0])
+        line_count = 0
+        size = self.size
+        position = 0
+        while position < size:
+            newline = self._mmap.find(b"\n", position)
+            if newline == -1:
+                line_count += 1
+                break
+            position = newline + 1
+            line_count += 1
+            if line_count % LINE_INDEX_STRIDE == 0 and position < size:
+                self._line_index.append(position)
+        self._line_count = line_count
+
+    @property
+    def line_count(self):
+        if self._line_index is None:
+            self._build_line_index()
+        return self._line_count
+
+    def line_offset(self, line_number):
+        """Returns the byte offset at which the given (0-based) line starts."""
+        if self._line_index is None:
+            self._build_line_index()
+        line_number = max(0, min(line_number, self._line_count))
+        checkpoint = min(line_number // LINE_INDEX_STRIDE, len(self._line_index) - 1)
+        position = self._line_index[checkpoint]
+        for _ in range(line_number - checkpoint * LINE_INDEX_STRIDE):
+            newline = self._mmap.find(b"\n", position)
+            if newline == -1:
+                return self.size
+            position = newline + 1
+        return position
+
+    def page_count(self, page_lines=DEFAULT_PAGE_LINES):
+        return max(1, -(-self.line_count // page_lines))
+
+    def read_page(self, page, page_lines=DEFAULT_PAGE_LINES):
+        """Returns the text of a single page of `page_lines` lines (0-based page number)."""
+        first_line = page * page_lines
+        start = self.line_offset(first_line)
+        end = self.line_offset(first_line + page_lines)
+        return self.decode(start, end)
+
+    # --- Chunk index ------------------------------------------------------
+
+    def iter_chunk_ranges(self):
+        """Yields (start, end) byte ranges of the chunks, building the chunk index as it goes."""
+        if self._chunk_index is not None:
+            for i in range(len(self._chunk_index) - 1):
+                yield self._chunk_index[i], self._chunk_index[i + 1]
+            return
+        index = array("Q", [0])
+        start = 0
+        size = self.size
+        while start < size:
+            end = next_chunk_boundary(self._mmap, start, size, self.chunk_size)
+            index.append(end)
+            yield start, end
+            start = end
+        self._chunk_index = index
+
+    def iter_chunks(self):
+        """Lazily yields (chunk_text, end_offset) pairs, skipping whitespace-only chunks."""
+        for start, end in self.iter_chunk_ranges():
+            text = self.decode(start, end).strip()
+            if text:
+                yield text, end
+
+    @property
+    def chunk_count(self):
+        if self._chunk_index is None:
+            for _ in self.iter_chunk_ranges():
+                pass
+        return len(self._chunk_index) - 1
+
+    def read_chunk(self, chunk_number):
+        """Random access to a single chunk once the chunk index has been built."""
+        if self._chunk_index is None:
+            for _ in self.iter_chunk_ranges():
+                pass
+        return self.decode(self._chunk_index[chunk_number], self._chunk_index[chunk_number + 1]).strip()
@@ -0,0 +1,183 @@
+# dependency_scanner.py
+import ast
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from result_cache import ResultCache, content_hash
+
+try:
+    from importlib.metadata import packages_distributions
+except ImportError:  # Python < 3.10
+    packages_distributions = None
+
+STDLIB_MODULES = set(getattr(sys, "stdlib_module_names", ())) | set(sys.builtin_module_names) | {"__future__"}
+SCANNER_VERSION = 1  # Bump when scan_imports changes so cached results are recomputed
+PARALLEL_THRESHOLD = 64  # Fewer files than this are parsed in-process; a pool costs more than it saves
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "env", "node_modules", "build", "dist", ".tox", ".mypy_cache"}
+
+# Import names whose PyPI distribution is named differently
+IMPORT_TO_DISTRIBUTION = {
+    "PIL": "Pillow",
+    "bs4": "beautifulsoup4",
+    "yaml": "PyYAML",
+    "cv2": "opencv-python",
+    "sklearn": "scikit-learn",
+    "skimage": "scikit-image",
+    "dotenv": "python-dotenv",
+    "dateutil": "python-dateutil",
+    "autogen": "pyautogen",
+    "googleapiclient": "google-api-python-client",
+    "google_auth_oauthlib": "google-auth-oauthlib",
+    "docx": "python-docx",
+    "pptx": "python-pptx",
+    "serpapi": "google-search-results",
+    "attr": "attrs",
+    "Crypto": "pycryptodome",
+    "jwt": "PyJWT",
+    "magic": "python-magic",
+    "git": "GitPython",
+    "OpenSSL": "pyOpenSSL",
+    "dns": "dnspython",
+    "serial": "pyserial",
+    "usb": "pyusb",
+    "zmq": "pyzmq",
+    "MySQLdb": "mysqlclient",
+    "win32api": "pywin32",
+    "win32con": "pywin32",
+    "fitz": "PyMuPDF",
+    "Levenshtein": "python-Levenshtein",
+    "multipart": "python-multipart",
+    "telegram": "python-telegram-bot",
+    "discord": "discord.py",
+    "websocket": "websocket-client",
+    "streamlit_chat": "streamlit-chat",
+    "streamlit_extras": "streamlit-extras",
+    "langchain_community": "langchain-community",
+    "webdriver_manager": "webdriver-manager",
+    "charset_normalizer": "charset-normalizer",
+    "typing_extensions": "typing_extensions",
+}
+
+def scan_imports(source):
+    """Top-level module names imported anywhere in the source, including inside functions and try blocks."""
+    modules = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:  # Relative imports are always local
+            modules.add(node.module.split(".")[0])
+    return sorted(modules)
+
+def scan_file(task):
+    """Hashes and parses one file unless its hash matches the cached one. Runs in a worker process."""
+    file_path, cached_hash, cached_imports = task
+    stat = os.stat(file_path)
+    with open(file_path, "rb") as file:
+        data = file.read()
+    file_hash = content_hash(data)
+    if file_hash == cached_hash:
+        imports, error = cached_imports, None
+    else:
+        try:
+            imports, error = scan_imports(data.decode("utf-8", errors="replace")), None
+        except (SyntaxError, ValueError) as e:
+            imports, error = [], str(e)
+    return file_path, {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": file_hash, "imports": imports, "error": error}
+
+def find_python_files(root_dir):
+    code_files = []
+    for subdir, dirs, files in os.walk(root_dir):
+        dirs[:] = [name for name in dirs if name not in SKIP_DIRS]
+        code_files.extend(os.path.join(subdir, name) for name in files if name.endswith(".py"))
+    return code_files
+
+def local_module_names(root_dir, code_files):
+    """Names importable from inside the repository: its modules and packages, from any directory that holds code."""
+    names = set()
+    for file_path in code_files:
+        names.add(os.path.splitext(os.path.basename(file_path))[0])
+        relative_dir = os.path.relpath(os.path.dirname(file_path), root_dir)
+        if relative_dir != ".":
+            names.update(relative_dir.split(os.sep))
+    return names
+
+def distribution_for(module, installed=None):
+    """PyPI distribution for an import name: the local table first, then installed package metadata."""
+    if module in IMPORT_TO_DISTRIBUTION:
+        return IMPORT_TO_DISTRIBUTION[module]
+    if installed and module in installed:
+        return installed[module][0]
+    return module
+
+def classify(module, local_modules):
+    if module in STDLIB_MODULES:
+        return "stdlib"
+    if module in local_modules:
+        return "local"
+    return "third-party"
+
+def scan_repository(root_dir, workers=None, use_cache=True):
+    """
+    Builds the import graph of a repository and classifies every imported module.
+
+    Per-file results are cached in one index per repository. A file whose mtime and size
+    are unchanged is not opened at all; a touched file is re-hashed and only re-parsed if
+    its content changed. Parsing runs in a process pool once enough files need it.
+    """
+    started = time.perf_counter()
+    root_dir = os.path.abspath(root_dir)
+    cache = ResultCache("dependency_scanner") if use_cache else None
+    cache_key = [root_dir, SCANNER_VERSION]
+    index = (cache.get(cache_key) if cache is not None else None) or {}
+
+    code_files = find_python_files(root_dir)
+    entries, tasks = {}, []
+    for file_path in code_files:
+        cached = index.get(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            entries[file_path] = cached
+        else:
+            tasks.append((file_path, cached["hash"] if cached else None, cached["imports"] if cached else None))
+
+    if len(tasks) >= PARALLEL_THRESHOLD:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            scanned = list(executor.map(scan_file, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        scanned = [scan_file(task) for task in tasks]
+    reparsed = sum(1 for (_, cached_hash, _), (_, entry) in zip(tasks, scanned) if entry["hash"] != cached_hash)
+    entries.update(scanned)
+    if cache is not None and tasks:
+        cache.set(cache_key, entries)
+
+    local_modules = local_module_names(root_dir, code_files)
+    installed = packages_distributions() if packages_distributions else {}
+    modules = {}  # Module -> {"kind", "distribution", "files"}
+    for file_path, entry in entries.items():
+        for module in entry["imports"]:
+            info = modules.setdefault(module, {"kind": classify(module, local_modules), "distribution": None, "files": []})
+            info["files"].append(os.path.relpath(file_path, root_dir))
+    for module, info in modules.items():
+        if info["kind"] == "third-party":
+            info["distribution"] = distribution_for(module, installed)
+
+    return {
+        "modules": modules,
+        "errors": {os.path.relpath(file_path, root_dir): entry["error"] for file_path, entry in entries.items() if entry.get("error")},
+        "stats": {
+            "files": len(entries),
+            "cached": len(entries) - len(tasks),
+            "rehashed": len(tasks) - reparsed,
+            "parsed": reparsed,
+            "seconds": time.perf_counter() - started,
+        },
+    }
+
+def third_party_distributions(scan):
+    return sorted({info["distribution"] for info in scan["modules"].values() if info["kind"] == "third-party"}, key=str.lower)
@@ -0,0 +1,192 @@
+# load_test.py
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import requests
+import streamlit as st
+
+from benchmark import DEFAULT_OLLAMA_HOST, PERCENTILES, build_options, percentile, save_benchmark_results, timed_generate
+from ollama_utils import get_available_models
+
+DEFAULT_PROMPTS = [
+    "Summarize the benefits of unit testing in three sentences.",
+    "Write a Python function that checks whether a string is a palindrome.",
+    "Explain the difference between a process and a thread.",
+    "List five ideas for a team-building activity.",
+]
+
+def concurrency_ramp(max_concurrency, steps="doubling"):
+    """Concurrency levels to test: 1, 2, 4, ... up to max_concurrency, or every level when steps='linear'."""
+    if steps == "linear":
+        return list(range(1, max_concurrency + 1))
+    levels = []
+    level = 1
+    while level < max_concurrency:
+        levels.append(level)
+        level *= 2
+    levels.append(max_concurrency)
+    return levels
+
+def run_load_step(model, prompts, concurrency, requests_per_client=3, options=None, ollama_url=DEFAULT_OLLAMA_HOST, seed=0):
+    """
+    Drives `concurrency` simulated clients, each sending `requests_per_client` back-to-back
+    streamed requests drawn from the prompt mix, and aggregates throughput and latency.
+    """
+    samples = []
+    samples_lock = threading.Lock()
+
+    def client(client_id):
+        rng = random.Random(seed * 1000 + client_id)  # Same prompt sequence for the same seed
+        with requests.Session() as session:
+            for _ in range(requests_per_client):
+                sample = timed_generate(model, rng.choice(prompts), options, ollama_url, session=session)
+                with samples_lock:
+                    samples.append(sample)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    wall_time = time.perf_counter() - started
+    return summarize_step(concurrency, samples, wall_time)
+
+def summarize_step(concurrency, samples, wall_time):
+    succeeded = [sample for sample in samples if sample["error"] is None]
+    step = {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": len(samples) - len(succeeded),
+        "wall_time": wall_time,
+        "requests_per_second": len(succeeded) / wall_time if wall_time else 0.0,
+        "tokens_per_second": sum(sample["eval_count"] or 0 for sample in succeeded) / wall_time if wall_time else 0.0,
+        "errors_sample": sorted({sample["error"] for sample in samples if sample["error"]})[:5],
+    }
+    for metric in ("total_latency", "time_to_first_token"):
+        values = [sample[metric] for sample in succeeded if sample[metric] is not None]
+        for pct in PERCENTILES:
+            step[f"{metric}_p{pct}"] = percentile(values, pct)
+    return step
+
+def find_knee(steps, metric="tokens_per_second"):
+    """
+    Returns the concurrency at the knee of the throughput curve, or None with fewer than three steps.
+
+    Both axes are normalized to [0, 1]; the knee is the point furthest above the straight
+    line joining the first and last steps, i.e. where extra clients stop buying throughput.
+    """
+    if len(steps) < 3:
+        return None
+    xs = [step["concurrency"] for step in steps]
+    ys = [step[metric] for step in steps]
+    x_span = (xs[-1] - xs[0]) or 1
+    y_span = (max(ys) - min(ys)) or 1
+    normalized = [((x - xs[0]) / x_span, (y - min(ys)) / y_span) for x, y in zip(xs, ys)]
+    (x0, y0), (x1, y1) = normalized[0], normalized[-1]
+    slope = (y1 - y0) / ((x1 - x0) or 1)
+    distances = [y - (y0 + slope * (x - x0)) for x, y in normalized]
+    best = max(range(len(steps)), key=lambda i: distances[i])
+    return xs[best] if distances[best] > 0 else None
+
+def run_load_test(model, prompts, concurrency_levels, requests_per_client=3, options=None, warmup=True, ollama_url=DEFAULT_OLLAMA_HOST, progress_callback=None):
+    """Runs one load step per concurrency level and returns a JSON-serializable result document."""
+    if warmup:
+        timed_generate(model, prompts[0], options, ollama_url)  # Absorb the model load before measuring
+    steps = []
+    for i, concurrency in enumerate(concurrency_levels):
+        steps.append(run_load_step(model, prompts, concurrency, requests_per_client, options, ollama_url, seed=i))
+        if progress_callback:
+            progress_callback(i + 1, len(concurrency_levels), steps[-1])
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "model": model,
+        "ollama_url": ollama_url,
+        "prompts": prompts,
+        "options": options or {},
+        "requests_per_client": requests_per_client,
+        "steps": steps,
+        "knee": find_knee(steps),
+    }
+
+def plot_load_test(results):
+    """Throughput and latency percentiles against concurrency, with the knee marked."""
+    df = pd.DataFrame(results["steps"])
+    fig, (throughput_ax, latency_ax) = plt.subplots(1, 2, figsize=(12, 4))
+
+    throughput_ax.plot(df["concurrency"], df["tokens_per_second"], marker="o", color="#4CAF50", label="Tokens/second")
+    throughput_ax.set_xlabel("Concurrent clients")
+    throughput_ax.set_ylabel("Tokens/second")
+    requests_ax = throughput_ax.twinx()
+    requests_ax.plot(df["concurrency"], df["requests_per_second"], marker="s", color="#FFC107", label="Requests/second")
+    requests_ax.set_ylabel("Requests/second")
+    throughput_ax.set_title("Throughput")
+
+    for pct in PERCENTILES:
+        latency_ax.plot(df["concurrency"], df[f"total_latency_p{pct}"], marker="o", label=f"p{pct}")
+    latency_ax.set_xlabel("Concurrent clients")
+    latency_ax.set_ylabel("Latency (seconds)")
+    latency_ax.set_title("Request latency")
+    latency_ax.legend()
+
+    if results["knee"] is not None:
+        for ax in (throughput_ax, latency_ax):
+            ax.axvline(results["knee"], color="red", linestyle="--", alpha=0.6)
+    fig.tight_layout()
+    return fig
+
+def main():
+    st.header("Load Test")
+    st.write("Drive several simulated clients against one model at the same time and ramp the concurrency step by step. Each client sends its requests back to back, picking prompts from the mix below. The charts show how throughput and latency change as clients are added; the dashed line marks the knee, where extra clients stop adding throughput and only add waiting time.")
+
+    available_models = get_available_models()
+    model = st.selectbox("Select the model to load test:", available_models, key="load_test_model")
+    ollama_url = st.text_input("Ollama URL", value=DEFAULT_OLLAMA_HOST, key="load_test_url")
+    prompts_text = st.text_area("Prompt mix (one prompt per line):", value="\n".join(DEFAULT_PROMPTS), height=150)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        max_concurrency = st.slider("Max Concurrent Clients", min_value=1, max_value=32, value=8, step=1)
+    with col2:
+        ramp = st.selectbox("Ramp", ["doubling", "linear"])
+    with col3:
+        requests_per_client = st.slider("Requests per Client", min_value=1, max_value=20, value=3, step=1)
+    with col4:
+        max_tokens = st.slider("Max Tokens", min_value=16, max_value=2048, value=128, step=16)
+
+    if st.button("Run Load Test", key="run_load_test"):
+        prompts = [line.strip() for line in prompts_text.splitlines() if line.strip()]
+        if not model or not prompts:
+            st.warning("Please select a model and enter at least one prompt.")
+            return
+
+        levels = concurrency_ramp(max_concurrency, ramp)
+        progress = st.progress(0.0)
+        status = st.empty()
+
+        def on_step(done, total, step):
+            progress.progress(done / total)
+            status.write(f"{step['concurrency']} clients: {step['tokens_per_second']:.1f} tokens/s, {step['requests_per_second']:.2f} requests/s, {step['errors']} errors")
+
+        results = run_load_test(model, prompts, levels, requests_per_client, build_options(max_tokens=max_tokens), ollama_url=ollama_url.rstrip("/"), progress_callback=on_step)
+        results_path = save_benchmark_results(results, prefix="load_test")
+
+        st.pyplot(plot_load_test(results))
+        if results["knee"] is not None:
+            st.info(f"Throughput levels off at about {results['knee']} concurrent clients for {model}.")
+        else:
+            st.info("No knee found: throughput kept scaling over the tested range (or fewer than three steps were run).")
+        st.dataframe(pd.DataFrame(results["steps"]).drop(columns=["errors_sample"]), use_container_width=True, hide_index=True)
+        for step in results["steps"]:
+            for error in step["errors_sample"]:
+                st.warning(f"{step['concurrency']} clients: {error}")
+        st.download_button(
+            label="Download Load Test JSON",
+            data=json.dumps(results, indent=2),
+            file_name=os.path.basename(results_path),
+            mime="application/json",
+        )
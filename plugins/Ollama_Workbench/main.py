@@ -10,6 +10,7 @@ from ui_elements import (
 )
 from repo_docs import main as repo_docs_main
 from web_to_corpus import main as web_to_corpus_main
+from load_test import main as load_test_main
 from streamlit_extras.buy_me_a_coffee import button
 
 # Define constants
@@ -26,6 +27,7 @@ SIDEBAR_SECTIONS = {
         ("Model Comparison by Response Quality", "Model Comparison by Response Quality"),
         ("Contextual Response Test by Model", "Contextual Response Test by Model"),
         ("Vision Model Comparison", "Vision Model Comparison"),
+        ("Load Test", "Load Test"),
     ],
     "Document": [
         ("Repository Analyzer", "Repository Analyzer"),
@@ -95,6 +97,8 @@ def main_content():
         remove_model_ui()
     elif st.session_state.selected_test == "Vision Model Comparison":
         vision_comparison_test()
+    elif st.session_state.selected_test == "Load Test":
+        load_test_main()
     elif st.session_state.selected_test == "Chat":
         chat_interface()
     elif st.session_state.selected_test == "Update Models":
@@ -134,9 +138,10 @@ def display_welcome_message():
 
         #### **Test**
         - **Model Feature Test**: Test a model's capability to handle JSON and function calls.
-        - **Model Comparison by Response Quality**: Compare the response quality and performance of multiple models for a given prompt.
+        - **Model Comparison by Response Quality**: Compare the response quality and performance of multiple models for a given prompt. Set `OLLAMA_HOSTS` (comma-separated URLs) to run the comparison on several Ollama hosts in parallel.
         - **Contextual Response Test by Model**: Test how well a model maintains context across multiple prompts.
         - **Vision Model Comparison**: Compare the performance of vision models using the same test image.
+        - **Load Test**: Ramp up concurrent clients against a model and chart throughput and latency percentiles to find where it saturates.
 
         #### **Document**
         - **Repository Analyzer**: Analyze your Python repository, generate documentation, debug reports, or a README.md file.
@@ -5,6 +5,7 @@ import time
 import json
 import matplotlib.pyplot as plt
 from ollama_utils import call_ollama_endpoint
+from benchmark import run_distributed_benchmark, build_options
 
 # Set plot style based on Streamlit theme
 if st.get_option("theme.base") == "light":
@@ -12,27 +13,13 @@ if st.get_option("theme.base") == "light":
 else:
     plt.style.use('dark_background')  # Use dark background for dark mode
 
-def performance_test(models, prompt, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None):
-    results = {}
-    if models:  # Check if any models are selected
-        for model in models:
-            start_time = time.time()
-            result, _, eval_count, eval_duration = call_ollama_endpoint(
-                model,
-                prompt,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                presence_penalty=presence_penalty,
-                frequency_penalty=frequency_penalty,
-                context=context,
-            )
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            results[model] = (result, elapsed_time, eval_count, eval_duration)
-            time.sleep(0.1)
-        return results
-    else:
+def performance_test(models, prompt, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None, warmup_runs=1, repetitions=5, hosts=None, normalize=True):
+    # Thin wrapper over the benchmark harness: warmup runs, N repetitions and percentile summaries,
+    # spread over every configured Ollama host with one model per host at a time
+    if not models:
         return {}  # Return an empty dictionary if no models are selected
+    options = build_options(temperature, max_tokens, presence_penalty, frequency_penalty)
+    return run_distributed_benchmark(models, prompt, options, warmup_runs=warmup_runs, repetitions=repetitions, hosts=hosts, normalize=normalize, context=context)
 
 def vision_test(models, image_file, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None):
     results = {}
@@ -6,21 +6,31 @@ import time
 import streamlit as st
 import ollama
 from datetime import datetime
+from model_catalog import get_model_catalog
 
 OLLAMA_URL = "http://localhost:11434/api"
 
-@st.cache_data  # Cache the list of available models
 def get_available_models():
-    response = requests.get(f"{OLLAMA_URL}/tags")
-    response.raise_for_status()
-    models = [
-        model["name"]
-        for model in response.json()["models"]
-        if "embed" not in model["name"]
-    ]
-    return models
-
-def call_ollama_endpoint(model, prompt=None, image=None, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None):
+    # Served from the shared model catalog, which expires after its TTL and is invalidated on pull/remove
+    return get_model_catalog(OLLAMA_URL).get_models()
+
+def iter_ollama_stream(response):
+    # Yields each NDJSON chunk of a streamed Ollama response, stopping after the final "done" chunk
+    for line in response.iter_lines():
+        if not line:
+            continue
+        try:
+            part = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"Skipping invalid JSON line: {line}")
+            continue
+        yield part
+        if part.get("done", False):
+            break
+
+def call_ollama_endpoint(model, prompt=None, image=None, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None, ollama_url=None):
+    # ollama_url selects another host (e.g. the one a comparison ran the model on); the default is OLLAMA_URL
+    api_url = f"{ollama_url.rstrip('/')}/api" if ollama_url else OLLAMA_URL
     payload = {
         "model": model,
         "temperature": temperature,
@@ -41,38 +51,32 @@ def call_ollama_endpoint(model, prompt=None, image=None, temperature=0.5, max_to
 
         # Send image data using multipart/form-data
         files = {"file": (filename, image_bytesio, image_format)}
-        response = requests.post(f"{OLLAMA_URL}/generate", data=payload, files=files, stream=True)
+        response = requests.post(f"{api_url}/generate", data=payload, files=files, stream=True)
     else:
-        response = requests.post(f"{OLLAMA_URL}/generate", json=payload, stream=True)
+        response = requests.post(f"{api_url}/generate", json=payload, stream=True)
     try:
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         return f"An error occurred: {str(e)}", None, None, None  # Return None for eval_count and eval_duration
 
     response_parts = []
-    eval_count = None
-    eval_duration = None
-    for line in response.iter_lines():
-        part = json.loads(line)
+    part = {}
+    for part in iter_ollama_stream(response):
         response_parts.append(part.get("response", ""))
-        if part.get("done", False):
-            eval_count = part.get("eval_count", None)
-            eval_duration = part.get("eval_duration", None)
-            break
-    return "".join(response_parts), part.get("context", None), eval_count, eval_duration
+    return "".join(response_parts), part.get("context", None), part.get("eval_count", None), part.get("eval_duration", None)
 
-def check_json_handling(model, temperature, max_tokens, presence_penalty, frequency_penalty):
+def check_json_handling(model, temperature, max_tokens, presence_penalty, frequency_penalty, ollama_url=None):
     prompt = "Return the following data in JSON format: name: John, age: 30, city: New York"
-    result, _, _, _ = call_ollama_endpoint(model, prompt=prompt, temperature=temperature, max_tokens=max_tokens, presence_penalty=presence_penalty, frequency_penalty=frequency_penalty)
+    result, _, _, _ = call_ollama_endpoint(model, prompt=prompt, temperature=temperature, max_tokens=max_tokens, presence_penalty=presence_penalty, frequency_penalty=frequency_penalty, ollama_url=ollama_url)
     try:
         json.loads(result)
         return True
     except json.JSONDecodeError:
         return False
 
-def check_function_calling(model, temperature, max_tokens, presence_penalty, frequency_penalty):
+def check_function_calling(model, temperature, max_tokens, presence_penalty, frequency_penalty, ollama_url=None):
     prompt = "Define a function named 'add' that takes two numbers and returns their sum. Then call the function with arguments 5 and 3."
-    result, _, _, _ = call_ollama_endpoint(model, prompt=prompt, temperature=temperature, max_tokens=max_tokens, presence_penalty=presence_penalty, frequency_penalty=frequency_penalty)
+    result, _, _, _ = call_ollama_endpoint(model, prompt=prompt, temperature=temperature, max_tokens=max_tokens, presence_penalty=presence_penalty, frequency_penalty=frequency_penalty, ollama_url=ollama_url)
     return "8" in result
 
 def pull_model(model_name):
@@ -101,18 +105,17 @@ def pull_model(model_name):
         
         if data["status"] == "success":
             break
-        
+
+    get_model_catalog(OLLAMA_URL).invalidate()
     return results
 
 def show_model_info(model_name):
-    payload = {"name": model_name}
-    response = requests.post(f"{OLLAMA_URL}/show", json=payload)
-    response.raise_for_status()
-    return response.json()
+    return get_model_catalog(OLLAMA_URL).get_details([model_name])[model_name]
 
 def remove_model(model_name):
     payload = {"name": model_name}
     response = requests.delete(f"{OLLAMA_URL}/delete", json=payload)
+    get_model_catalog(OLLAMA_URL).invalidate()
     if response.status_code == 200:
         try:
             return response.json()
@@ -2,11 +2,34 @@ import os
 import requests
 import json
 import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
 from fpdf import FPDF
+from PyPDF2 import PdfMerger
 import tempfile
 import queue
+import shutil
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+from benchmark import configured_hosts
+from model_catalog import get_model_catalog, normalize_ollama_url
+from request_scheduler import get_request_scheduler
+from result_cache import ResultCache, content_hash
+from code_chunker import chunk_source, estimate_tokens
+import static_analysis
+from dependency_scanner import scan_repository, third_party_distributions
+from config import REQUEST_SLOTS
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+PROMPT_VERSION = 1  # Bump when a prompt below changes so cached results are regenerated
+DEFAULT_CHUNK_TOKENS = 3000
+
+# Map-step instructions for files too large for one prompt; the task's own prompt does the reduce step
+CHUNK_PROMPTS = {
+    "documentation": "Document this section: its purpose, each class and function with parameters and return values, and any notable logic or side effects.",
+    "debug": "Review this section line by line. List syntax errors, logical errors, performance issues and non-Pythonic practices, each with the line and a suggested fix.",
+    "readme": "Summarize what this section contributes to the project: features, entry points, configuration, dependencies and how a user interacts with it.",
+}
 
 class PDF(FPDF):
     def header(self):
@@ -72,19 +95,15 @@ def call_ollama_endpoint(model, prompt, temperature=0.5, max_tokens=150, presenc
         print(f"Error making request to {url}: {e}")
         return f"Error calling Ollama endpoint: {str(e)}", None, 0, 0
 
-@st.cache_data
 def get_available_models():
-    url = "http://localhost:11434/api/tags"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        models = response.json()['models']
-        return [model['name'] for model in models]
+        return get_model_catalog(DEFAULT_OLLAMA_URL).get_models(include_embed=True)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching available models: {e}")
         return []
 
-def generate_documentation_stream(file_content, task_type, model, temperature, max_tokens):
+def build_prompt(file_content, task_type):
+    """Returns the prompt for a task, or None for tasks that do not call the model."""
     if task_type == "documentation":
         prompt = f"""
 You are an expert in Python programming and technical writing. Your task is to generate comprehensive documentation and insightful commentary for the provided Python code. 
@@ -141,10 +160,34 @@ INSTRUCTION: Use appropriate Markdown formatting to make the README visually app
 
 {file_content}
 """
-    elif task_type == "requirements":
+    else:  # requirements
         return None
+    return prompt
 
-    url = "http://localhost:11434/api/generate"
+def generate_documentation_stream(file_content, task_type, model, temperature, max_tokens, ollama_url=DEFAULT_OLLAMA_URL):
+    prompt = build_prompt(file_content, task_type)
+    if prompt is None:
+        return
+
+    yield from stream_generate(prompt, model, temperature, max_tokens, ollama_url, label=f"repo_docs {task_type}")
+
+def build_chunk_prompt(chunk, file_path, task_type):
+    return f"""
+You are an expert Python programmer and technical writer. The file {file_path} is too large to analyze at once, so it is being analyzed one section at a time.
+{CHUNK_PROMPTS[task_type]} Be concise; your notes will be combined with the notes on the other sections.
+
+Section: {chunk['name']} (lines {chunk['start_line']}-{chunk['end_line']})
+
+{chunk['text']}
+"""
+
+def build_reduce_prompt(file_path, notes, task_type):
+    """The task's usual prompt, given per-section notes in place of the full code."""
+    sections = "\n\n".join(f"### {chunk['name']} (lines {chunk['start_line']}-{chunk['end_line']})\n{note}" for chunk, note in notes)
+    return build_prompt(f"(The file {file_path} is too large to show in full. Below are notes on each of its sections, in file order. Combine them into one coherent result.)\n\n{sections}", task_type)
+
+def stream_generate(prompt, model, temperature, max_tokens, ollama_url=DEFAULT_OLLAMA_URL, label="repo_docs"):
+    url = f"{ollama_url}/api/generate"
     payload = {
         "model": model,
         "prompt": prompt,
@@ -154,7 +197,8 @@ INSTRUCTION: Use appropriate Markdown formatting to make the README visually app
     }
     headers = {"Content-Type": "application/json"}
 
-    with requests.post(url, json=payload, headers=headers, stream=True) as response:
+    with get_request_scheduler().slot("batch", label=label, cancellable=False, host=ollama_url), \
+            requests.post(url, json=payload, headers=headers, stream=True) as response:
         response.raise_for_status()
         for line in response.iter_lines():
             if line:
@@ -167,6 +211,7 @@ INSTRUCTION: Use appropriate Markdown formatting to make the README visually app
                     print(f"Skipping invalid JSON line: {decoded_line}")
 
 def run_pylint(file_path):
+    """Per-file pylint subprocess; the fallback for callers that do not pass static_analysis results."""
     result = subprocess.run(['pylint', file_path], capture_output=True, text=True)
     return result.stdout
 
@@ -178,6 +223,19 @@ def get_all_code_files(root_dir):
                 code_files.append(os.path.join(subdir, file))
     return code_files
 
+def changed_files_since(repo_path, ref):
+    """Python files added, modified or renamed since `ref`, plus untracked ones, that still exist."""
+    changed = subprocess.run(['git', '-C', repo_path, 'diff', '--name-only', '--relative', '--diff-filter=ACMR', ref],
+                             capture_output=True, text=True, check=True).stdout.splitlines()
+    untracked = subprocess.run(['git', '-C', repo_path, 'ls-files', '--others', '--exclude-standard'],
+                               capture_output=True, text=True, check=True).stdout.splitlines()
+    code_files = []
+    for relative_path in dict.fromkeys(changed + untracked):
+        file_path = os.path.join(repo_path, relative_path)
+        if relative_path.endswith('.py') and os.path.isfile(file_path):
+            code_files.append(file_path)
+    return code_files
+
 def process_file_with_updates(file_path, task_type, model, temperature, max_tokens, progress_bar, status_text, output_area):
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -198,6 +256,16 @@ def process_file_with_updates(file_path, task_type, model, temperature, max_toke
         print(f"Error reading file {file_path}: UnicodeDecodeError")
         return file_path, f"Error reading file: UnicodeDecodeError", "", ""
 
+def format_chapter(file_path, documentation, pylint_report, file_content, task_type):
+    chapter_title = f"File: {file_path}"
+    if task_type == "debug":
+        chapter_body = f"Pylint Report:\n{pylint_report}\n\nDebug Report:\n{documentation}\n\nCode:\n{file_content}"
+    elif task_type == "documentation":
+        chapter_body = f"Documentation:\n{documentation}\n\nCode:\n{file_content}"
+    else:  # README
+        chapter_body = documentation
+    return chapter_title, chapter_body
+
 def generate_pdf(results, output_path, task_type):
     pdf = PDF()
     pdf.set_left_margin(10)
@@ -205,53 +273,251 @@ def generate_pdf(results, output_path, task_type):
     pdf.add_page()
 
     for file_path, documentation, pylint_report, file_content in results:
-        chapter_title = f"File: {file_path}"
-        if task_type == "debug":
-            chapter_body = f"Pylint Report:\n{pylint_report}\n\nDebug Report:\n{documentation}\n\nCode:\n{file_content}"
-        elif task_type == "documentation":
-            chapter_body = f"Documentation:\n{documentation}\n\nCode:\n{file_content}"
-        else:  # README
-            chapter_body = documentation
-        pdf.add_chapter(chapter_title, chapter_body)
+        pdf.add_chapter(*format_chapter(file_path, documentation, pylint_report, file_content, task_type))
 
     pdf.output(output_path, 'F')
 
-def process_file_with_updates(file_path, task_type, model, temperature, max_tokens, update_queue):
+def read_sidecar(sidecar_path):
+    """Yields the records of a report sidecar one at a time, skipping a torn last line."""
+    if not os.path.exists(sidecar_path):
+        return
+    with open(sidecar_path, 'r', encoding='utf-8') as sidecar:
+        for line in sidecar:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping invalid sidecar line in {sidecar_path}")
+
+def file_hash(file_path):
+    """Hash of a file's bytes as stored, so CRLF and undecodable files hash the same on every run. None if unreadable."""
+    try:
+        with open(file_path, 'rb') as file:
+            return content_hash(file.read())
+    except OSError:
+        return None
+
+def rerender_report(sidecar_path, output_path, task_type):
+    """Builds the PDF again from a sidecar, without calling the model."""
+    records = {}
+    for record in read_sidecar(sidecar_path):
+        records[record["file_path"]] = record  # Later records replace earlier ones for the same file
+    generate_pdf(((record["file_path"], record["documentation"], record["pylint_report"], record["file_content"]) for record in records.values()),
+                 output_path, task_type)
+
+class IncrementalReport:
+    """
+    Writes the PDF report one chapter at a time as files finish.
+
+    Each chapter is rendered to its own part PDF and its record appended (and fsynced)
+    to a JSONL sidecar next to the report, so nothing is held in memory and a crash loses
+    at most the file in progress. finalize() merges the parts in file order. With
+    resume=True, files whose sidecar record matches their current content, task and model
+    are skipped, unless that record is an error; the sidecar can also rebuild the PDF via
+    rerender_report.
+    """
+
+    def __init__(self, output_path, task_type, model, resume=False):
+        self.output_path = output_path
+        self.task_type = task_type
+        self.model = model
+        base, _ = os.path.splitext(output_path)
+        self.sidecar_path = f"{base}.jsonl"
+        self.parts_dir = os.path.join(os.path.dirname(output_path), f".{os.path.basename(base)}_parts")
+        self.records = {}  # File path -> (content hash, part path, error); chapter text stays on disk
+        if resume:
+            for record in read_sidecar(self.sidecar_path):
+                if record.get("task_type") == task_type and record.get("model") == model:
+                    self.records[record["file_path"]] = (record["content_hash"], record["part"], record.get("error", False))
+        else:
+            if os.path.exists(self.sidecar_path):
+                os.remove(self.sidecar_path)
+            if os.path.isdir(self.parts_dir):
+                shutil.rmtree(self.parts_dir)
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+    def is_done(self, file_path):
+        """True when a previous run already reported this file in its current state without an error."""
+        if file_path not in self.records:
+            return False
+        current_hash = file_hash(file_path)
+        recorded_hash, part_path, error = self.records[file_path]
+        return not error and current_hash is not None and recorded_hash == current_hash and os.path.exists(part_path)
+
+    def _part_path(self, file_path):
+        return os.path.join(self.parts_dir, f"{content_hash(file_path)[:16]}.pdf")
+
+    def add(self, file_path, documentation, pylint_report, file_content, error=False):
+        part_path = self._part_path(file_path)
+        pdf = PDF()
+        pdf.set_left_margin(10)
+        pdf.set_right_margin(10)
+        pdf.add_chapter(*format_chapter(file_path, documentation, pylint_report, file_content, self.task_type))
+        pdf.output(part_path, 'F')
+
+        record = {
+            "file_path": file_path,
+            "content_hash": file_hash(file_path),  # The bytes on disk, as is_done reads them
+            "task_type": self.task_type,
+            "model": self.model,
+            "part": part_path,
+            "documentation": documentation,
+            "pylint_report": pylint_report,
+            "file_content": file_content,
+            "error": error,  # Reported, but analyzed again on resume
+        }
+        with open(self.sidecar_path, 'a', encoding='utf-8') as sidecar:
+            sidecar.write(json.dumps(record) + "\n")
+            sidecar.flush()
+            os.fsync(sidecar.fileno())
+        self.records[file_path] = (record["content_hash"], part_path, error)
+
+    def documentation_for(self, file_path):
+        documentation = None
+        for record in read_sidecar(self.sidecar_path):
+            if record["file_path"] == file_path:
+                documentation = record["documentation"]
+        return documentation
+
+    def finalize(self, file_order):
+        """Merges the parts of the given files, in that order, into the report."""
+        merger = PdfMerger()
+        for file_path in file_order:
+            if file_path in self.records:
+                merger.append(self.records[file_path][1])
+        temp_path = f"{self.output_path}.tmp"
+        merger.write(temp_path)
+        merger.close()
+        os.replace(temp_path, self.output_path)
+
+def document_chunks(file_path, chunks, task_type, model, temperature, max_tokens, ollama_url, chunk_cache=None, chunk_workers=1, update_queue=None):
+    """
+    Map step: analyzes each chunk on its own, `chunk_workers` at a time.
+
+    Notes are cached per chunk content, so after editing one function only that
+    function's chunk is sent to the model again. Returns [(chunk, note)] in file order.
+    """
+    completed = []
+
+    def analyze(chunk):
+        cache_key = [content_hash(chunk["text"]), task_type, model, PROMPT_VERSION, "chunk"]
+        note = chunk_cache.get(cache_key) if chunk_cache is not None else None
+        if note is None:
+            note = "".join(stream_generate(build_chunk_prompt(chunk, file_path, task_type), model, temperature, max_tokens, ollama_url, label=f"repo_docs {task_type} chunk"))
+            if chunk_cache is not None:
+                chunk_cache.set(cache_key, note)
+        completed.append(chunk)
+        if update_queue is not None:
+            update_queue.put(("status", f"Processing: {file_path} on {ollama_url} ({len(completed)}/{len(chunks)} sections)"))
+        return note
+
+    with ThreadPoolExecutor(max_workers=chunk_workers) as executor:
+        notes = list(executor.map(analyze, chunks))
+    return list(zip(chunks, notes))
+
+def process_file_with_updates(file_path, task_type, model, temperature, max_tokens, update_queue, ollama_url=DEFAULT_OLLAMA_URL, cache=None, chunk_cache=None, chunk_tokens=None, chunk_workers=1, lint_reports=None):
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
             file_content = file.read()
+
+        # Files over the chunk budget are map-reduced over AST chunks instead of sent whole
+        chunked = chunk_tokens is not None and estimate_tokens(file_content) > chunk_tokens
+
+        # Unchanged files are served from the cache; the key covers everything that shapes the output
+        cache_key = [content_hash(file_content), task_type, model, PROMPT_VERSION, chunk_tokens if chunked else None]
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            update_queue.put(("status", f"Cached: {file_path}"))
+            return file_path, cached["documentation"], cached["pylint_report"], file_content
         
         # Update status
-        update_queue.put(("status", f"Processing: {file_path}"))
+        update_queue.put(("status", f"Processing: {file_path} on {ollama_url}"))
         
         # Generate documentation with real-time updates
+        if chunked:
+            notes = document_chunks(file_path, chunk_source(file_content, chunk_tokens), task_type, model, temperature, max_tokens, ollama_url, chunk_cache, chunk_workers, update_queue)
+            stream = stream_generate(build_reduce_prompt(file_path, notes, task_type), model, temperature, max_tokens, ollama_url, label=f"repo_docs {task_type} reduce")
+        else:
+            stream = generate_documentation_stream(file_content, task_type, model, temperature, max_tokens, ollama_url)
         documentation = ""
-        for chunk in generate_documentation_stream(file_content, task_type, model, temperature, max_tokens):
+        for chunk in stream:
             documentation += chunk
             update_queue.put(("output", documentation))
         
-        pylint_report = run_pylint(file_path) if task_type == "debug" else ""
+        if task_type != "debug":
+            pylint_report = ""
+        elif lint_reports is not None:  # Already analyzed for the whole file set by static_analysis
+            pylint_report = lint_reports.get(os.path.abspath(file_path), "")
+        else:
+            pylint_report = run_pylint(file_path)
+        if cache is not None:
+            cache.set(cache_key, {"documentation": documentation, "pylint_report": pylint_report})
         return file_path, documentation, pylint_report, file_content
     except UnicodeDecodeError:
         print(f"Error reading file {file_path}: UnicodeDecodeError")
-        return file_path, f"Error reading file: UnicodeDecodeError", "", ""
+        return file_path, f"Error reading file: UnicodeDecodeError", "", "", True
+
+def analyze_files(code_files, task_type, model, temperature, max_tokens, hosts, workers_per_host, update_queue, cache=None, on_result=None, poll=None, chunk_tokens=None, chunk_cache=None, lint_reports=None):
+    """
+    Processes files with `workers_per_host` concurrent requests on each Ollama host.
+
+    Workers on every host pull from one shared queue, so faster hosts take more files.
+    Each host's batch limit in the request scheduler is raised to match for the length of
+    the run, so interactive requests to that host still go first. `on_result(completed, result)` and `poll()` run
+    on the calling thread, which keeps Streamlit calls off the workers. A result is
+    (file_path, documentation, pylint_report, file_content), with a trailing True when the
+    file failed. Results are returned only when there is no on_result, so a callback that
+    writes them out keeps memory bounded.
+    """
+    scheduler = get_request_scheduler()
+    with ExitStack() as limits:
+        for host in hosts:  # Restored when the run ends, so other callers get the usual limits back
+            limits.enter_context(scheduler.override_host_limits(host, slots=max(REQUEST_SLOTS, workers_per_host), class_limits={"batch": workers_per_host}))
+        pending = queue.Queue()
+        for file_path in code_files:
+            pending.put(file_path)
+        finished = queue.Queue()
+
+        def worker(host):
+            while True:
+                try:
+                    file_path = pending.get(block=False)
+                except queue.Empty:
+                    return
+                try:
+                    result = process_file_with_updates(file_path, task_type, model, temperature, max_tokens, update_queue, host, cache, chunk_cache, chunk_tokens, workers_per_host, lint_reports)
+                except Exception as e:  # Keep going; a dead worker would leave its file unreported
+                    print(f"Error processing {file_path} on {host}: {e}")
+                    result = (file_path, f"Error processing file: {e}", "", "", True)
+                finished.put(result)
 
-def generate_requirements_file(repo_path):
-    requirements = set()
-    code_files = get_all_code_files(repo_path)
-    for code_file in code_files:
-        with open(code_file, 'r') as file:
-            for line in file:
-                if line.startswith('import ') or line.startswith('from '):
-                    parts = line.split()
-                    if parts[0] == 'import':
-                        requirements.add(parts[1].split('.')[0])
-                    elif parts[0] == 'from':
-                        requirements.add(parts[1].split('.')[0])
+        threads = [threading.Thread(target=worker, args=(host,), daemon=True) for host in hosts for _ in range(workers_per_host)]
+        for thread in threads:
+            thread.start()
 
+        results = []
+        completed = 0
+        while completed < len(code_files):
+            try:
+                result = finished.get(timeout=0.2)
+            except queue.Empty:
+                if poll:
+                    poll()
+                continue
+            completed += 1
+            if on_result:
+                on_result(completed, result)
+            else:
+                results.append(result)
+        for thread in threads:
+            thread.join()
+        return results
+
+def generate_requirements_file(repo_path, scan=None):
+    """Writes requirements.txt with the third-party distributions the repository imports."""
+    scan = scan or scan_repository(repo_path)
     requirements_path = os.path.join(repo_path, 'requirements.txt')
     with open(requirements_path, 'w') as req_file:
-        for requirement in sorted(requirements):
+        for requirement in third_party_distributions(scan):
             req_file.write(requirement + '\n')
     return requirements_path
 
@@ -268,23 +534,67 @@ def main():
     temperature = st.slider("Temperature", min_value=0.0, max_value=1.0, value=0.2, step=0.1)
     max_tokens = st.slider("Max Tokens", min_value=100, max_value=32000, value=4000, step=100)
 
+    hosts_text = st.text_input("Ollama hosts (comma-separated)", value=", ".join(configured_hosts()))
+    hosts = [normalize_ollama_url(host) for host in hosts_text.split(",") if host.strip()] or [DEFAULT_OLLAMA_URL]
+    workers_per_host = st.slider("Concurrent requests per host", min_value=1, max_value=8, value=1,
+                                 help="Raise to match OLLAMA_NUM_PARALLEL on the hosts.")
+    chunk_tokens = st.slider("Chunk size (tokens)", min_value=500, max_value=16000, value=DEFAULT_CHUNK_TOKENS, step=500,
+                             help="Larger files are split along class and function boundaries, analyzed per section and then merged.")
+    use_cache = st.checkbox("Skip unchanged files (use cached results)", value=True)
+    resume = st.checkbox("Resume the previous report (skip files it already covers)", value=False)
+    measure_lint_speedup = False
+    if task_type == "debug":
+        measure_lint_speedup = st.checkbox("Measure static analysis speedup against per-file pylint runs", value=False)
+    diff_ref = st.text_input("Only analyze files changed since git ref (optional)", placeholder="e.g. main or HEAD~5")
+
+    # A previous run's sidecar can rebuild its PDF, e.g. after a layout change, without calling the model
+    pdf_filename = f"repository_{task_type}_report.pdf"
+    pdf_path = os.path.join(repo_path, pdf_filename) if repo_path else None
+    sidecar_path = f"{os.path.splitext(pdf_path)[0]}.jsonl" if pdf_path else None
+    if sidecar_path and os.path.exists(sidecar_path) and st.button("Re-render Report from Saved Results"):
+        rerender_report(sidecar_path, pdf_path, task_type)
+        st.success(f"{pdf_filename} was rebuilt from {os.path.basename(sidecar_path)} without calling the model.")
+
     if st.button("Analyze Repository"):
         if not repo_path or not os.path.isdir(repo_path):
             st.error("Please enter a valid repository path.")
             return
 
         if task_type == "requirements":
-            requirements_path = generate_requirements_file(repo_path)
+            scan = scan_repository(repo_path)
+            requirements_path = generate_requirements_file(repo_path, scan)
+            stats = scan["stats"]
             st.success(f"requirements.txt file has been created at {requirements_path}")
+            st.info(f"Scanned {stats['files']} files in {stats['seconds']:.2f}s: {stats['parsed']} parsed, "
+                    f"{stats['cached'] + stats['rehashed']} unchanged and taken from the cache.")
+            st.dataframe([
+                {"Module": module, "Kind": info["kind"], "Distribution": info["distribution"] or "", "Files": len(info["files"])}
+                for module, info in sorted(scan["modules"].items(), key=lambda item: (item[1]["kind"], item[0].lower()))
+            ])
+            if scan["errors"]:
+                st.warning("Could not parse: " + ", ".join(scan["errors"]))
             return
 
-        code_files = get_all_code_files(repo_path)
+        if diff_ref:
+            try:
+                code_files = changed_files_since(repo_path, diff_ref)
+            except (OSError, subprocess.CalledProcessError) as e:
+                st.error(f"Could not diff against '{diff_ref}': {getattr(e, 'stderr', None) or e}")
+                return
+        else:
+            code_files = get_all_code_files(repo_path)
 
         if not code_files:
-            st.warning("No Python files found in the specified directory.")
+            st.warning("No Python files found in the specified directory." if not diff_ref else f"No Python files changed since {diff_ref}.")
             return
 
-        results = []
+        # Chapters go straight to disk as files finish; see IncrementalReport
+        report = IncrementalReport(pdf_path, task_type, model, resume=resume)
+        all_files = code_files
+        code_files = [file_path for file_path in all_files if not report.is_done(file_path)]
+        if len(code_files) < len(all_files):
+            st.info(f"Resuming: {len(all_files) - len(code_files)} files were already reported by a previous run.")
+
         progress_bar = st.progress(0)
         status_text = st.empty()
         output_area = st.empty()
@@ -303,27 +613,46 @@ def main():
                 except queue.Empty:
                     break
 
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            futures = {executor.submit(process_file_with_updates, file_path, task_type, model, temperature, max_tokens, update_queue): file_path for file_path in code_files}
-            for i, future in enumerate(as_completed(futures)):
-                file_path, documentation, pylint_report, file_content = future.result()
-                results.append((file_path, documentation, pylint_report, file_content))
-                progress = (i + 1) / len(code_files)
-                progress_bar.progress(progress)
-                update_ui()
+        def on_result(completed, result):
+            report.add(*result)
+            progress_bar.progress(completed / len(code_files))
+            update_ui()
+
+        cache = ResultCache("repo_docs") if use_cache else None
+        chunk_cache = ResultCache("repo_docs_chunks") if use_cache else None
+        lint_reports = None
+        if task_type == "debug":
+            status_text.text(f"Running static analysis on {len(code_files)} files...")
+            lint_results, lint_stats = static_analysis.analyze_files(code_files, cache=ResultCache("static_analysis") if use_cache else None)
+            lint_reports = {file_path: static_analysis.format_report(messages) for file_path, messages in lint_results.items()}
+            st.info(f"Static analysis ({lint_stats['engine']}): {lint_stats['analyzed']} files analyzed, {lint_stats['cached']} cached, "
+                    f"{lint_stats['seconds']:.2f}s with {lint_stats['workers']} processes.")
+            if measure_lint_speedup and not static_analysis.speedup_measurable(lint_stats):
+                st.info("The speedup is only measured for a pylint run without cached results; "
+                        "this run used the AST linter or the cache, so it would not compare like with like.")
+            elif measure_lint_speedup:
+                speedup = static_analysis.speedup_summary(lint_stats, static_analysis.estimate_subprocess_baseline(code_files))
+                if speedup:
+                    st.info(f"Per-file pylint subprocesses would take about {speedup['baseline_seconds']:.1f}s: {speedup['speedup']:.1f}x speedup.")
+                else:
+                    st.warning("Could not run the pylint command to measure a baseline.")
+        analyze_files(code_files, task_type, model, temperature, max_tokens, hosts, workers_per_host, update_queue, cache, on_result, poll=update_ui,
+                      chunk_tokens=chunk_tokens, chunk_cache=chunk_cache, lint_reports=lint_reports)
 
         progress_bar.empty()
         status_text.empty()
+        if cache is not None:
+            st.info(f"{cache.hits} of {len(code_files)} files were unchanged and served from the cache; "
+                    f"{chunk_cache.hits} sections of changed large files were reused.")
 
-        # Generate and save PDF report
-        pdf_filename = f"repository_{task_type}_report.pdf"
-        pdf_path = os.path.join(repo_path, pdf_filename)
-        generate_pdf(results, pdf_path, task_type)
+        # Merge the chapter parts into the PDF report
+        report.finalize(all_files)
         
-        st.success(f"Analysis complete! PDF report saved as {pdf_filename} in the repository folder.")
+        st.success(f"Analysis complete! PDF report saved as {pdf_filename} in the repository folder, "
+                   f"with the raw results in {os.path.basename(report.sidecar_path)}.")
 
         if task_type == "readme":
-            readme_content = results[0][1] if results else "No content generated"
+            readme_content = report.documentation_for(all_files[0]) or "No content generated"
             readme_path = os.path.join(repo_path, "README.md")
             with open(readme_path, "w") as readme_file:
                 readme_file.write(readme_content)
@@ -0,0 +1,62 @@
+# result_cache.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, "cache")
+
+def content_hash(content):
+    """SHA-256 of a file's text (or bytes)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+class ResultCache:
+    """
+    Persistent key/value store for expensive results, one JSON file per entry.
+
+    Keys are any JSON-serializable value (typically a tuple such as content hash, task,
+    model and prompt version) and are hashed into a file name, sharded by prefix so a
+    directory never grows too large. Writes go through a temp file and os.replace, so
+    concurrent workers never see a half-written entry.
+    """
+
+    def __init__(self, namespace, cache_dir=CACHE_DIR):
+        self.directory = os.path.join(cache_dir, namespace)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def get(self, key, default=None):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                value = json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "value": value}, f)
+        os.replace(temp_path, path)
+
+    def clear(self):
+        """Deletes every entry in this namespace."""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    os.remove(os.path.join(root, name))
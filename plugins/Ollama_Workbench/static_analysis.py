@@ -0,0 +1,195 @@
+# static_analysis.py
+import ast
+import io
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from result_cache import content_hash
+
+try:
+    import pylint
+    from pylint.lint import Run as PylintRun
+    from pylint.reporters.json_reporter import JSONReporter
+    PYLINT_VERSION = pylint.__version__
+except ImportError:
+    PylintRun = None
+    PYLINT_VERSION = None
+
+AST_LINTER_VERSION = 1  # Bump when a check below changes so cached results are recomputed
+MAX_LINE_LENGTH = 100  # pylint's default
+BASELINE_SAMPLE = 3  # Files timed with a per-file pylint subprocess to estimate the old cost
+
+def available_engine():
+    """'pylint' when it can run in-process, otherwise the built-in AST linter."""
+    return "pylint" if PylintRun is not None else "ast"
+
+def _message(line, column, symbol, message_id, message):
+    kind = {"C": "convention", "R": "refactor", "W": "warning", "E": "error", "F": "fatal"}[message_id[0]]
+    return {"line": line, "column": column, "symbol": symbol, "message_id": message_id, "type": kind, "message": message}
+
+def lint_source(source):
+    """
+    A small AST linter for when pylint is not installed.
+
+    It covers a handful of pylint's checks and reports them with pylint's ids and symbols,
+    so reports look the same whichever engine produced them.
+    """
+    messages = []
+    for line_number, line in enumerate(source.splitlines(), start=1):
+        if len(line) > MAX_LINE_LENGTH:
+            messages.append(_message(line_number, 0, "line-too-long", "C0301", f"Line too long ({len(line)}/{MAX_LINE_LENGTH})"))
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as error:
+        messages.append(_message(error.lineno or 1, error.offset or 0, "syntax-error", "E0001", f"Parsing failed: '{error.msg}'"))
+        return messages
+
+    imported = {}  # Bound name -> import node
+    used = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+                continue  # Compiler directives, never unused
+            for alias in node.names:
+                if alias.name != "*":
+                    imported[(alias.asname or alias.name).split(".")[0]] = node
+        elif isinstance(node, ast.Name):
+            used.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            root = node
+            while isinstance(root, ast.Attribute):
+                root = root.value
+            if isinstance(root, ast.Name):
+                used.add(root.id)
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            messages.append(_message(node.lineno, node.col_offset, "bare-except", "W0702", "No exception type(s) specified"))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+                if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                    messages.append(_message(default.lineno, default.col_offset, "dangerous-default-value", "W0102",
+                                             f"Dangerous default value as argument of '{node.name}'"))
+        elif isinstance(node, ast.Compare):
+            for operator, comparator in zip(node.ops, node.comparators):
+                if isinstance(operator, (ast.Eq, ast.NotEq)) and isinstance(comparator, ast.Constant) and (comparator.value is None or isinstance(comparator.value, bool)):
+                    messages.append(_message(node.lineno, node.col_offset, "singleton-comparison", "C0121",
+                                             f"Comparison to {comparator.value} should use 'is' or 'is not'"))
+
+    exported = set()
+    for node in tree.body:  # Names listed in __all__ count as used
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                exported.update(element.value for element in node.value.elts if isinstance(element, ast.Constant))
+    for name, node in imported.items():
+        if name not in used and name not in exported:
+            messages.append(_message(node.lineno, node.col_offset, "unused-import", "W0611", f"Unused import {name}"))
+    return sorted(messages, key=lambda message: (message["line"], message["column"]))
+
+def lint_file(file_path):
+    """AST-lints one file. Runs in a worker process."""
+    with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+        return file_path, lint_source(file.read())
+
+def pylint_files(file_paths):
+    """Runs pylint in-process over a batch of files and groups its JSON messages by file. Runs in a worker process."""
+    output = io.StringIO()
+    PylintRun(["--persistent=n", "--jobs=1", *file_paths], reporter=JSONReporter(output), exit=False)
+    results = {os.path.abspath(file_path): [] for file_path in file_paths}
+    for entry in json.loads(output.getvalue() or "[]"):
+        messages = results.setdefault(os.path.abspath(entry["path"]), [])
+        messages.append(_message(entry["line"], entry["column"], entry["symbol"], entry["message-id"], entry["message"]))
+    return results
+
+def format_report(messages):
+    """Renders one file's messages as text, one line per message, like pylint's text output."""
+    if not messages:
+        return "No issues found."
+    return "\n".join(f"{message['line']}:{message['column']}: {message['message_id']} ({message['symbol']}) {message['message']}" for message in messages)
+
+def analyze_files(file_paths, workers=None, engine=None, cache=None, progress_callback=None):
+    """
+    Statically analyzes a set of files in a process pool.
+
+    Results are cached by file content hash and analyzer version, so only new or changed
+    files are analyzed. pylint runs once per worker over a batch of files instead of once
+    per file; without pylint, files are linted one by one by the AST linter.
+    Returns ({absolute path: [messages]}, stats).
+    """
+    engine = engine or available_engine()
+    workers = workers or os.cpu_count() or 1
+    version = PYLINT_VERSION if engine == "pylint" else AST_LINTER_VERSION
+    started = time.perf_counter()
+
+    results, to_analyze, keys = {}, [], {}
+    for file_path in file_paths:
+        file_path = os.path.abspath(file_path)
+        try:
+            with open(file_path, "rb") as file:
+                keys[file_path] = [content_hash(file.read()), engine, version]
+        except OSError:
+            continue
+        cached = cache.get(keys[file_path]) if cache is not None else None
+        if cached is not None:
+            results[file_path] = cached
+        else:
+            to_analyze.append(file_path)
+
+    if to_analyze:
+        with ProcessPoolExecutor(max_workers=min(workers, len(to_analyze))) as executor:
+            if engine == "pylint":
+                batches = [to_analyze[index::workers] for index in range(min(workers, len(to_analyze)))]
+                analyzed = {}
+                for batch_results in executor.map(pylint_files, batches):
+                    analyzed.update(batch_results)
+                    if progress_callback:
+                        progress_callback(len(analyzed), len(to_analyze))
+                analyzed = analyzed.items()
+            else:
+                analyzed = executor.map(lint_file, to_analyze, chunksize=max(1, len(to_analyze) // (workers * 4)))
+            for file_path, messages in analyzed:
+                results[file_path] = messages
+                if cache is not None and file_path in keys:
+                    cache.set(keys[file_path], messages)
+
+    stats = {
+        "engine": engine,
+        "files": len(keys),
+        "cached": len(keys) - len(to_analyze),
+        "analyzed": len(to_analyze),
+        "workers": workers,
+        "seconds": time.perf_counter() - started,
+    }
+    return results, stats
+
+def estimate_subprocess_baseline(file_paths, sample=BASELINE_SAMPLE):
+    """
+    Estimates what running `pylint <file>` in a subprocess per file would take for all files.
+
+    A few files are timed and the mean is extrapolated, since timing every file would cost
+    as much as the old approach. Returns None when the pylint command is not available.
+    """
+    sampled = list(file_paths)[:sample]
+    if not sampled:
+        return None
+    started = time.perf_counter()
+    try:
+        for file_path in sampled:
+            subprocess.run(["pylint", file_path], capture_output=True, text=True)
+    except OSError:
+        return None
+    return (time.perf_counter() - started) / len(sampled) * len(file_paths)
+
+def speedup_measurable(stats):
+    """Only a pylint run that analyzed every file does the same work as the per-file baseline."""
+    return stats["engine"] == "pylint" and stats["cached"] == 0
+
+def speedup_summary(stats, baseline_seconds):
+    if not speedup_measurable(stats) or not baseline_seconds or not stats["seconds"]:
+        return None
+    return {
+        "baseline_seconds": baseline_seconds,
+        "seconds": stats["seconds"],
+        "speedup": baseline_seconds / stats["seconds"],
+    }
@@ -11,18 +11,32 @@ import requests
 import re
 from langchain_community.embeddings import OllamaEmbeddings # Updated import
 from langchain_community.vectorstores import Chroma # Updated import
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.docstore.document import Document
+import chromadb
+import hashlib
 from prompts import get_agent_prompt, get_metacognitive_prompt, manage_prompts
+from corpus_reader import CorpusReader, DEFAULT_PAGE_LINES
+from corpus_format import CorpusFile, convert_to_corpus, is_corpus_file
+from model_catalog import get_model_catalog
+from benchmark import configured_hosts, host_rows, save_benchmark_results, summary_rows
+
+CORPUS_EMBED_BATCH_SIZE = 64  # Chunks sent to the vector database per batch
+MAX_EDITABLE_FILE_BYTES = 1024 * 1024  # Larger files are previewed page by page instead of edited whole
+CORPUS_READER_CACHE_SIZE = 16  # Previewed files kept memory-mapped across reruns
 
 def list_local_models():
-    response = requests.get(f"{OLLAMA_URL}/tags")
-    response.raise_for_status()
-    models = response.json().get("models", [])
+    catalog = get_model_catalog(OLLAMA_URL)
+    models = catalog.get_model_entries()
     if not models:
         st.write("No local models available.")
         return
-    
+
+    # /api/show metadata is cached per model digest and fetched concurrently for new models
+    try:
+        details = catalog.get_details([model['name'] for model in models])
+    except requests.exceptions.RequestException as e:
+        st.warning(f"Unable to fetch model details: {e}")
+        details = {}
+
     # Prepare data for the dataframe
     data = []
     for model in models:
@@ -30,9 +44,14 @@ def list_local_models():
         modified_at = model.get('modified_at', 'Unknown')
         if modified_at != 'Unknown':
             modified_at = datetime.fromisoformat(modified_at).strftime('%Y-%m-%d %H:%M:%S')
+        model_details = details.get(model['name'], {})
+        model_info = model_details.get('model_info', {})
         data.append({
             "Model Name": model['name'],
             "Size (GB)": size_gb,
+            "Parameters": model_details.get('details', {}).get('parameter_size', ''),
+            "Quantization": model_details.get('details', {}).get('quantization_level', ''),
+            "Context Length": next((value for key, value in model_info.items() if key.endswith('.context_length')), None),
             "Modified At": modified_at
         })
     
@@ -50,21 +69,28 @@ def update_model_selection(selected_models, key):
     """Callback function to update session state during form submission."""
     st.session_state[key] = selected_models
 
-@st.cache_data  # Cache the comparison and visualization logic
-def run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty):
-    results = performance_test(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty)
-
-    # Prepare data for visualization
-    models = list(results.keys())  # Get models from results
-    times = [results[model][1] for model in models]
-    tokens_per_second = [
-        results[model][2] / (results[model][3] / (10**9)) if results[model][2] and results[model][3] else 0
-        for model in models
-    ]
-
-    df = pd.DataFrame({"Model": models, "Time (seconds)": times, "Tokens/second": tokens_per_second})
-
-    return results, df, tokens_per_second, models  # Return models
+def run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty, warmup_runs=1, repetitions=5, hosts=None, normalize=True):
+    # Measurements are not cached: every click is a fresh benchmark run
+    results = performance_test(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty, warmup_runs=warmup_runs, repetitions=repetitions, hosts=hosts, normalize=normalize)
+    results_path = save_benchmark_results(results)
+    df = pd.DataFrame(summary_rows(results))
+    return results, df, results_path
+
+def plot_benchmark_distributions(results):
+    # One box per model for each metric, so spread and outliers are visible instead of a single bar
+    metrics = [("time_to_first_token", "Time to first token (s)"), ("total_latency", "Total latency (s)"), ("eval_tokens_per_second", "Eval tokens/second")]
+    models = list(results["models"].keys())
+    fig, axes = plt.subplots(1, len(metrics), figsize=(6 * len(metrics), 4))
+    for ax, (metric, label) in zip(axes, metrics):
+        data = [
+            [sample[metric] for sample in results["models"][model]["samples"] if sample["error"] is None and sample.get(metric) is not None]
+            for model in models
+        ]
+        ax.boxplot([values or [0] for values in data], labels=models, showfliers=True)
+        ax.set_title(label)
+        ax.tick_params(axis="x", rotation=30)
+    fig.tight_layout()
+    return fig
 
 def model_comparison_test():
     st.header("Model Comparison by Response Quality")
@@ -94,22 +120,55 @@ def model_comparison_test():
     with col4:
         frequency_penalty = st.slider("Frequency Penalty", min_value=-2.0, max_value=2.0, value=0.0, step=0.1)
 
+    col1, col2 = st.columns(2)
+    with col1:
+        warmup_runs = st.slider("Warmup Runs", min_value=0, max_value=5, value=1, step=1)
+    with col2:
+        repetitions = st.slider("Measured Runs", min_value=1, max_value=50, value=5, step=1)
+
+    hosts_text = st.text_input("Ollama hosts (comma-separated, defaults to OLLAMA_HOSTS):", value=", ".join(configured_hosts()))
+    hosts = [host.strip() for host in hosts_text.split(",") if host.strip()]
+    normalize = st.checkbox("Normalize results across hosts", value=True, help="Calibrates every host on a model they share and scales results to the first host.")
+
     prompt = st.text_area("Enter the prompt:", value="Write a short story about a brave knight.")
 
     # Check if the button is clicked
     if st.button(label='Compare Models'):
         if selected_models:
-            # Run the comparison and get the results, dataframe, tokens_per_second, and models
-            results, df, tokens_per_second, models = run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty)
-
-            # Plot the results using st.bar_chart
-            st.bar_chart(df, x="Model", y=["Time (seconds)", "Tokens/second"], color=["#4CAF50", "#FFC107"])  # Green and amber
-
-            for model, (result, elapsed_time, eval_count, eval_duration) in results.items():
-                st.subheader(f"Results for {model} (Time taken: {elapsed_time:.2f} seconds, Tokens/second: {tokens_per_second[models.index(model)]:.2f}):")
-                st.write(result)
-                st.write("JSON Handling Capability: ", "✅" if check_json_handling(model, temperature, max_tokens, presence_penalty, frequency_penalty) else "❌")
-                st.write("Function Calling Capability: ", "✅" if check_function_calling(model, temperature, max_tokens, presence_penalty, frequency_penalty) else "❌")
+            # Run the benchmark and get the results, the percentile table and the saved JSON path
+            results, df, results_path = run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty, warmup_runs, repetitions, hosts, normalize)
+
+            # Plot the distributions, then the p50/p90/p99 table
+            st.pyplot(plot_benchmark_distributions(results))
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            if len(results["hosts"]) > 1:
+                st.subheader(f"Host Utilization (wall time: {results['wall_time']:.1f} seconds)")
+                host_df = pd.DataFrame(host_rows(results))
+                st.dataframe(host_df, use_container_width=True, hide_index=True)
+                st.bar_chart(host_df, x="Host", y="Utilization", color="#4CAF50")
+            st.download_button(
+                label="Download Benchmark JSON",
+                data=json.dumps(results, indent=2),
+                file_name=os.path.basename(results_path),
+                mime="application/json",
+            )
+            st.caption(f"Results saved to {results_path}")
+
+            for model, model_results in results["models"].items():
+                stats = model_results["summary"]
+                latency = (stats.get("total_latency") or {}).get("p50") or 0
+                tokens_per_second = (stats.get("eval_tokens_per_second") or {}).get("p50") or 0
+                st.subheader(f"Results for {model} (p50 latency: {latency:.2f} seconds, p50 tokens/second: {tokens_per_second:.2f}):")
+                first_success = next((sample for sample in model_results["samples"] if sample["error"] is None), None)
+                if first_success:
+                    st.write(first_success["response"])
+                else:
+                    st.write(model_results.get("error") or model_results["samples"][0]["error"])
+                    continue
+                # Checked on the host the model was benchmarked on
+                host = model_results["ollama_url"]
+                st.write("JSON Handling Capability: ", "✅" if check_json_handling(model, temperature, max_tokens, presence_penalty, frequency_penalty, ollama_url=host) else "❌")
+                st.write("Function Calling Capability: ", "✅" if check_function_calling(model, temperature, max_tokens, presence_penalty, frequency_penalty, ollama_url=host) else "❌")
         else:
             st.warning("Please select at least one model.")
 
@@ -417,9 +476,6 @@ def remove_model_ui():
             result = remove_model(selected_model)
             st.write(result["message"])
 
-            # Clear the cache of get_available_models
-            get_available_models.clear()
-
             # Update the list of available models
             st.session_state.available_models = get_available_models()
             # Update selected_model if it was removed
@@ -594,7 +650,7 @@ def files_tab():
     files = [f for f in os.listdir(files_folder) if os.path.isfile(os.path.join(files_folder, f))]
 
     for file in files:
-        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 1, 1])
         with col1:
             st.write(file)
         with col2:
@@ -603,33 +659,46 @@ def files_tab():
             else:
                 st.button("👁️", key=f"view_{file}")
         with col3:
-            if not file.endswith('.pdf'):
+            if not file.endswith('.pdf') and not is_corpus_file(file):
                 st.button("✏️", key=f"edit_{file}")
         with col4:
+            if file.endswith(('.json', '.txt')):
+                st.button("📦", key=f"convert_{file}", help="Convert to a chunked .corpus file")
+        with col5:
             st.button("🗑️", key=f"delete_{file}")
 
     for file in files:
         file_path = os.path.join(files_folder, file)
-        
-        if st.session_state.get(f"view_{file}", False):
-            try:
-                with open(file_path, "r", encoding='utf-8') as f:
-                    file_content = f.read()
-                st.text_area("File Content:", value=file_content, height=200, key=f"view_content_{file}")
-            except UnicodeDecodeError:
-                st.error(f"Unable to decode file {file}. It may be a binary file.")
-        
+        previewing = st.session_state.get(f"view_{file}", False) or st.session_state.get(f"view_page_{file}") is not None
+
+        if is_corpus_file(file):
+            if st.session_state.get(f"view_{file}", False):
+                with CorpusFile(file_path) as corpus:
+                    st.write(f"{len(corpus.documents)} documents, {corpus.chunk_count} chunks in {len(corpus.blocks)} blocks")
+                    st.dataframe(pd.DataFrame(corpus.documents), use_container_width=True, hide_index=True)
+        elif previewing:
+            display_file_page(file, file_path)
+
+        if st.session_state.get(f"convert_{file}", False):
+            corpus_path = convert_to_corpus(file_path)
+            st.success(f"Converted {file} to {os.path.basename(corpus_path)}")
+
         if st.session_state.get(f"edit_{file}", False):
-            try:
-                with open(file_path, "r", encoding='utf-8') as f:
-                    file_content = f.read()
-                new_content = st.text_area("Edit File Content:", value=file_content, height=200, key=f"edit_content_{file}")
-                if st.button("Save Changes", key=f"save_{file}"):
-                    with open(file_path, "w", encoding='utf-8') as f:
-                        f.write(new_content)
-                    st.success(f"Changes saved to {file}")
-            except UnicodeDecodeError:
-                st.error(f"Unable to decode file {file}. It may be a binary file.")
+            if os.path.getsize(file_path) > MAX_EDITABLE_FILE_BYTES:
+                st.warning(f"{file} is too large to edit in the browser. Showing a paged preview instead.")
+                if not previewing:  # The preview above already shows it
+                    display_file_page(file, file_path)
+            else:
+                try:
+                    with open(file_path, "r", encoding='utf-8') as f:
+                        file_content = f.read()
+                    new_content = st.text_area("Edit File Content:", value=file_content, height=200, key=f"edit_content_{file}")
+                    if st.button("Save Changes", key=f"save_{file}"):
+                        with open(file_path, "w", encoding='utf-8') as f:
+                            f.write(new_content)
+                        st.success(f"Changes saved to {file}")
+                except UnicodeDecodeError:
+                    st.error(f"Unable to decode file {file}. It may be a binary file.")
         
         if st.session_state.get(f"download_{file}", False):
             if file.endswith('.pdf'):
@@ -658,7 +727,7 @@ def files_tab():
     
 
    # File upload section
-    uploaded_file = st.file_uploader("Upload a file", type=['txt', 'pdf', 'json'])
+    uploaded_file = st.file_uploader("Upload a file", type=['txt', 'pdf', 'json', 'corpus'])
     if uploaded_file is not None:
         file_path = os.path.join(files_folder, uploaded_file.name)
         with open(file_path, "wb") as f:
@@ -731,6 +800,28 @@ def files_tab():
                 st.cache_resource.clear()
                 st.rerun()
 
+@st.cache_resource(max_entries=CORPUS_READER_CACHE_SIZE)
+def get_corpus_reader(file_path, mtime):
+    # mtime is part of the cache key so an edited file gets a fresh index. The cache owns
+    # the readers: one it evicts closes its mmap once no session still holds it
+    return CorpusReader(file_path).open()
+
+def display_file_page(file, file_path):
+    reader = get_corpus_reader(file_path, os.path.getmtime(file_path))
+    if reader.is_binary():
+        st.error(f"Unable to decode file {file}. It may be a binary file.")
+        return
+    page_count = reader.page_count(DEFAULT_PAGE_LINES)
+    page_key = f"view_page_{file}"
+    page = st.number_input(
+        f"Page (1-{page_count}, {reader.line_count} lines, {reader.size / (1024**2):.1f} MB):",
+        min_value=1, max_value=page_count, value=1, step=1, key=page_key
+    )
+    st.text_area("File Content:", value=reader.read_page(page - 1, DEFAULT_PAGE_LINES), height=200, key=f"view_content_{file}_{page}")
+    if st.button("Close Preview", key=f"close_view_{file}"):
+        del st.session_state[page_key]
+        st.rerun()
+
 def extract_code_blocks(text):
     # Simple regex to extract code blocks (text between triple backticks)
     code_blocks = re.findall(r'```[\s\S]*?```', text)
@@ -742,37 +833,85 @@ def get_corpus_context(corpus_file, query):
     files_folder = "files"
     if not os.path.exists(files_folder):
         os.makedirs(files_folder)
-    try:
-        with open(os.path.join(files_folder, corpus_file), "r", encoding='utf-8') as f:
-            corpus_text = f.read()
-    except UnicodeDecodeError:
-        return "Error: Unable to decode the corpus file. Please ensure it's a text file."
-
-    # Add progress bar for reading the corpus
+    corpus_path = os.path.join(files_folder, corpus_file)
+    if is_corpus_file(corpus_path):
+        return get_corpus_file_context(corpus_path, query)
+    with CorpusReader(corpus_path) as reader:
+        if reader.is_binary():
+            return "Error: Unable to decode the corpus file. Please ensure it's a text file."
+
+    # Stream chunks from the memory-mapped corpus into the vector database in batches
     st.info(f"Reading corpus file: {corpus_file}")
     progress_bar = st.progress(0)
-    total_chars = len(corpus_text)
-    chars_processed = 0
-
-    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
-    texts = []
-    for chunk in text_splitter.split_text(corpus_text):
-        texts.append(chunk)
-        chars_processed += len(chunk)
-        progress = chars_processed / total_chars
-        progress_bar.progress(progress)
-
-    # Create Langchain documents
-    docs = [Document(page_content=t) for t in texts]
-
-    # Create and load the vector database
-    st.info("Creating vector database...")
     embeddings = OllamaEmbeddings()
-    db = Chroma.from_documents(docs, embeddings, persist_directory="./chroma_db")
+    db = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
+    with CorpusReader(corpus_path) as reader:
+        total_bytes = reader.size or 1
+        batch = []
+        for chunk, end_offset in reader.iter_chunks():
+            batch.append(chunk)
+            if len(batch) >= CORPUS_EMBED_BATCH_SIZE:
+                db.add_texts(batch)
+                batch = []
+            progress_bar.progress(end_offset / total_bytes)
+        if batch:
+            db.add_texts(batch)
+    progress_bar.progress(1.0)
     db.persist()
 
     # Perform similarity search
     st.info("Performing similarity search...")
     results = db.similarity_search(query, k=3)
     st.info("Done!")
-    return "\n".join([doc.page_content for doc in results])
\ No newline at end of file
+    return "\n".join([doc.page_content for doc in results])
+
+def corpus_collection_name(corpus_path):
+    # A new collection per file version, so a re-crawled corpus is re-indexed
+    digest = hashlib.sha1(f"{os.path.abspath(corpus_path)}:{os.path.getmtime(corpus_path)}".encode()).hexdigest()
+    return f"corpus-{digest[:16]}"
+
+def corpus_collection(client, corpus_path):
+    """The collection of the corpus file's current version; creating it deletes the collections of earlier versions."""
+    name = corpus_collection_name(corpus_path)
+    source = os.path.abspath(corpus_path)
+    names = [getattr(existing, "name", existing) for existing in client.list_collections()]  # Collections in older chromadb, names in newer
+    if name not in names:
+        for existing_name in names:
+            if existing_name.startswith("corpus-") and (client.get_collection(existing_name).metadata or {}).get("source") == source:
+                client.delete_collection(existing_name)
+    return client.get_or_create_collection(name, metadata={"source": source})
+
+def get_corpus_file_context(corpus_path, query, k=3):
+    """Retrieves context from a .corpus file, decompressing only the blocks that hold the matching chunks."""
+    embeddings = OllamaEmbeddings()
+    client = chromadb.PersistentClient(path="./chroma_db")
+    collection = corpus_collection(client, corpus_path)
+    with CorpusFile(corpus_path) as corpus:
+        if corpus.chunk_count == 0:
+            return ""
+        if collection.count() != corpus.chunk_count:
+            # Embed once per corpus version; the vectors only carry chunk numbers, not the text
+            st.info(f"Indexing corpus file: {os.path.basename(corpus_path)}")
+            progress_bar = st.progress(0)
+            batch = []
+            for chunk_number, chunk in corpus.iter_chunks():
+                batch.append((chunk_number, chunk))
+                if len(batch) >= CORPUS_EMBED_BATCH_SIZE or chunk_number == corpus.chunk_count - 1:
+                    collection.upsert(
+                        ids=[str(n) for n, _ in batch],
+                        embeddings=embeddings.embed_documents([text for _, text in batch]),
+                        metadatas=[{"chunk": n} for n, _ in batch],
+                    )
+                    batch = []
+                    progress_bar.progress((chunk_number + 1) / corpus.chunk_count)
+
+        st.info("Performing similarity search...")
+        results = collection.query(query_embeddings=[embeddings.embed_query(query)], n_results=min(k, corpus.chunk_count))
+        chunk_numbers = [metadata["chunk"] for metadata in results["metadatas"][0]]
+        context = []
+        for chunk_number, chunk in zip(chunk_numbers, corpus.get_chunks(chunk_numbers)):
+            document = corpus.document_for_chunk(chunk_number) or {}
+            source = document.get("title") or document.get("url", "")
+            context.append(f"Source: {source} ({document.get('url', '')})\n{chunk}" if source else chunk)
+    st.info("Done!")
+    return "\n".join(context)
@@ -14,6 +14,7 @@ import tempfile
 import shutil
 from PyPDF2 import PdfMerger
 import json
+from corpus_format import CorpusWriter, extract_page_text
 
 # Get the directory of the current script
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -41,6 +42,10 @@ class WebsiteCrawler:
                 'quiet': '',
                 'enable-local-file-access': ''
             }
+        elif self.output_format == "Corpus":
+            # Pages are written to the corpus as they are crawled instead of being held in memory
+            self.corpus_path = os.path.join(self.temp_dir, "crawl.corpus")
+            self.corpus_writer = CorpusWriter(self.corpus_path)
 
     def __del__(self):
         self.driver.quit()
@@ -111,6 +116,10 @@ class WebsiteCrawler:
                 pdf_file = self.save_page_as_pdf(current_url, page_content)
                 if pdf_file:
                     self.crawled_data.append({"url": current_url, "file": pdf_file})
+            elif self.output_format == "Corpus":
+                title, text = extract_page_text(page_content)
+                self.corpus_writer.add_document(text, url=current_url, title=title)
+                self.crawled_data.append({"url": current_url, "title": title})
             else:
                 self.crawled_data.append({"url": current_url, "content": page_content})
 
@@ -147,6 +156,8 @@ class WebsiteCrawler:
             self.merge_pdfs(output_path)
         elif self.output_format == "JSON":
             self.save_as_json(output_path)
+        elif self.output_format == "Corpus":
+            self.save_as_corpus(output_path)
         else:  # TXT
             self.save_as_txt(output_path)
 
@@ -161,6 +172,10 @@ class WebsiteCrawler:
         with open(output_filename, 'w', encoding='utf-8') as f:
             json.dump(self.crawled_data, f, ensure_ascii=False, indent=4)
 
+    def save_as_corpus(self, output_filename):
+        self.corpus_writer.close()
+        shutil.move(self.corpus_path, output_filename)
+
     def save_as_txt(self, output_filename):
         with open(output_filename, 'w', encoding='utf-8') as f:
             for item in self.crawled_data:
@@ -170,12 +185,12 @@ class WebsiteCrawler:
 
 def main():
     st.title("Website Crawler Corpus Generator")
-    st.write("Enter the website URL you want to crawl in the box below. Choose your preferred output format (PDF, JSON, or TXT) from the dropdown menu. Click 'Start Crawling' to begin. Once complete, the generated file will be saved to the 'files' folder within the Ollama Workbench framework. You can access and manage this file in the 'Files' tab under the 'Chat' section or through the 'Document' section. You can then load this file as a corpus for an agent in the 'Chat' section, enabling the agent to use the information from the crawled website in its responses.")
+    st.write("Enter the website URL you want to crawl in the box below. Choose your preferred output format (PDF, JSON, TXT, or Corpus) from the dropdown menu. Corpus files are compressed and indexed, so the Chat only reads the parts of the crawl it needs. Click 'Start Crawling' to begin. Once complete, the generated file will be saved to the 'files' folder within the Ollama Workbench framework. You can access and manage this file in the 'Files' tab under the 'Chat' section or through the 'Document' section. You can then load this file as a corpus for an agent in the 'Chat' section, enabling the agent to use the information from the crawled website in its responses.")
     root_url = st.text_input("Enter the root URL to crawl:")
     
     output_format = st.selectbox(
         "Choose output format",
-        ("PDF", "JSON", "TXT")
+        ("PDF", "JSON", "TXT", "Corpus")
     )
     
     if st.button("Start Crawling"):
@@ -0,0 +1,246 @@
+# TeamForgeAI/request_scheduler.py
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import REQUEST_CLASS_LIMITS, REQUEST_SLOTS
+from model_catalog import normalize_ollama_url
+
+# Lower number = served first
+PRIORITIES = {"interactive": 0, "background": 1, "batch": 2}
+MAX_RECORDS = 500
+
+class RequestCancelled(Exception):
+    """Raised in a waiting caller when its queued request is cancelled before it started."""
+
+class Ticket:
+    """One queued or running LLM request."""
+
+    def __init__(self, priority_class: str, label: str, cancellable: bool, sequence: int, host: str = None):
+        self.priority_class = priority_class
+        self.host = host
+        self.label = label
+        self.cancellable = cancellable
+        self.sequence = sequence
+        self.enqueued_at = time.perf_counter()
+        self.started_at = None
+        self.granted = False
+        self.cancelled = False
+
+    def sort_key(self):
+        return (PRIORITIES[self.priority_class], self.sequence)
+
+class RequestScheduler:
+    """
+    Orders LLM requests from every session of the app by priority class.
+
+    Capacity is tracked per host (the Ollama URL a request is sent to, after any pool has
+    been resolved; None for callers that do not say): at most `slots` requests run at once
+    on a host, and each class has its own cap on top of that. set_host_limits overrides
+    both for one host; override_host_limits does so only for the length of a block.
+    Waiting requests are served highest priority first, FIFO within a class, so an
+    interactive turn overtakes queued background work. Queued requests marked cancellable can be dropped (e.g. when an
+    interactive turn arrives on the same host); running requests always finish.
+    Queue wait and run time are recorded per request.
+    """
+
+    def __init__(self, slots: int = REQUEST_SLOTS, class_limits: dict = None):
+        self.slots = slots
+        self.class_limits = dict(class_limits or REQUEST_CLASS_LIMITS)
+        self._condition = threading.Condition()
+        self._waiting = []  # Heap of (sort key, ticket)
+        self._running = {}  # Host key -> {priority class: running count}
+        self.host_limits = {}  # Host key -> (slots, class limits)
+        self._sequence = itertools.count()
+        self.records = deque(maxlen=MAX_RECORDS)
+
+    def set_host_limits(self, host: str, slots: int = None, class_limits: dict = None) -> None:
+        """Overrides the slot count and/or per-class caps of one host."""
+        host = host_key(host)
+        with self._condition:
+            current_slots, current_limits = self._limits(host)
+            self.host_limits[host] = (slots or current_slots, {**current_limits, **(class_limits or {})})
+            self._dispatch()
+
+    @contextmanager
+    def override_host_limits(self, host: str, slots: int = None, class_limits: dict = None):
+        """Overrides one host's limits for the duration of the block, then restores what it had."""
+        key = host_key(host)
+        with self._condition:
+            previous = self.host_limits.get(key)
+        self.set_host_limits(host, slots, class_limits)
+        try:
+            yield
+        finally:
+            with self._condition:
+                if previous is None:
+                    self.host_limits.pop(key, None)
+                else:
+                    self.host_limits[key] = previous
+                self._dispatch()
+
+    def _limits(self, host: str) -> tuple:
+        return self.host_limits.get(host, (self.slots, self.class_limits))
+
+    def _host_running(self, host: str) -> dict:
+        return self._running.setdefault(host, {priority_class: 0 for priority_class in PRIORITIES})
+
+    def _can_start(self, ticket: Ticket) -> bool:
+        slots, class_limits = self._limits(ticket.host)
+        running = self._host_running(ticket.host)
+        if sum(running.values()) >= slots:
+            return False
+        return running[ticket.priority_class] < class_limits.get(ticket.priority_class, slots)
+
+    def _dispatch(self) -> None:
+        """Grants free slots to the best waiting tickets. Caller holds the condition."""
+        granted_any = False
+        skipped = []
+        while self._waiting:
+            _, ticket = heapq.heappop(self._waiting)
+            if ticket.cancelled:
+                continue
+            if self._can_start(ticket):
+                ticket.granted = True
+                self._host_running(ticket.host)[ticket.priority_class] += 1
+                granted_any = True
+            else:
+                skipped.append(ticket)  # Its host or class is full; other hosts and lower classes may still fit
+        for ticket in skipped:
+            heapq.heappush(self._waiting, (ticket.sort_key(), ticket))
+        if granted_any:
+            self._condition.notify_all()
+
+    def submit(self, priority_class: str = "interactive", label: str = "", cancellable: bool = False, host: str = None) -> Ticket:
+        if priority_class not in PRIORITIES:
+            raise ValueError(f"Unknown priority class '{priority_class}'")
+        with self._condition:
+            ticket = Ticket(priority_class, label, cancellable, next(self._sequence), host)
+            heapq.heappush(self._waiting, (ticket.sort_key(), ticket))
+            self._dispatch()
+            return ticket
+
+    def wait(self, ticket: Ticket, timeout: float = None) -> None:
+        """Blocks until the ticket is granted a slot. Raises RequestCancelled or TimeoutError."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: ticket.granted or ticket.cancelled, timeout):
+                ticket.cancelled = True
+                self._record(ticket, "timeout")
+                raise TimeoutError(f"Request '{ticket.label}' waited more than {timeout}s for a slot")
+            if ticket.cancelled:
+                raise RequestCancelled(f"Request '{ticket.label}' was cancelled while queued")
+            ticket.started_at = time.perf_counter()
+
+    def release(self, ticket: Ticket, outcome: str = "done") -> None:
+        with self._condition:
+            self._host_running(ticket.host)[ticket.priority_class] -= 1
+            self._record(ticket, outcome)
+            self._dispatch()
+
+    def cancel(self, ticket: Ticket) -> bool:
+        """Cancels a ticket that has not started yet. Returns False if it is already running."""
+        with self._condition:
+            if ticket.granted or ticket.cancelled:
+                return False
+            ticket.cancelled = True
+            self._record(ticket, "cancelled")
+            self._condition.notify_all()
+            return True
+
+    def cancel_queued(self, priority_classes=("background", "batch"), host: str = None) -> int:
+        """Cancels every queued, cancellable ticket of the given classes (on one host, if given)."""
+        with self._condition:
+            cancelled = 0
+            for _, ticket in self._waiting:
+                if host is not None and ticket.host != host:
+                    continue
+                if ticket.cancellable and not ticket.cancelled and ticket.priority_class in priority_classes:
+                    ticket.cancelled = True
+                    self._record(ticket, "cancelled")
+                    cancelled += 1
+            if cancelled:
+                self._condition.notify_all()
+            return cancelled
+
+    @contextmanager
+    def slot(self, priority_class: str = "interactive", label: str = "", cancellable: bool = None, preempt: bool = None, timeout: float = None, host: str = None):
+        """
+        Holds a request slot for the duration of the block.
+
+        Background and batch requests are cancellable by default. An interactive request
+        preempts (cancels) queued cancellable background work by default when it has to wait.
+        """
+        if cancellable is None:
+            cancellable = priority_class != "interactive"
+        if preempt is None:
+            preempt = priority_class == "interactive"
+        ticket = self.submit(priority_class, label, cancellable, host_key(host))
+        if preempt and not ticket.granted:
+            self.cancel_queued(host=ticket.host)
+        self.wait(ticket, timeout)
+        outcome = "done"
+        try:
+            yield ticket
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self.release(ticket, outcome)
+
+    def _record(self, ticket: Ticket, outcome: str) -> None:
+        now = time.perf_counter()
+        started = ticket.started_at
+        self.records.append({
+            "label": ticket.label,
+            "host": ticket.host,
+            "priority_class": ticket.priority_class,
+            "outcome": outcome,
+            "queue_wait": (started or now) - ticket.enqueued_at,
+            "run_time": now - started if started else 0.0,
+            "finished_at": time.time(),
+        })
+
+    def stats(self) -> list:
+        """Per-class counts over all hosts, queue depth and queue-wait percentiles over the recent requests."""
+        with self._condition:
+            records = list(self.records)
+            waiting = {priority_class: 0 for priority_class in PRIORITIES}
+            for _, ticket in self._waiting:
+                if not ticket.cancelled:
+                    waiting[ticket.priority_class] += 1
+            running = {priority_class: sum(counts[priority_class] for counts in self._running.values()) for priority_class in PRIORITIES}
+        rows = []
+        for priority_class in PRIORITIES:
+            class_records = [record for record in records if record["priority_class"] == priority_class]
+            waits = sorted(record["queue_wait"] for record in class_records if record["outcome"] != "cancelled")
+            rows.append({
+                "Class": priority_class,
+                "Running": running[priority_class],
+                "Queued": waiting[priority_class],
+                "Completed": sum(1 for record in class_records if record["outcome"] == "done"),
+                "Cancelled": sum(1 for record in class_records if record["outcome"] == "cancelled"),
+                "Errors": sum(1 for record in class_records if record["outcome"] in ("error", "timeout")),
+                "Wait p50 (s)": round(waits[len(waits) // 2], 2) if waits else None,
+                "Wait p90 (s)": round(waits[min(len(waits) - 1, int(len(waits) * 0.9))], 2) if waits else None,
+            })
+        return rows
+
+def host_key(host: str):
+    """Normalizes Ollama URLs so every caller of one host shares its capacity."""
+    if host and "://" in host:
+        return normalize_ollama_url(host)
+    return host
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_request_scheduler() -> RequestScheduler:
+    """Returns the process-wide scheduler shared by every Streamlit session."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
@@ -0,0 +1,175 @@
+# TeamForgeAI/skill_registry.py
+import ast
+import importlib
+import os
+import sys
+import threading
+import time
+
+SKILLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills")
+EXCLUDED_MODULES = {"project_management"}  # Not a skill
+
+def read_skill_manifest(path: str, name: str):
+    """Name, signature, parameters and summary of the skill function in a module, read with ast. None if it has none."""
+    with open(path, "r", encoding="utf-8") as file:
+        tree = ast.parse(file.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == name:
+            returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+            docstring = ast.get_docstring(node) or ""
+            arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+            return {
+                "name": name,
+                "signature": f"({ast.unparse(node.args)}){returns}",
+                "parameters": [argument.arg for argument in arguments],
+                "summary": docstring.strip().splitlines()[0] if docstring.strip() else "",
+            }
+    return None
+
+class LazySkill:
+    """
+    A skill function that is imported on its first call and cached from then on.
+
+    With `reload`, or after invalidate(), the next call reloads a module that was already
+    imported, so an edited skill runs its new code. Import time, calls and run time are
+    recorded for the registry's timings.
+    """
+
+    def __init__(self, manifest: dict, reload: bool = False):
+        self.manifest = manifest
+        self.__name__ = manifest["name"]
+        self.__doc__ = manifest["summary"]
+        self._function = None
+        self._reload = reload
+        self._lock = threading.Lock()
+        self.import_seconds = None
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.last_seconds = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._function is not None
+
+    def load(self):
+        """Imports (or reloads, if it changed) the skill's module if needed and returns the function."""
+        if self._function is None:
+            with self._lock:
+                if self._function is None:
+                    module_name = f"skills.{self.__name__}"
+                    start = time.perf_counter()
+                    try:
+                        if self._reload and module_name in sys.modules:
+                            module = importlib.reload(sys.modules[module_name])
+                        else:
+                            module = importlib.import_module(module_name)
+                    except (ImportError, SyntaxError) as error:
+                        print(f"Error importing skill {self.__name__}: {error}")
+                        raise
+                    self.import_seconds = time.perf_counter() - start
+                    self._function = getattr(module, self.__name__)
+                    self._reload = False
+        return self._function
+
+    def invalidate(self) -> None:
+        """Drops the imported function so the next call reloads the module."""
+        with self._lock:
+            self._function = None
+            self._reload = True
+
+    def __call__(self, *args, **kwargs):
+        function = self.load()
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.last_seconds = elapsed
+
+    def __repr__(self) -> str:
+        return f"<skill {self.__name__}{self.manifest['signature']}{'' if self.loaded else ' (not imported)'}>"
+
+class SkillRegistry:
+    """
+    Manifest of the skills in the skills folder, built by reading the source with ast.
+
+    A skill is a module with a function of the same name. Listing skills imports nothing;
+    each LazySkill imports its module on its first call, so heavy dependencies (such as
+    googleapiclient and Teachability for web_search) load only when that skill is used.
+    A module is reparsed only when its mtime or size changes, and a skill keeps its
+    imported function across lookups until then; a changed module is reloaded on the
+    skill's next call.
+    """
+
+    def __init__(self, skills_dir: str = SKILLS_DIR):
+        self.skills_dir = skills_dir
+        self._lock = threading.Lock()
+        self._entries = {}  # Module name -> {"mtime", "size", "skill"}
+
+    def skills(self) -> dict:
+        """Skill name -> LazySkill, in name order."""
+        with self._lock:
+            self._refresh()
+            return {name: entry["skill"] for name, entry in sorted(self._entries.items()) if entry["skill"]}
+
+    def manifest(self) -> list:
+        return [skill.manifest for skill in self.skills().values()]
+
+    def timings(self) -> list:
+        """Import and run times of every skill, for display."""
+        rows = []
+        for name, skill in self.skills().items():
+            rows.append({
+                "skill": name,
+                "imported": skill.loaded,
+                "import_ms": round(skill.import_seconds * 1000, 1) if skill.import_seconds is not None else None,
+                "calls": skill.calls,
+                "errors": skill.errors,
+                "mean_ms": round(skill.total_seconds / skill.calls * 1000, 1) if skill.calls else None,
+                "last_ms": round(skill.last_seconds * 1000, 1) if skill.last_seconds is not None else None,
+            })
+        return rows
+
+    def _refresh(self) -> None:
+        """Rereads the manifest of new or changed modules. Caller holds the lock."""
+        present = {}
+        with os.scandir(self.skills_dir) as scan:
+            for entry in scan:
+                name = entry.name[:-3]
+                if entry.is_file() and entry.name.endswith(".py") and name not in EXCLUDED_MODULES and not name.startswith("_"):
+                    stat = entry.stat()
+                    present[name] = (entry.path, stat.st_mtime, stat.st_size)
+        for name in set(self._entries) - set(present):
+            del self._entries[name]
+        for name, (path, mtime, size) in present.items():
+            entry = self._entries.get(name)
+            if entry and entry["mtime"] == mtime and entry["size"] == size:
+                continue
+            try:
+                manifest = read_skill_manifest(path, name)
+            except (OSError, SyntaxError, ValueError) as error:
+                print(f"Error reading skill from {path}: {error}")
+                manifest = None
+            skill = entry["skill"] if entry and entry["skill"] and entry["skill"].manifest == manifest else None
+            if skill is not None:
+                skill.invalidate()  # Same signature, edited body: reloaded on its next call
+            elif manifest:
+                skill = LazySkill(manifest, reload=entry is not None)  # New skill, or a changed signature that must be reloaded
+            self._entries[name] = {"mtime": mtime, "size": size, "skill": skill}
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_skill_registry() -> SkillRegistry:
+    """Returns the process-wide skill registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SkillRegistry()
+        return _registry
@@ -1,18 +1,8 @@
 # TeamForgeAI/skills/generate_sd_images.py
 from typing import List
-import json
-import requests
-import io
-import base64
-from PIL import Image
-from pathlib import Path
-import uuid
-import os
 import re
 import streamlit as st
-
-# Format: protocol://server:port
-base_url = "http://0.0.0.0:7860"
+from image_jobs import get_image_job_queue
 
 def generate_sd_images(discussion_history: str, image_size: str = "512x512", team_name: str = "default") -> List[str]:
     """
@@ -34,54 +24,29 @@ def generate_sd_images(discussion_history: str, image_size: str = "512x512", tea
     used_prompts = st.session_state["used_image_prompts"]
 
     all_scenes = find_all_scenes(discussion_history)
-
-    generated_image_paths = [] # Store the paths to the generated images
-    if all_scenes:
-        for scene in all_scenes:
-            if scene not in used_prompts:
-                payload = {
-                    "prompt": scene,
-                    "steps": 40,
-                    "cfg_scale": 7,
-                    "width": image_width,
-                    "height": image_height,
-                    "sampler_name": "DPM++ 2M Karras",
-                    "n_iter": 1,
-                    "batch_size": 1,
-                    "override_settings": {
-                        'sd_model_checkpoint': "starlightAnimated_v3",
-                    }
-                }
-
-                api_url = f"{base_url}/sdapi/v1/txt2img"
-                response = requests.post(url=api_url, json=payload, timeout=120)
-
-                if response.status_code == 200:
-                    r = response.json()
-                    for i in r['images']:
-                        encoded_image = i
-                        image = Image.open(io.BytesIO(base64.b64decode(encoded_image.split(",", 1)[0])))
-
-                        unique_id = str(uuid.uuid4())[:8]
-                        file_name = f"TeamForgeAI/files/images/{team_name}_{unique_id}_output.png"
-
-                        file_path = Path(file_name)
-                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                        image.save(file_path)
-                        print(f"Image saved to {file_path}")
-                        generated_image_paths.append(file_name) # Add the image path to the list
-
-                    used_prompts.append(scene)
-                    st.session_state["used_image_prompts"] = used_prompts
-                else:
-                    print(f"Failed to download the image from {api_url}")
-            else:
-                print(f"Skipping already generated image for prompt: {scene}")
-        return generated_image_paths # Return the list of image paths
-    else:
+    if not all_scenes:
         print("I'm ready to create images! Please provide a list of image descriptions using the format: ![Image Request](description of image) or Images: description")
         return [] # Return an empty list if no scenes are found
 
+    new_scenes = [scene for scene in all_scenes if scene not in used_prompts]
+    for scene in all_scenes:
+        if scene in used_prompts:
+            print(f"Skipping already generated image for prompt: {scene}")
+
+    # All scenes are queued at once and rendered back to back by the job queue
+    job_queue = get_image_job_queue()
+    jobs = job_queue.submit_scenes(new_scenes, image_width, image_height, team_name=team_name)
+    generated_image_paths = [] # Store the paths to the generated images
+    for kind, job, detail in job_queue.iter_events(jobs):
+        if kind == "image":
+            generated_image_paths.append(detail) # Add the image path to the list
+        elif kind == "done":
+            used_prompts.append(job.scene)
+        elif kind == "failed":
+            print(f"Failed to generate an image for prompt '{job.scene}': {detail}")
+    st.session_state["used_image_prompts"] = used_prompts
+    return generated_image_paths # Return the list of image paths
+
 def find_all_scenes(discussion_history: str) -> List[str]:
     """
     Finds all potential scenes to illustrate from the discussion history,
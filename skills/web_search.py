@@ -18,6 +18,7 @@ MAX_AGENTS = 3  # Limit the number of agents performing searches
 MAX_SEARCH_RESULTS = 3  # Limit the number of search results per agent
 MAX_RETRIES = 3  # Maximum number of retries for server errors
 REQUEST_TIMEOUT = 10  # Timeout for web requests
+SYNTHESIS_MODEL = "mistral:instruct"  # Summarizes and synthesizes the search results
 
 def web_search(query: str, discussion_history: str = "", agents_data: list = None, teachability=None) -> str:
     """
@@ -97,7 +98,7 @@ def synthesize_search_results(search_results: List[Tuple[str, str, str, str, str
         logging.info(f"Synthesizing result {i+1} for agent: {agent_name}")
         proposer_prompt = f"""You are {agent_name}. You have been asked to research the following query: '{title}'. Here is a summary of a web search result: {snippet}\n\n{content}\n\nBased on this information, provide a concise summary of your findings."""
         logging.info(f"Proposer prompt: {proposer_prompt}")
-        ollama_llm = OllamaLLM(model="mistral:instruct", temperature=0.4)
+        ollama_llm = OllamaLLM(model=SYNTHESIS_MODEL, temperature=0.4, priority="background")
         summary = ollama_llm.generate_text(proposer_prompt)
         logging.info(f"Proposer summary: {summary}")
         proposer_outputs.append((agent_name, summary, link)) # Include link for sources
@@ -117,7 +118,7 @@ def synthesize_search_results(search_results: List[Tuple[str, str, str, str, str
     {chr(10).join([f'- {agent_name}: {summary}' for agent_name, summary, _ in proposer_outputs])}
     """
     logging.info(f"Aggregator prompt: {aggregator_prompt}")
-    ollama_llm = OllamaLLM(model="mistral:instruct", temperature=0.4)
+    ollama_llm = OllamaLLM(model=SYNTHESIS_MODEL, temperature=0.4, priority="background")
     synthesized_summary = ollama_llm.generate_text(aggregator_prompt)
     logging.info(f"Synthesized summary: {synthesized_summary}")
 
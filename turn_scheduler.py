@@ -0,0 +1,129 @@
+# TeamForgeAI/turn_scheduler.py
+import threading
+
+from config import AUTO_MODE_MAX_TURN_DELAY
+
+def count_swaps(models: list, start_model: str = None) -> int:
+    """Number of times the loaded model changes when running turns with these models in order."""
+    swaps = 0
+    current = start_model
+    for model in models:
+        if current is not None and model != current:
+            swaps += 1
+        current = model
+    return swaps
+
+class SwapStats:
+    """Running totals of model swaps, scheduled versus what plain round-robin order would have caused."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.baseline_swaps = 0
+        self.scheduled_swaps = 0
+
+    def record(self, baseline_models: list, scheduled_models: list, start_model: str = None) -> int:
+        baseline = count_swaps(baseline_models, start_model)
+        scheduled = count_swaps(scheduled_models, start_model)
+        with self._lock:
+            self.turns += len(scheduled_models)
+            self.baseline_swaps += baseline
+            self.scheduled_swaps += scheduled
+        return baseline - scheduled
+
+    @property
+    def swaps_avoided(self) -> int:
+        return self.baseline_swaps - self.scheduled_swaps
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "baseline_swaps": self.baseline_swaps,
+                "scheduled_swaps": self.scheduled_swaps,
+                "swaps_avoided": self.baseline_swaps - self.scheduled_swaps,
+            }
+
+swap_stats = SwapStats()  # Process-wide totals shown in the UI
+
+def order_by_model(items: list, model_of, start_model: str = None) -> list:
+    """
+    Orders independent tasks so tasks sharing a model run back to back.
+
+    Models keep the order of their first appearance, except that `start_model` (the one
+    already loaded) goes first. Within a model the original order is kept. Only use this
+    where the tasks do not see each other's output, e.g. one MoA layer.
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(model_of(item), []).append(item)
+    models = list(groups)
+    if start_model in groups:
+        models.remove(start_model)
+        models.insert(0, start_model)
+    ordered = [item for model in models for item in groups[model]]
+    swap_stats.record([model_of(item) for item in items], [model_of(item) for item in ordered], start_model)
+    return ordered
+
+def schedule_round(items: list, model_of, max_delay: int = AUTO_MODE_MAX_TURN_DELAY, start_model: str = None) -> list:
+    """
+    Orders one round of turns to minimize model swaps while staying fair.
+
+    Every item still takes exactly one turn per round, and no item moves more than
+    `max_delay` positions away from its round-robin slot in either direction. Items are
+    picked earliest-deadline-first when one is due; otherwise the scheduler keeps the
+    current model if any eligible item uses it. With max_delay=0 this is plain round-robin;
+    with max_delay >= len(items) - 1 it fully batches the round by model.
+    """
+    remaining = list(range(len(items)))  # Round-robin positions still to schedule, ascending
+    ordered = []
+    current = start_model
+    for position in range(len(items)):
+        earliest = remaining[0]
+        if earliest + max_delay <= position:
+            choice = earliest  # Due now: delaying it further would break the fairness bound
+        else:
+            eligible = [index for index in remaining if index <= position + max_delay]
+            same_model = [index for index in eligible if model_of(items[index]) == current]
+            choice = same_model[0] if same_model else eligible[0]
+        remaining.remove(choice)
+        ordered.append(items[choice])
+        current = model_of(items[choice])
+    return ordered
+
+class TurnScheduler:
+    """
+    Hands out speakers for a group chat, one round at a time.
+
+    Each round gives every agent one turn, reordered by schedule_round so that agents on
+    the same model speak consecutively, and each round starts with the model the previous
+    round ended on.
+    """
+
+    def __init__(self, agents: list, model_of, max_delay: int = AUTO_MODE_MAX_TURN_DELAY):
+        self.agents = list(agents)
+        self.model_of = model_of
+        self.max_delay = max_delay
+        self._round = []
+        self._last_model = None
+        self.baseline_swaps = 0
+        self.scheduled_swaps = 0
+
+    def _next_round(self) -> None:
+        self._round = schedule_round(self.agents, self.model_of, self.max_delay, self._last_model)
+        baseline_models = [self.model_of(agent) for agent in self.agents]
+        scheduled_models = [self.model_of(agent) for agent in self._round]
+        self.baseline_swaps += count_swaps(baseline_models, self._last_model)
+        self.scheduled_swaps += count_swaps(scheduled_models, self._last_model)
+        swap_stats.record(baseline_models, scheduled_models, self._last_model)
+
+    def next_speaker(self):
+        if not self._round:
+            self._next_round()
+        speaker = self._round.pop(0)
+        self._last_model = self.model_of(speaker)
+        return speaker
+
+    @property
+    def swaps_avoided(self) -> int:
+        return self.baseline_swaps - self.scheduled_swaps
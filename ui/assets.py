@@ -0,0 +1,97 @@
+# TeamForgeAI/ui/assets.py
+import base64
+import hashlib
+import os
+import threading
+
+import streamlit as st
+from PIL import Image
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(APP_DIR, "static")  # Served at app/static/ when server.enableStaticServing is on
+ASSET_DIR = os.path.join(STATIC_DIR, "assets")
+BACKGROUND_MAX_SIZE = (960, 540)  # The virtual office is 330px tall; this covers wide columns and HiDPI
+BACKGROUND_QUALITY = 80
+
+class AssetCache:
+    """
+    Prepares images for the browser once and remembers the result.
+
+    Each source image is resized and compressed to WebP on first use, stored in the
+    static folder under the hash of the source file, and reused until the file changes
+    (checked by mtime and size, so unchanged files are not re-read). With static serving
+    enabled the page only carries the asset's URL and the browser caches the image;
+    otherwise the WebP is inlined as base64, encoded once and kept in memory.
+    The payload sent per rerun is compared with inlining the original file.
+    """
+
+    def __init__(self, asset_dir: str = ASSET_DIR, max_size: tuple = BACKGROUND_MAX_SIZE, quality: int = BACKGROUND_QUALITY):
+        self.asset_dir = asset_dir
+        self.max_size = max_size
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._assets = {}  # Source path -> {"mtime", "size", "name", "original_payload"}
+        self._payloads = {}  # Asset name (source hash) -> base64 payload, for inlining
+        self.stats = {"renders": 0, "bytes_sent": 0, "bytes_original": 0, "prepared": 0}
+
+    def _prepare(self, source_path: str) -> dict:
+        stat = os.stat(source_path)
+        asset = self._assets.get(source_path)
+        if asset and asset["mtime"] == stat.st_mtime and asset["size"] == stat.st_size:
+            return asset
+        with open(source_path, "rb") as file:
+            data = file.read()
+        name = f"{hashlib.sha256(data).hexdigest()[:16]}.webp"
+        asset_path = os.path.join(self.asset_dir, name)
+        if not os.path.exists(asset_path):
+            os.makedirs(self.asset_dir, exist_ok=True)
+            with Image.open(source_path) as image:
+                image.thumbnail(self.max_size)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                temp_path = f"{asset_path}.tmp"
+                image.save(temp_path, "WEBP", quality=self.quality)
+            os.replace(temp_path, asset_path)
+            self.stats["prepared"] += 1
+        asset = {"mtime": stat.st_mtime, "size": stat.st_size, "name": name, "original_payload": (len(data) + 2) // 3 * 4}
+        self._assets[source_path] = asset
+        return asset
+
+    def url(self, source_path: str, copies: int = 1) -> str:
+        """
+        URL to put in the page for an image: a static path when static serving is on, else a data URL.
+
+        `copies` is how many times the page embeds it, for the payload statistics.
+        """
+        with self._lock:
+            asset = self._prepare(source_path)
+            if st.get_option("server.enableStaticServing"):
+                url = f"app/static/{os.path.relpath(os.path.join(self.asset_dir, asset['name']), STATIC_DIR).replace(os.sep, '/')}"
+            else:
+                if asset["name"] not in self._payloads:
+                    with open(os.path.join(self.asset_dir, asset["name"]), "rb") as file:
+                        self._payloads[asset["name"]] = base64.b64encode(file.read()).decode("utf-8")
+                url = f"data:image/webp;base64,{self._payloads[asset['name']]}"
+            self.stats["renders"] += 1
+            self.stats["bytes_sent"] += len(url) * copies
+            self.stats["bytes_original"] += asset["original_payload"] * copies
+            return url
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        renders = stats["renders"] or 1
+        stats["bytes_saved_per_render"] = (stats["bytes_original"] - stats["bytes_sent"]) / renders
+        stats["static_serving"] = bool(st.get_option("server.enableStaticServing"))
+        return stats
+
+_asset_cache = None
+_asset_cache_lock = threading.Lock()
+
+def get_asset_cache() -> AssetCache:
+    """Returns the process-wide asset cache shared by every Streamlit session."""
+    global _asset_cache
+    with _asset_cache_lock:
+        if _asset_cache is None:
+            _asset_cache = AssetCache()
+        return _asset_cache
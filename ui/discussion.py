@@ -1,13 +1,21 @@
 import streamlit as st
 import os
-import base64
 import json
+import math
 import pandas as pd
 import re
 
-from ui.utils import extract_code_from_response, display_download_button, list_discussions, load_discussion_history
+from ui.utils import extract_code_from_response, display_download_button, list_discussions, load_discussion_history, search_discussions, load_discussion_page, DISCUSSION_PAGE_SIZE
+from discussion_store import split_messages
 from api_utils import get_ollama_models
+from ollama_router import get_router
+from model_residency import all_residency_metrics
+from turn_scheduler import swap_stats
+from request_scheduler import get_request_scheduler
 from skills.plot_diagram import plot_diagram
+from ui.gallery import get_gallery_index
+from ui.assets import get_asset_cache
+from skill_registry import get_skill_registry
 
 # Define custom CSS
 CUSTOM_CSS = """
@@ -93,11 +101,11 @@ def display_discussion_and_whiteboard() -> None:
                 st.error(f"Error: Invalid data format for chart: {e}")
         else:
             st.warning("No chart data available.")
-    with tab5:  # Display the full discussion history in the fifth tab
-        st.write(st.session_state.discussion_history)
+    with tab5:  # Display the discussion history in the fifth tab, a page of messages at a time
+        display_discussion_pages()
 
         # Moved 'Load Previous Discussion' and download buttons inside 'Discussion History' tab
-        discussions = list_discussions()
+        discussions = list_discussions()  # From the discussion store, most recent first
         selected_discussion = st.selectbox("Load Previous Discussion", [""] + discussions, index=0, key="discussion_selectbox")
         if selected_discussion:
             st.session_state.selected_discussion = selected_discussion
@@ -106,8 +114,11 @@ def display_discussion_and_whiteboard() -> None:
         # Add a button to start a new discussion
         if st.button("Start New Discussion"):
             st.session_state.selected_discussion = ""
+            st.session_state.current_discussion = ""  # The next save starts a new file
             st.session_state.discussion_history = ""
 
+        display_discussion_search()
+
     with tab6:  # Objectives tab
         if "current_project" in st.session_state:
             current_project = st.session_state.current_project
@@ -181,6 +192,79 @@ def display_discussion_and_whiteboard() -> None:
         st.query_params.update({"model": st.session_state.selected_model})  # Correct syntax
         st.session_state.model = st.session_state.selected_model  # Update model in session state
 
+        with st.expander("Endpoint Pools"):
+            # Live view of the router: health, in-flight requests and resident models per pooled host
+            st.dataframe(pd.DataFrame(get_router().stats()), use_container_width=True, hide_index=True)
+
+        with st.expander("Request Queue"):
+            # Running and queued LLM requests per priority class, with recent queue-wait percentiles
+            st.dataframe(pd.DataFrame(get_request_scheduler().stats()), use_container_width=True, hide_index=True)
+
+        with st.expander("Model Residency"):
+            scheduling = swap_stats.summary()
+            st.write(f"Turn scheduling: {scheduling['scheduled_swaps']} model swaps over {scheduling['turns']} turns, {scheduling['swaps_avoided']} avoided versus round-robin order.")
+            # Cold loads and load time per host, plus the most recent load events
+            for metrics in all_residency_metrics():
+                st.write(f"**{metrics['ollama_url']}**: {metrics['cold_loads']} loads over {metrics['requests']} requests, {metrics['total_load_time']:.1f}s loading (mean {metrics['mean_load_time']:.1f}s). Working set: {', '.join(metrics['working_set']) or 'none'}")
+                if metrics["recent_loads"]:
+                    st.dataframe(pd.DataFrame(metrics["recent_loads"]), use_container_width=True, hide_index=True)
+        with st.expander("Page Assets"):
+            assets = get_asset_cache().summary()
+            delivery = "static files" if assets["static_serving"] else "inline base64 (enable server.enableStaticServing to serve static files)"
+            st.write(f"Backgrounds are delivered as {delivery}. {assets['prepared']} resized this process; "
+                     f"{assets['bytes_saved_per_render'] / 1024:.0f} KB less page payload per rerun than inlining the original image "
+                     f"({assets['bytes_sent'] / 1024:.0f} KB sent instead of {assets['bytes_original'] / 1024:.0f} KB over {assets['renders']} reruns).")
+            office = st.session_state.get("virtual_office_sync")
+            if office:
+                st.write(f"Virtual office: {office['updates']} updates sent to the browser this session, {office['bytes_sent'] / 1024:.1f} KB in total.")
+
+        with st.expander("Skills"):
+            # Skills are imported on first use; times are per process
+            st.dataframe(pd.DataFrame(get_skill_registry().timings()), use_container_width=True, hide_index=True)
+
+def display_discussion_pages() -> None:
+    """Shows the current discussion a page of messages at a time, newest page first."""
+    messages = split_messages(st.session_state.discussion_history)
+    if not messages:
+        return
+    pages = math.ceil(len(messages) / DISCUSSION_PAGE_SIZE)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=pages, key="discussion_page") if pages > 1 else 1
+    for message in messages[(page - 1) * DISCUSSION_PAGE_SIZE:page * DISCUSSION_PAGE_SIZE]:
+        st.write(message)
+
+def display_discussion_search() -> None:
+    """Searches every saved discussion and previews the page around a hit without loading the whole discussion."""
+    query = st.text_input("Search Past Discussions", key="discussion_search")
+    if query:
+        results = search_discussions(query)
+        if not results:
+            st.write("No matching messages.")
+        for index, result in enumerate(results):
+            result_column, open_column = st.columns([6, 1])
+            result_column.markdown(f"**{result['name']}** · {result['speaker'] or 'message'} #{result['position'] + 1}: {result['snippet']}")
+            if open_column.button("Open", key=f"discussion_search_open_{index}"):
+                st.session_state.discussion_preview = {"name": result["name"], "page": result["position"] // DISCUSSION_PAGE_SIZE + 1}
+
+    preview = st.session_state.get("discussion_preview")
+    if preview:
+        messages, total = load_discussion_page(preview["name"], preview["page"])
+        pages = max(1, math.ceil(total / DISCUSSION_PAGE_SIZE))
+        with st.expander(f"{preview['name']}: page {preview['page']} of {pages}", expanded=True):
+            for message in messages:
+                st.write(message["content"])
+            previous_column, next_column, load_column = st.columns(3)
+            if previous_column.button("Previous Page", key="discussion_preview_previous", disabled=preview["page"] <= 1):
+                preview["page"] -= 1
+                st.rerun()
+            if next_column.button("Next Page", key="discussion_preview_next", disabled=preview["page"] >= pages):
+                preview["page"] += 1
+                st.rerun()
+            if load_column.button("Load This Discussion", key="discussion_preview_load"):
+                st.session_state.selected_discussion = preview["name"]
+                st.session_state.discussion_history = load_discussion_history(preview["name"])
+                st.session_state.discussion_preview = None
+                st.rerun()
+
 def display_discussion_modal() -> None:
     """Displays the discussion history in an expander."""
     with st.expander("Discussion History"):
@@ -218,41 +302,54 @@ def extract_latest_code(response: str) -> str:
     return ""
 
 def display_gallery() -> None:
-    """Displays the images in the 'images' folder in a grid of three images per row."""
-    image_dir = "TeamForgeAI/files/images"  # Updated path
-    if os.path.exists(image_dir):
-        images = [file for file in os.listdir(image_dir) if file.endswith((".png", ".jpg", ".jpeg"))]
-        if images:
-            if 'images_to_delete' not in st.session_state:
-                st.session_state.images_to_delete = []
-
-            columns = st.columns(3)  # Create three columns
-            for i, image in enumerate(images):
-                if image in st.session_state.images_to_delete:
-                    continue
-
-                with columns[i % 3]:  # Cycle through the columns
-                    image_path = os.path.join(image_dir, image)
-                    
-                    # --- Create a container for the image and buttons ---
-                    image_container = st.container()
-                    with image_container:
-                        st.image(image_path, caption=image, use_column_width=True)
-                        column1, column2 = st.columns(2)  # Two columns for buttons
-                        with column1:
-                            # Add download button
-                            with open(image_path, "rb") as file:
-                                image_bytes = file.read()
-                                base64_image = base64.b64encode(image_bytes).decode()
-                                href = f'<a href="data:image/png;base64,{base64_image}" download="{image}"><button style="border: none; background: none; padding: 0; cursor: pointer;"><span style="font-size: 20px;">📥</span></button></a>'
-                                st.markdown(href, unsafe_allow_html=True)
-                        with column2:
-                            # Add delete button
-                            if st.button("🗑️", key=f"delete_{image}"):
-                                st.session_state.images_to_delete.append(image)
-                                os.remove(image_path)
-                                st.rerun()
-        else:
-            st.write("No images found in the 'images' folder.")
-    else:
+    """Displays the images in the 'images' folder as a paginated grid of thumbnails, three per row."""
+    index = get_gallery_index()
+    if not os.path.exists(index.image_dir):
         st.write("The 'images' folder does not exist.")
+        return
+    images = index.refresh()  # Newest first; only changed files are looked at
+    if not images:
+        st.write("No images found in the 'images' folder.")
+        return
+
+    # --- Full-size view, loaded only for the image the user opened ---
+    selected = st.session_state.get("gallery_selected")
+    if selected in index.entries:
+        image_path = os.path.join(index.image_dir, selected)
+        st.image(image_path, caption=selected, use_column_width=True)
+        column1, column2 = st.columns(2)
+        with column1:
+            with open(image_path, "rb") as file:
+                st.download_button("📥 Download", file.read(), file_name=selected, key=f"download_{selected}")
+        with column2:
+            if st.button("Close", key="gallery_close"):
+                st.session_state.gallery_selected = None
+                st.rerun()
+
+    page_size = st.selectbox("Images per page", [12, 24, 48], key="gallery_page_size")
+    page_count = (len(images) + page_size - 1) // page_size
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key="gallery_page")
+    page_images = images[(page - 1) * page_size:page * page_size]
+
+    columns = st.columns(3)  # Create three columns
+    for i, image in enumerate(page_images):
+        with columns[i % 3]:  # Cycle through the columns
+            # --- Create a container for the thumbnail and buttons ---
+            image_container = st.container()
+            with image_container:
+                try:
+                    st.image(index.thumbnail(image), caption=image, use_column_width=True)
+                except OSError as error:
+                    st.write(f"{image}: could not read image ({error})")
+                column1, column2 = st.columns(2)  # Two columns for buttons
+                with column1:
+                    if st.button("🔍", key=f"view_{image}"):
+                        st.session_state.gallery_selected = image
+                        st.rerun()
+                with column2:
+                    # Add delete button
+                    if st.button("🗑️", key=f"delete_{image}"):
+                        index.remove(image)
+                        if st.session_state.get("gallery_selected") == image:
+                            st.session_state.gallery_selected = None
+                        st.rerun()
@@ -0,0 +1,120 @@
+# TeamForgeAI/ui/gallery.py
+import json
+import os
+import tempfile
+import threading
+
+from PIL import Image
+
+from image_cache import IMAGE_DIR
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+THUMBNAIL_SIZE = 256  # Longest side in pixels
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_DIR = ".thumbnails"
+INDEX_NAME = ".gallery_index.json"
+
+class GalleryIndex:
+    """
+    Metadata and WebP thumbnails for the images in the gallery folder.
+
+    refresh() lists the folder with a single os.scandir pass and compares each file's
+    mtime and size with the index, so nothing is opened unless it changed. Thumbnails
+    are made on first display and kept in a hidden folder next to the images; a changed
+    file gets a new one, and a deleted file's thumbnail is removed. The index is saved
+    to disk so a restart does not rebuild it.
+    """
+
+    def __init__(self, image_dir: str = IMAGE_DIR, thumbnail_size: int = THUMBNAIL_SIZE):
+        self.image_dir = image_dir
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_dir = os.path.join(image_dir, THUMBNAIL_DIR)
+        self.index_path = os.path.join(image_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self.entries = self._load()  # File name -> {"mtime", "size", "width", "height", "thumbnail"}
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        os.makedirs(self.image_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.image_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file)
+        os.replace(temp_path, self.index_path)
+
+    def refresh(self) -> list:
+        """Syncs the index with the folder and returns the image names, newest first."""
+        if not os.path.isdir(self.image_dir):
+            return []
+        with self._lock:
+            seen = {}
+            with os.scandir(self.image_dir) as scan:
+                for entry in scan:
+                    if entry.is_file() and not entry.name.startswith(".") and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        stat = entry.stat()
+                        seen[entry.name] = (stat.st_mtime, stat.st_size)
+            changed = False
+            for name in list(self.entries):
+                if name not in seen:
+                    self._drop_thumbnail(self.entries.pop(name))
+                    changed = True
+            for name, (mtime, size) in seen.items():
+                entry = self.entries.get(name)
+                if entry is None or entry["mtime"] != mtime or entry["size"] != size:
+                    if entry:
+                        self._drop_thumbnail(entry)
+                    self.entries[name] = {"mtime": mtime, "size": size, "width": None, "height": None, "thumbnail": None}
+                    changed = True
+            if changed:
+                self._save()
+            return sorted(self.entries, key=lambda name: self.entries[name]["mtime"], reverse=True)
+
+    def thumbnail(self, name: str) -> str:
+        """Path of the image's thumbnail, made now if it does not exist yet."""
+        with self._lock:
+            entry = self.entries[name]
+            if entry["thumbnail"] and os.path.exists(entry["thumbnail"]):
+                return entry["thumbnail"]
+            os.makedirs(self.thumbnail_dir, exist_ok=True)
+            base = os.path.splitext(name)[0]
+            thumbnail_path = os.path.join(self.thumbnail_dir, f"{base}_{self.thumbnail_size}_{int(entry['mtime'])}.webp")
+            with Image.open(os.path.join(self.image_dir, name)) as image:
+                entry["width"], entry["height"] = image.size
+                image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                image.save(thumbnail_path, "WEBP", quality=THUMBNAIL_QUALITY)
+            entry["thumbnail"] = thumbnail_path
+            self._save()
+            return thumbnail_path
+
+    def remove(self, name: str) -> None:
+        """Deletes an image, its thumbnail and its index entry."""
+        with self._lock:
+            entry = self.entries.pop(name, None)
+            if entry:
+                self._drop_thumbnail(entry)
+            image_path = os.path.join(self.image_dir, name)
+            if os.path.exists(image_path):
+                os.remove(image_path)
+            self._save()
+
+    @staticmethod
+    def _drop_thumbnail(entry: dict) -> None:
+        if entry.get("thumbnail") and os.path.exists(entry["thumbnail"]):
+            os.remove(entry["thumbnail"])
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_gallery_index(image_dir: str = IMAGE_DIR) -> GalleryIndex:
+    """Returns the process-wide index of a gallery folder."""
+    with _indexes_lock:
+        if image_dir not in _indexes:
+            _indexes[image_dir] = GalleryIndex(image_dir)
+        return _indexes[image_dir]
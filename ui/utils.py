@@ -9,36 +9,33 @@ from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from file_utils import create_agent_data, sanitize_text, load_skills, save_agent_to_json
 from agent_utils import rephrase_prompt, get_agents_from_text, get_workflow_from_agents, zip_files_in_memory
+from discussion_journal import get_journal_store
 
 # Directory for saving discussion history
 PROJECT_DIR = 'TeamForgeAI/files/discussions'
 if not os.path.exists(PROJECT_DIR):
     os.makedirs(PROJECT_DIR)
+DISCUSSION_PAGE_SIZE = 20  # Messages shown per page of a discussion
 
 def list_discussions() -> list:
-    """Lists all saved discussions."""
-    return [f.replace('.txt', '') for f in os.listdir(PROJECT_DIR) if os.path.isfile(os.path.join(PROJECT_DIR, f))]
+    """Lists all saved discussions, most recently changed first."""
+    return get_journal_store(PROJECT_DIR).names()
 
 def load_discussion_history(discussion_name: str) -> str:
-    """Loads the discussion history from a text file."""
-    file_path = os.path.join(PROJECT_DIR, f"{discussion_name}.txt")
-    if os.path.exists(file_path):
-        with open(file_path, 'r', encoding="utf-8") as file:
-            return file.read()
-    return ""
+    """Loads the discussion history from the SQLite store, with any changes still in its journal applied."""
+    return get_journal_store(PROJECT_DIR).load(discussion_name)
 
 def save_discussion_history(history: str, discussion_name: str) -> None:
-    """Saves the discussion history to a text file."""
-    with open(os.path.join(PROJECT_DIR, f"{discussion_name}.txt"), 'w', encoding="utf-8") as file:
-        file.write(history)
-    cleanup_old_files(PROJECT_DIR, max_files=20)
-
-def cleanup_old_files(directory: str, max_files: int) -> None:
-    """Deletes old files from the specified directory, keeping only the most recent ones."""
-    files = [os.path.join(directory, file) for file in os.listdir(directory) if os.path.isfile(os.path.join(directory, file))]
-    files.sort(key=os.path.getmtime, reverse=True)
-    for old_file in files[max_files:]:
-        os.remove(old_file)
+    """Saves the discussion history by appending what changed to its journal; retention runs in the background."""
+    get_journal_store(PROJECT_DIR).save(discussion_name, history)
+
+def search_discussions(query: str, limit: int = 20) -> list:
+    """Searches the messages of every saved discussion, best matches first."""
+    return get_journal_store(PROJECT_DIR).search(query, limit)
+
+def load_discussion_page(discussion_name: str, page: int, page_size: int = DISCUSSION_PAGE_SIZE) -> tuple:
+    """Loads one page (from 1) of a discussion's messages, and the discussion's message count."""
+    return get_journal_store(PROJECT_DIR).messages(discussion_name, (page - 1) * page_size, page_size)
 
 def extract_keywords(text: str) -> list:
     """Extracts keywords from the provided text."""